@@ -164,7 +164,22 @@ REM jenv batch wrapper
 python -m jenv %*
 "@
     $batWrapper | Out-File -FilePath "$InstallDir\bin\jenv.bat" -Encoding ASCII
-    
+
+    # jenv-exec wrappers, called by the shims generated by 'jenv rehash'
+    $psExecWrapper = @"
+#!/usr/bin/env pwsh
+# jenv-exec PowerShell wrapper
+python -m jenv.shim @args
+"@
+    $psExecWrapper | Out-File -FilePath "$InstallDir\bin\jenv-exec.ps1" -Encoding UTF8
+
+    $batExecWrapper = @"
+@echo off
+REM jenv-exec batch wrapper
+python -m jenv.shim %*
+"@
+    $batExecWrapper | Out-File -FilePath "$InstallDir\bin\jenv-exec.bat" -Encoding ASCII
+
     Write-Success "Created wrapper scripts"
 }
 
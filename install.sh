@@ -101,6 +101,16 @@ EOF
     
     chmod +x "$JENV_DIR/bin/jenv"
     echo -e "${GREEN}✅ Created jenv wrapper at $JENV_DIR/bin/jenv${NC}"
+
+    # The shims generated by 'jenv rehash' call jenv-exec
+    cat > "$JENV_DIR/bin/jenv-exec" << 'EOF'
+#!/usr/bin/env bash
+# jenv-exec wrapper script, called by the jenv shims
+exec python3 -m jenv.shim "$@"
+EOF
+
+    chmod +x "$JENV_DIR/bin/jenv-exec"
+    echo -e "${GREEN}✅ Created jenv-exec wrapper at $JENV_DIR/bin/jenv-exec${NC}"
 }
 
 # Function to setup shell integration
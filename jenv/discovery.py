@@ -3,11 +3,58 @@ import subprocess
 from pathlib import Path
 import re
 import os
-from typing import List, Optional, Dict, NamedTuple
+import stat
+from typing import Iterator, List, Optional, Dict, NamedTuple, Tuple
+import asyncio
+import json
 import logging
 
+from jenv.settings import VERSIONS_DIR, JENV_CUSTOM_PATHS_FILE, JENV_VERSION_CACHE_FILE
+
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent `java` probes during discovery
+_MAX_PROBE_WORKERS = 8
+# Seconds to wait for `java -version` before giving up on a JDK
+_PROBE_TIMEOUT = 5
+
+# Pre-compiled patterns used on the discovery hot path
+_RE_SHORT_VER = re.compile(rb'version "([^"]+)"')
+_RE_CLEAN_VERSION = re.compile(r"([^\-+\s]+).*")
+_RE_SANITIZE_DIR = re.compile(r"[^a-zA-Z0-9-]+")
+_RE_SANITIZE_NAME = re.compile(r"[^a-zA-Z0-9.-]+")
+_RE_MAJOR = re.compile(r"(\d+)")
+_RE_VERSION_NUMBERS = re.compile(r"\d+")
+_RE_RELEASE_VER = re.compile(r'^JAVA_VERSION="([^"]+)"', re.M)
+_RE_RELEASE_IMPL = re.compile(r'^IMPLEMENTOR="([^"]+)"', re.M)
+
+# Vendor keywords recognised in JDK paths; see _VENDOR_RULES for how each named group is ranked
+_VENDOR_RE = re.compile(
+    r"(?P<temurin>temurin)|(?P<adoptium>adoptium)|(?P<oracle>oracle)|(?P<amazon_corretto>amazon-corretto)"
+    r"|(?P<corretto>corretto)|(?P<zulu>zulu)|(?P<graalvm>graalvm)|(?P<openjdk>openjdk)|(?P<jdk>jdk)|(?P<java_dash>java-)"
+)
+# group name -> (priority, vendor, only counts inside the JDK directory name). "jdk" is handled separately.
+_VENDOR_RULES = {
+    "temurin": (0, "Temurin", False),
+    "adoptium": (0, "Temurin", True),
+    "oracle": (1, "Oracle", False),
+    "amazon_corretto": (2, "Amazon Corretto", False),
+    "corretto": (2, "Amazon Corretto", True),
+    "zulu": (3, "Zulu", True), # Simplified from "Azul Zulu" for shorter name
+    "graalvm": (4, "GraalVM", True),
+    "openjdk": (5, "OpenJDK", False),
+    "java_dash": (6, "OpenJDK", True), # Generic "java-*" names fall back to OpenJDK
+}
+
+# Maps IMPLEMENTOR values from a JDK's `release` file to the vendor labels used in names.
+# "Oracle Corporation" is deliberately absent: it is used by both Oracle JDK and jdk.java.net OpenJDK builds.
+_RELEASE_IMPLEMENTOR_VENDORS = {
+    "eclipse adoptium": "Temurin",
+    "amazon.com inc.": "Amazon Corretto",
+    "azul systems, inc.": "Zulu",
+    "graalvm community": "GraalVM",
+}
+
 class JdkInfo(NamedTuple):
     version: str
     name: str # e.g., temurin-17.0.5, openjdk-11.0.16
@@ -25,75 +72,153 @@ class JdkInfo(NamedTuple):
 
     @property
     def major_version(self) -> Optional[int]:
-        match = re.match(r"(\d+)", self.version)
+        match = _RE_MAJOR.match(self.version)
         return int(match.group(1)) if match else None
 
+    @property
+    def sort_key(self) -> Tuple[Tuple[int, ...], str]:
+        """Numeric version components (so 17.0.5 sorts above 9.0.1), then name as a tie-breaker."""
+        return tuple(int(part) for part in _RE_VERSION_NUMBERS.findall(self.version)), self.name
 
-def get_java_version_from_path(java_home: Path) -> Optional[str]:
+
+def _read_release_file(java_home: Path) -> Tuple[Optional[str], Optional[str]]:
     """
-    Gets the Java version string from a given JAVA_HOME path.
+    Reads JAVA_VERSION and IMPLEMENTOR from the `release` file shipped in a JDK home.
+    Returns (None, None) if the file is missing, unreadable or has no version entry.
     """
-    logger.debug(f"get_java_version_from_path: Checking JDK at {java_home}")
+    release_file = java_home / "release"
+    if not release_file.is_file():
+        return None, None
+    try:
+        content = release_file.read_text(errors="replace")
+    except OSError as e:
+        logger.debug(f"_read_release_file: Could not read {release_file}: {e}")
+        return None, None
+
+    version_match = _RE_RELEASE_VER.search(content)
+    if not version_match:
+        return None, None
+    implementor_match = _RE_RELEASE_IMPL.search(content)
+    cleaned_version = _RE_CLEAN_VERSION.sub(r"\1", version_match.group(1).strip())
+    return cleaned_version, (implementor_match.group(1).strip() if implementor_match else None)
+
+
+def get_java_version_and_implementor(java_home: Path) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Gets the Java version string and, when known, the IMPLEMENTOR from a given JAVA_HOME path.
+    The `release` file is preferred; `java -version` is only spawned as a fallback.
+    """
+    logger.debug(f"get_java_version_and_implementor: Checking JDK at {java_home}")
     java_exe_name = "java.exe" if platform.system() == "Windows" else "java"
     java_exe = java_home / "bin" / java_exe_name
 
     if not java_exe.exists():
-        logger.debug(f"get_java_version_from_path: {java_exe} does not exist.")
-        return None
-    logger.debug(f"get_java_version_from_path: Found {java_exe}, attempting to get version.")
+        logger.debug(f"get_java_version_and_implementor: {java_exe} does not exist.")
+        return None, None
+
+    release_version, implementor = _read_release_file(java_home)
+    if release_version:
+        logger.debug(f"get_java_version_and_implementor: Read version '{release_version}' from release file for {java_home}")
+        return release_version, implementor
+    logger.debug(f"get_java_version_and_implementor: Found {java_exe}, attempting to get version.")
 
     try:
-        # The -XshowSettings:properties -version command prints to stderr
-        result = subprocess.run([str(java_exe), "-XshowSettings:properties", "-version"], capture_output=True, text=True, timeout=5)
-        # Prioritize java.runtime.version for full version, fallback to java.version
-        version_match = re.search(r"java\.runtime\.version = (.*)", result.stderr)
-        if not version_match: # Fallback for older JDKs or different formats
-            version_match = re.search(r"java\.version = (.*)", result.stderr)
-
-        if version_match:
-            raw_version = version_match.group(1).strip()
-            # Clean common suffixes like "+12", "-LTS" if they are not part of the core version number
-            # Example: 17.0.3+7, 11.0.12-LTS -> 17.0.3, 11.0.12
-            # This is a simple heuristic and might need refinement
-            cleaned_version = re.sub(r"([^\-+\s]+).*", r"\1", raw_version) # Escaped hyphen
-            logger.debug(f"get_java_version_from_path: Extracted raw version '{raw_version}', cleaned to '{cleaned_version}' for {java_home}")
-            return cleaned_version
-        # else, if version_match was None from the start or after fallback
-
-    except (subprocess.TimeoutExpired, FileNotFoundError, UnicodeDecodeError) as e:
+        # `java -version` prints e.g. 'openjdk version "17.0.5" 2022-10-18' to stderr; stdout is unused
+        result = subprocess.run([str(java_exe), "-version"], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=_PROBE_TIMEOUT)
+    except (subprocess.TimeoutExpired, OSError) as e:
         logger.warning(f"Could not determine version for {java_home}: {e}")
-        return None # This is the return for the except block
+        return None, None
+    return _parse_version_output(result.stderr, java_home), None
+
+def _parse_version_output(stderr: bytes, java_home: Path) -> Optional[str]:
+    """Extracts the cleaned version from `java -version` output, or None if there isn't one."""
+    version_match = _RE_SHORT_VER.search(stderr)
+    if not version_match:
+        logger.debug(f"_parse_version_output: No version found in output for {java_home}")
+        return None
+    raw_version = version_match.group(1).decode("ascii", errors="replace").strip()
+    # Clean common suffixes like "+12", "-LTS" if they are not part of the core version number
+    # Example: 17.0.3+7, 11.0.12-LTS -> 17.0.3, 11.0.12
+    # This is a simple heuristic and might need refinement
+    cleaned_version = _RE_CLEAN_VERSION.sub(r"\1", raw_version) # Escaped hyphen
+    logger.debug(f"_parse_version_output: Extracted raw version '{raw_version}', cleaned to '{cleaned_version}' for {java_home}")
+    return cleaned_version
+
+async def _probe_async(java_home: Path, java_exe_name: str, limit: asyncio.Semaphore) -> Optional[str]:
+    """Async counterpart of the `java -version` fallback in get_java_version_and_implementor."""
+    java_exe = java_home / "bin" / java_exe_name
+    async with limit:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                str(java_exe), "-version", stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            logger.warning(f"Could not determine version for {java_home}: {e}")
+            return None
+        try:
+            _, stderr = await asyncio.wait_for(proc.communicate(), _PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logger.warning(f"Could not determine version for {java_home}: timed out after {_PROBE_TIMEOUT} seconds")
+            return None
+    return _parse_version_output(stderr, java_home)
+
+async def _probe_all_async(java_homes: List[Path], java_exe_name: str) -> List[Optional[str]]:
+    """Runs `java -version` for every JDK home concurrently, at most _MAX_PROBE_WORKERS at a time."""
+    limit = asyncio.Semaphore(_MAX_PROBE_WORKERS)
+    return await asyncio.gather(*(_probe_async(java_home, java_exe_name, limit) for java_home in java_homes))
 
-    # This is reached if try completed without returning (i.e. version_match was None)
-    logger.debug(f"get_java_version_from_path: No version found in output for {java_home}")
-    return None # Default return if no version string was parsed
+def get_java_version_from_path(java_home: Path) -> Optional[str]:
+    """
+    Gets the Java version string from a given JAVA_HOME path.
+    """
+    return get_java_version_and_implementor(java_home)[0]
 
-def get_jdk_name_and_vendor(java_home: Path, version: Optional[str]) -> (str, Optional[str]):
+def _classify_vendor(path_str: str, dir_start: int) -> Optional[str]:
+    """
+    Identifies the vendor from a lowercased JDK path in a single regex pass.
+    `dir_start` is the offset of the JDK directory name within `path_str`; some keywords only count there.
+    When several keywords match, the lowest priority number wins.
+    """
+    best: Optional[Tuple[int, str]] = None
+    jdk_prefix_dashed: Optional[bool] = None # Set when the directory name starts with "jdk"
+    openjdk_in_dir = False
+    for match in _VENDOR_RE.finditer(path_str):
+        group = match.lastgroup
+        in_dir = match.start() >= dir_start
+        if group == "jdk":
+            if match.start() == dir_start:
+                jdk_prefix_dashed = path_str.startswith("-", match.end())
+            continue
+        if group == "openjdk" and in_dir:
+            openjdk_in_dir = True
+        priority, vendor, dir_only = _VENDOR_RULES[group]
+        if (in_dir or not dir_only) and (best is None or priority < best[0]):
+            best = (priority, vendor)
+
+    # "jdk-*" directories are Oracle builds unless they say openjdk; any other "jdk*" falls back to OpenJDK
+    if jdk_prefix_dashed is not None:
+        candidate = (1, "Oracle") if jdk_prefix_dashed and not openjdk_in_dir else (6, "OpenJDK")
+        if best is None or candidate[0] < best[0]:
+            best = candidate
+    return best[1] if best else None
+
+def get_jdk_name_and_vendor(java_home: Path, version: Optional[str], implementor: Optional[str] = None) -> (str, Optional[str]):
     """
     Generates a descriptive name and attempts to identify vendor for a JDK.
+    A recognised `release` file IMPLEMENTOR takes precedence over the path heuristics.
     e.g., "temurin-17.0.5", "Oracle"
     """
     name_parts = []
-    vendor = None
-    path_str = str(java_home).lower()
-    dir_name_lower = java_home.name.lower()
-
-    # Specific vendor keywords first
-    if "temurin" in path_str or "adoptium" in dir_name_lower: # More specific for adoptium
-        vendor = "Temurin"
-    elif "oracle" in path_str or (dir_name_lower.startswith("jdk-") and "openjdk" not in dir_name_lower): # Oracle if starts with jdk- and not openjdk
-        vendor = "Oracle"
-    elif "amazon-corretto" in path_str or "corretto" in dir_name_lower:
-        vendor = "Amazon Corretto"
-    elif "zulu" in dir_name_lower: # General zulu check
-        vendor = "Zulu" # Simplified from "Azul Zulu" for shorter name
-    elif "graalvm" in dir_name_lower:
-        vendor = "GraalVM"
-    elif "openjdk" in dir_name_lower or "openjdk" in path_str: # More specific check for openjdk in dir name or path
-        vendor = "OpenJDK"
-    # Fallback for generic "jdk" or "java-" names if no other vendor matched and not clearly OpenJDK from above
-    elif (dir_name_lower.startswith("jdk") or "java-" in dir_name_lower) and not vendor:
-        vendor = "OpenJDK"
+    vendor = _RELEASE_IMPLEMENTOR_VENDORS.get(implementor.lower()) if implementor else None
+    # Name macOS bundles (<name>.jdk/Contents/Home) after the bundle, not "Home"
+    name_source = java_home.parent.parent if java_home.name == "Home" and java_home.parent.name == "Contents" else java_home
+    path_str = str(name_source).lower()
+    dir_name_lower = name_source.name.lower()
+
+    if not vendor:
+        vendor = _classify_vendor(path_str, len(path_str) - len(dir_name_lower))
 
     current_name_part = ""
     if vendor:
@@ -101,7 +226,7 @@ def get_jdk_name_and_vendor(java_home: Path, version: Optional[str]) -> (str, Op
     else:
         # Fallback to part of the directory name if no clear vendor
         # Sanitize directory name for use as a prefix
-        sanitized_dir_name = re.sub(r"[^a-zA-Z0-9-]+", "-", dir_name_lower)
+        sanitized_dir_name = _RE_SANITIZE_DIR.sub("-", dir_name_lower)
         sanitized_dir_name = sanitized_dir_name.strip("-")
         current_name_part = sanitized_dir_name
 
@@ -111,13 +236,112 @@ def get_jdk_name_and_vendor(java_home: Path, version: Optional[str]) -> (str, Op
         name_parts.append(version)
 
     name = "-".join(filter(None, name_parts))
-    # Final sanitize for the whole name
-    name = re.sub(r"[^a-zA-Z0-9.-]+", "-", name)
-    name = name.strip("-")
-    # Replace underscores from version with hyphens for consistency in names
-    name = name.replace("_", "-")
+    # Final sanitize for the whole name. This also turns underscores from the version into hyphens
+    # (e.g. 1.8.0_292 -> 1.8.0-292), since "_" is outside the allowed character set.
+    name = _RE_SANITIZE_NAME.sub("-", name).strip("-")
+
+    return name if name else name_source.name, vendor
+
 
-    return name if name else java_home.name, vendor
+def _resolve(path: Path) -> Tuple[Path, bool]:
+    """
+    Resolves symlinks with os.path.realpath and checks the target exists with a single stat.
+    Returns (resolved_path, True), or (path, False) if the target does not exist.
+    Cheaper than Path.resolve(strict=True) and never raises.
+    """
+    resolved = os.path.realpath(path)
+    try:
+        os.stat(resolved)
+    except OSError:
+        return path, False
+    return Path(resolved), True
+
+
+def _is_relative_to(path: Path, base: Path) -> bool:
+    """Backport of Path.is_relative_to (Python 3.9+) for the Python 3.8 we still support."""
+    try:
+        path.relative_to(base)
+        return True
+    except ValueError:
+        return False
+
+
+def _jdk_home_from(directory: str, java_exe_name: str) -> Optional[str]:
+    """
+    Returns the JDK home for `directory`: the directory itself if it has bin/<java>,
+    or its macOS bundle home (Contents/Home) if that does. Returns None otherwise.
+    Works on str paths since it runs once per scanned directory.
+    """
+    for home in (directory, os.path.join(directory, "Contents", "Home")):
+        try:
+            if stat.S_ISREG(os.stat(os.path.join(home, "bin", java_exe_name)).st_mode): # A file, not a dir named 'java'
+                return home
+        except OSError:
+            continue
+    return None
+
+
+def _candidate_dirs(root: str) -> Iterator[Tuple[str, bool]]:
+    """
+    Yields (`root`, True) followed by (subdirectory, False) for its immediate subdirectories, resolving
+    those that are symlinks. Lazy, so a caller that stops after `root` (because it is a JDK home) never
+    lists it. Paths stay str; callers only build a Path for the JDK homes they keep.
+    """
+    yield root, True
+    try:
+        with os.scandir(root) as scan:
+            entries = list(scan)
+    except OSError as e:
+        logger.warning(f"discover_system_jdks: Could not list {root} (error: {e}). Skipping.")
+        return
+    for entry in entries:
+        if not entry.is_dir(): # Uses the stat cached by scandir; follows symlinks to dirs
+            continue
+        item = entry.path
+        # Children of a resolved directory only need resolving when they are symlinks themselves
+        if entry.is_symlink():
+            resolved = os.path.realpath(item)
+            if os.path.exists(resolved):
+                item = resolved
+            else:
+                logger.warning(f"discover_system_jdks: Could not resolve item {entry.path}. Using original path.")
+        yield item, False
+
+
+def _probe_cache_key(java_home: Path, java_exe_name: str) -> Optional[str]:
+    """
+    Builds a cache key from the stat of the JDK's `release` file, or its java executable if absent.
+    Any reinstall or upgrade in place changes the key and invalidates the cached probe.
+    """
+    for marker in (java_home / "release", java_home / "bin" / java_exe_name):
+        try:
+            st = os.stat(marker)
+        except OSError:
+            continue
+        return f"{st.st_mtime_ns}-{st.st_ino}-{st.st_size}"
+    return None
+
+
+def _load_version_cache() -> Dict[str, Dict[str, Optional[str]]]:
+    """Loads cached version probe results, returning an empty cache if missing or corrupt."""
+    try:
+        cache = json.loads(JENV_VERSION_CACHE_FILE.read_text())
+    except (OSError, ValueError) as e:
+        logger.debug(f"_load_version_cache: No usable cache at {JENV_VERSION_CACHE_FILE} ({e}).")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_version_cache(cache: Dict[str, Dict[str, Optional[str]]]) -> None:
+    """Writes the version cache atomically, dropping entries whose JDK home no longer exists."""
+    live_entries = {path_str: entry for path_str, entry in cache.items() if os.path.isdir(path_str)}
+    try:
+        JENV_VERSION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = JENV_VERSION_CACHE_FILE.with_name(f"{JENV_VERSION_CACHE_FILE.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(live_entries, indent=1, sort_keys=True))
+        os.replace(tmp_file, JENV_VERSION_CACHE_FILE)
+    except OSError as e:
+        logger.debug(f"_save_version_cache: Could not write {JENV_VERSION_CACHE_FILE}: {e}")
 
 
 def discover_system_jdks() -> List[JdkInfo]:
@@ -129,32 +353,27 @@ def discover_system_jdks() -> List[JdkInfo]:
     search_paths = []
 
     logger.debug("discover_system_jdks: Starting JDK discovery.")
+    # Per-item debug messages below are guarded so their f-strings aren't built when debug logging is off
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    system = platform.system()
+    java_exe_name = "java.exe" if system == "Windows" else "java"
+    logger.debug(f"discover_system_jdks: Current system is {system}.")
+
     # 1. Common environment variables
     for env_var in ["JAVA_HOME", "JDK_HOME"]:
         path_str = os.environ.get(env_var)
         logger.debug(f"discover_system_jdks: Checking env var {env_var}: value '{path_str}'")
         if path_str:
             path = Path(path_str)
-            java_exe_standard = path / "bin" / "java"
-            java_exe_windows = path / "bin" / "java.exe"
-            logger.debug(f"discover_system_jdks: Path from {env_var} is {path}. Checking for java executables...")
-            if java_exe_standard.exists() or java_exe_windows.exists():
-                logger.debug(f"discover_system_jdks: Found java executable in {path / 'bin'}. Resolving path.")
-                 # Resolve symlinks for JAVA_HOME if it points to one
-                try:
-                    resolved_path = path.resolve(strict=True)
-                    search_paths.append(resolved_path)
-                    logger.debug(f"discover_system_jdks: Added resolved path {resolved_path} from {env_var} to search_paths.")
-                except (FileNotFoundError, RuntimeError) as e: # RuntimeError for deep symlink recursion on some OS
-                    search_paths.append(path)
-                    logger.warning(f"discover_system_jdks: Could not resolve {path} from {env_var} (error: {e}). Added non-resolved path {path} to search_paths.")
+            logger.debug(f"discover_system_jdks: Path from {env_var} is {path}. Checking for java executable...")
+            if (path / "bin" / java_exe_name).exists():
+                logger.debug(f"discover_system_jdks: Found java executable in {path / 'bin'}. Added {path} from {env_var} to search_paths.")
+                search_paths.append(path) # Symlinks are resolved with the other search paths below
             else:
                 logger.debug(f"discover_system_jdks: No java executable found in {path / 'bin'} for {env_var}.")
 
 
     # 2. Common installation directories
-    system = platform.system() # Define before use
-    logger.debug(f"discover_system_jdks: Current system is {system}.")
     if system == "Windows":
         program_files = Path(os.environ.get("ProgramFiles", "C:/Program Files"))
         program_files_x86 = Path(os.environ.get("ProgramFiles(x86)", "C:/Program Files (x86)"))
@@ -168,15 +387,15 @@ def discover_system_jdks() -> List[JdkInfo]:
         # Scoop path
         scoop_home = Path.home() / "scoop" / "apps"
         if scoop_home.is_dir():
-            for app_dir in scoop_home.iterdir():
-                if "java" in app_dir.name.lower() or "jdk" in app_dir.name.lower() or "openjdk" in app_dir.name.lower():
-                    # Scoop often has a 'current' symlink, and versioned directories
-                    if (app_dir / "current").exists():
-                        search_paths.append(app_dir / "current")
-                    else: # Add versioned dirs directly
-                        for version_dir in app_dir.iterdir():
-                            if version_dir.is_dir():
-                                search_paths.append(version_dir)
+            with os.scandir(scoop_home) as app_entries:
+                java_apps = [Path(entry.path) for entry in app_entries if "java" in entry.name.lower() or "jdk" in entry.name.lower()]
+            for app_dir in java_apps:
+                # Scoop often has a 'current' symlink, and versioned directories
+                if (app_dir / "current").exists():
+                    search_paths.append(app_dir / "current")
+                else: # Add versioned dirs directly
+                    with os.scandir(app_dir) as version_entries:
+                        search_paths.extend(Path(entry.path) for entry in version_entries if entry.is_dir())
 
 
     elif system == "Darwin": # macOS
@@ -194,7 +413,6 @@ def discover_system_jdks() -> List[JdkInfo]:
         ])
 
     # 3. jenv managed versions
-    from jenv.settings import VERSIONS_DIR, JENV_CUSTOM_PATHS_FILE # Avoid circular import at top level
     if VERSIONS_DIR.exists():
         logger.debug(f"discover_system_jdks: Adding JENV managed versions dir {VERSIONS_DIR} to search_paths.")
         search_paths.append(VERSIONS_DIR)
@@ -203,98 +421,113 @@ def discover_system_jdks() -> List[JdkInfo]:
 
     # 4. User-defined custom paths
     logger.debug(f"discover_system_jdks: Checking for custom paths file at {JENV_CUSTOM_PATHS_FILE}.")
-    if JENV_CUSTOM_PATHS_FILE.exists():
-        logger.debug(f"discover_system_jdks: Custom paths file found. Reading paths.")
-        try:
-            with open(JENV_CUSTOM_PATHS_FILE, "r") as f:
-                for line in f:
-                    custom_path_str = line.strip()
-                    if custom_path_str and not custom_path_str.startswith("#"):
-                        custom_path = Path(custom_path_str)
-                        if custom_path.is_dir(): # Check if it's a directory
-                            search_paths.append(custom_path)
-                        else:
-                            logger.warning(f"Custom path '{custom_path_str}' from {JENV_CUSTOM_PATHS_FILE} is not a valid directory or does not exist.")
-        except IOError as e:
-            logger.error(f"Error reading custom paths file {JENV_CUSTOM_PATHS_FILE}: {e}")
-
-
-    processed_paths = set()
-    logger.debug(f"discover_system_jdks: Compiled search_paths (before processing): {search_paths}")
+    custom_paths = set() # Validated when the search paths are resolved below, avoiding a stat here
+    try:
+        # Read as bytes and fsdecode, matching how 'jenv scan' writes the file
+        for line in JENV_CUSTOM_PATHS_FILE.read_bytes().splitlines():
+            custom_path_bytes = line.strip()
+            if custom_path_bytes and not custom_path_bytes.startswith(b"#"):
+                custom_path = Path(os.fsdecode(custom_path_bytes))
+                custom_paths.add(custom_path)
+                search_paths.append(custom_path)
+    except FileNotFoundError:
+        logger.debug(f"discover_system_jdks: No custom paths file at {JENV_CUSTOM_PATHS_FILE}.")
+    except IOError as e:
+        logger.error(f"Error reading custom paths file {JENV_CUSTOM_PATHS_FILE}: {e}")
+
+
+    # Resolve symlinks up front so the same directory reached via JAVA_HOME, a system dir
+    # and a custom path is only walked once. Dict keys keep the original search order.
+    unique_search_paths: Dict[Path, None] = {}
+    for search_path in search_paths:
+        resolved_search_path, exists = _resolve(search_path)
+        if not exists and search_path in custom_paths:
+            logger.warning(f"Custom path '{search_path}' from {JENV_CUSTOM_PATHS_FILE} is not a valid directory or does not exist.")
+        unique_search_paths.setdefault(resolved_search_path, None)
+    search_paths = list(unique_search_paths)
+
+    candidate_paths: List[Path] = [] # JDK homes found by the filesystem walk, probed afterwards
+    # Resolved JDK homes already queued: a macOS bundle reached as both X.jdk and X.jdk/Contents/Home,
+    # or a JDK reached through a symlink, has one home however the walk got there
+    processed_homes = set()
+    if debug_enabled:
+        logger.debug(f"discover_system_jdks: Compiled search_paths (before processing): {search_paths}")
 
     for base_path in search_paths:
-        logger.debug(f"discover_system_jdks: Processing base_path: {base_path}")
-        if not base_path.exists() or not base_path.is_dir():
-            logger.debug(f"discover_system_jdks: Base path {base_path} does not exist or is not a dir. Skipping.")
+        if debug_enabled:
+            logger.debug(f"discover_system_jdks: Processing base_path: {base_path}")
+        if not base_path.is_dir():
+            if debug_enabled:
+                logger.debug(f"discover_system_jdks: Base path {base_path} does not exist or is not a dir. Skipping.")
             continue
 
-        # Check if base_path itself is a JDK home
-        # Must resolve symlinks here to avoid duplicate entries from different symlink paths
-        try:
-            resolved_base_path = base_path.resolve(strict=True)
-        except (FileNotFoundError, RuntimeError):
-            resolved_base_path = base_path # Use original if resolve fails
-
-        if resolved_base_path in processed_paths:
-            continue
-
-        is_jenv_managed = str(VERSIONS_DIR) in str(resolved_base_path)
-
-        java_exe = resolved_base_path / "bin" / ("java.exe" if system == "Windows" else "java")
-        logger.debug(f"discover_system_jdks: Checking if {resolved_base_path} is a JDK home (java exe: {java_exe}).")
-        if java_exe.is_file(): # Check if it's a file, not just exists, to ensure it's not a dir named 'java'
-            logger.debug(f"discover_system_jdks: {java_exe} is a file. Getting version...")
-            version_str = get_java_version_from_path(resolved_base_path)
-            if version_str:
-                name, vendor = get_jdk_name_and_vendor(resolved_base_path, version_str)
-                logger.info(f"discover_system_jdks: Found JDK: Name={name}, Version={version_str}, Path={resolved_base_path}, Vendor={vendor}")
-                found_jdks.add(JdkInfo(version_str, name, resolved_base_path, vendor, is_jenv_managed))
-                processed_paths.add(resolved_base_path)
-                continue # Don't iterate inside if this base_path is a JDK itself
-            else:
-                logger.debug(f"discover_system_jdks: Could not get version from {resolved_base_path}, though java exe exists.")
-        else:
-            logger.debug(f"discover_system_jdks: {java_exe} is not a file or does not exist. Not a JDK home.")
-
-
-        # If base_path is a directory containing multiple JDKs (e.g. /usr/lib/jvm)
-        # or a symlink to such a directory
-        logger.debug(f"discover_system_jdks: Checking if {resolved_base_path} is a directory of JDKs.")
-        if resolved_base_path.is_dir(): # Check again after potential resolution
-            for item in resolved_base_path.iterdir():
-                logger.debug(f"discover_system_jdks: Iterating item: {item} in {resolved_base_path}")
-                if item.is_dir(): # Could be symlink to dir
-                    try:
-                        resolved_item_path = item.resolve(strict=True)
-                        logger.debug(f"discover_system_jdks: Resolved item {item} to {resolved_item_path}")
-                    except (FileNotFoundError, RuntimeError) as e:
-                        resolved_item_path = item
-                        logger.warning(f"discover_system_jdks: Could not resolve item {item} (error: {e}). Using original path.")
-
-                    if resolved_item_path in processed_paths:
-                        logger.debug(f"discover_system_jdks: Path {resolved_item_path} already processed. Skipping.")
-                        continue
-
-                    java_exe_in_item = resolved_item_path / "bin" / ("java.exe" if system == "Windows" else "java")
-                    logger.debug(f"discover_system_jdks: Checking item {resolved_item_path} as JDK home (java exe: {java_exe_in_item}).")
-                    if java_exe_in_item.is_file(): # Check if it's a file
-                        logger.debug(f"discover_system_jdks: {java_exe_in_item} is a file. Getting version...")
-                        version_str = get_java_version_from_path(resolved_item_path)
-                        if version_str:
-                            name, vendor = get_jdk_name_and_vendor(resolved_item_path, version_str)
-                            is_item_jenv_managed = str(VERSIONS_DIR) in str(resolved_item_path)
-                            logger.info(f"discover_system_jdks: Found JDK: Name={name}, Version={version_str}, Path={resolved_item_path}, Vendor={vendor}, Managed={is_item_jenv_managed}")
-                            found_jdks.add(JdkInfo(version_str, name, resolved_item_path, vendor, is_item_jenv_managed))
-                            processed_paths.add(resolved_item_path)
-                        else:
-                            logger.debug(f"discover_system_jdks: Could not get version from {resolved_item_path}, though java exe exists.")
-                    else:
-                        logger.debug(f"discover_system_jdks: {java_exe_in_item} is not a file or does not exist. Not a JDK home.")
+        # base_path is either a JDK home itself or a directory of JDKs (e.g. /usr/lib/jvm)
+        base_str = str(base_path)
+        for directory, is_base in _candidate_dirs(base_str):
+            jdk_home = _jdk_home_from(directory, java_exe_name)
+            if jdk_home:
+                jdk_home = os.path.realpath(jdk_home)
+                if jdk_home in processed_homes:
+                    if debug_enabled:
+                        logger.debug(f"discover_system_jdks: JDK home {jdk_home} (from {directory}) already processed. Skipping.")
                 else:
-                    logger.debug(f"discover_system_jdks: Item {item} in {resolved_base_path} is not a directory. Skipping.")
-
-    sorted_jdks = sorted(list(found_jdks), key=lambda jdk: (jdk.version, jdk.name), reverse=True)
-    logger.debug(f"discover_system_jdks: Discovery finished. Found {len(sorted_jdks)} JDKs: {sorted_jdks}")
+                    if debug_enabled:
+                        logger.debug(f"discover_system_jdks: {jdk_home} is a JDK home. Queued for version probing.")
+                    candidate_paths.append(Path(jdk_home))
+                    processed_homes.add(jdk_home)
+                if is_base:
+                    break # Don't iterate inside if this base_path is a JDK itself
+            elif debug_enabled:
+                logger.debug(f"discover_system_jdks: {directory} has no bin/{java_exe_name}. Not a JDK home.")
+
+    versions_dir_resolved = VERSIONS_DIR.resolve() # Candidate paths are resolved too
+
+    # Reuse cached probe results for JDK homes that have not changed since they were last probed
+    version_cache = _load_version_cache()
+    probe_results: Dict[Path, Tuple[Optional[str], Optional[str]]] = {}
+    uncached_paths: List[Path] = []
+    cache_keys: Dict[Path, Optional[str]] = {}
+    for jdk_path in candidate_paths:
+        cache_key = _probe_cache_key(jdk_path, java_exe_name)
+        cache_keys[jdk_path] = cache_key
+        entry = version_cache.get(str(jdk_path))
+        if cache_key and entry and entry.get("key") == cache_key and entry.get("version"):
+            probe_results[jdk_path] = (entry["version"], entry.get("implementor"))
+        else:
+            uncached_paths.append(jdk_path)
+
+    # The release file answers for most JDKs; the rest need `java -version`, which is slow
+    # and I/O bound, so those JVMs are spawned concurrently on one event loop.
+    if uncached_paths:
+        fallback_paths: List[Path] = []
+        for jdk_path in uncached_paths:
+            probe_results[jdk_path] = _read_release_file(jdk_path)
+            if not probe_results[jdk_path][0]:
+                fallback_paths.append(jdk_path)
+        if fallback_paths:
+            fallback_versions = asyncio.run(_probe_all_async(fallback_paths, java_exe_name))
+            for jdk_path, version_str in zip(fallback_paths, fallback_versions):
+                probe_results[jdk_path] = (version_str, None)
+        for jdk_path in uncached_paths:
+            version_str, implementor = probe_results[jdk_path]
+            if version_str and cache_keys[jdk_path]:
+                version_cache[str(jdk_path)] = {"key": cache_keys[jdk_path], "version": version_str, "implementor": implementor}
+        _save_version_cache(version_cache)
+
+    for jdk_path in candidate_paths:
+        version_str, implementor = probe_results[jdk_path]
+        if not version_str:
+            if debug_enabled:
+                logger.debug(f"discover_system_jdks: Could not get version from {jdk_path}, though java exe exists.")
+            continue
+        name, vendor = get_jdk_name_and_vendor(jdk_path, version_str, implementor)
+        is_jenv_managed = _is_relative_to(jdk_path, versions_dir_resolved)
+        logger.info(f"discover_system_jdks: Found JDK: Name={name}, Version={version_str}, Path={jdk_path}, Vendor={vendor}, Managed={is_jenv_managed}")
+        found_jdks.add(JdkInfo(version_str, name, jdk_path, vendor, is_jenv_managed))
+
+    sorted_jdks = sorted(found_jdks, key=lambda jdk: jdk.sort_key, reverse=True)
+    if debug_enabled:
+        logger.debug(f"discover_system_jdks: Discovery finished. Found {len(sorted_jdks)} JDKs: {sorted_jdks}")
     return sorted_jdks
 
 if __name__ == "__main__":
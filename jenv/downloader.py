@@ -5,59 +5,356 @@ Supports multiple vendors and platforms.
 
 import platform
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import tarfile
 import zipfile
 import shutil
 import hashlib
+import re
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Tuple, Union
 import json
 import logging
 import subprocess
 import os
+import sys
 import tempfile
+import time
+import functools
+import contextlib
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from jenv.settings import VERSIONS_DIR
+from jenv.settings import VERSIONS_DIR, JENV_AVAILABLE_VERSIONS_CACHE_FILE, JENV_DOWNLOADS_DIR
+
+try:
+    import fcntl # POSIX only; installs are not locked against each other elsewhere
+except ImportError:
+    fcntl = None
+
+try:
+    # Optional: ISA-L's inflate is markedly faster than zlib for the large JDK tarballs
+    from isal import igzip
+except ImportError:
+    igzip = None
+
+try:
+    # Optional: libcurl runs the whole socket-to-file loop in C, over HTTP/2 where the server supports it
+    import pycurl
+except ImportError:
+    pycurl = None
+
+try:
+    # Optional: C-accelerated JSON decoding for API responses
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from the response per iteration; large chunks keep per-chunk Python overhead negligible
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Parallel HTTP Range requests used for large downloads from servers that accept them
+_RANGE_WORKERS = 6
+# libcurl gives up on a transfer slower than this many bytes per second for this many seconds
+_CURL_LOW_SPEED_LIMIT = 1024
+_CURL_LOW_SPEED_TIME = 30
+# JDK installs download_many runs at once; each large download already opens _RANGE_WORKERS connections
+_MAX_CONCURRENT_INSTALLS = 3
+# Below this size a single connection is fast enough to not be worth splitting
+_MIN_RANGE_DOWNLOAD_SIZE = 16 << 20
+# Extracts the file name from a Content-Disposition header
+_CD_FILENAME_RE = re.compile(r'filename\*?=([^;]+)')
+# Temurin package formats in order of preference; xz archives are the smallest download when offered
+_TEMURIN_EXTENSION_PREFERENCE = ('.tar.xz', '.tar.gz', '.zip')
+# Adoptium's API names for operating systems that get_system_info() names differently
+_ADOPTIUM_OS = {"macos": "mac"}
+# Written into a JDK's version directory once it is fully installed
+INSTALL_MANIFEST_NAME = ".jenv-manifest.json"
+# Seconds a fetched vendor release listing stays fresh; listings change on the order of weeks
+_AVAILABLE_VERSIONS_TTL = 24 * 3600
+
+def _create_session() -> requests.Session:
+    """
+    Builds the HTTP session shared by all downloaders, so metadata lookups, downloads and
+    parallel range requests reuse keep-alive connections instead of repeating TLS handshakes.
+    """
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': 'jenv/0.1.0 (Java Environment Manager)'
+    })
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.5))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+_SESSION = _create_session()
+
+@functools.lru_cache(maxsize=1)
+def _system_info() -> Tuple[str, str]:
+    """Normalized (os, arch) of this machine; constant for the life of the process."""
+    system = platform.system().lower()
+    machine = platform.machine().lower()
+    
+    # Normalize OS names
+    if system == "darwin":
+        system = "macos"
+    elif system == "windows":
+        system = "windows"
+    else:
+        system = "linux"
+    
+    # Normalize architecture names
+    if machine in ["x86_64", "amd64"]:
+        arch = "x64"
+    elif machine in ["aarch64", "arm64"]:
+        arch = "aarch64"
+    elif machine in ["i386", "i686"]:
+        arch = "x32"
+    else:
+        arch = machine
+        
+    return system, arch
+
+def _download_dir() -> Path:
+    """
+    Directory to download archives into. The system temp dir (which honours $TMPDIR) is used only when it
+    shares a filesystem with VERSIONS_DIR; a tmpfs /tmp would otherwise hold whole archives in RAM and
+    turn the final moves into copies.
+    """
+    temp_dir = Path(tempfile.gettempdir())
+    try:
+        if temp_dir.stat().st_dev == VERSIONS_DIR.stat().st_dev:
+            return temp_dir
+    except OSError:
+        pass
+    JENV_DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    return JENV_DOWNLOADS_DIR
+
+@contextlib.contextmanager
+def _install_lock(version_dir: Path):
+    """Holds an exclusive cross-process lock for installing into `version_dir` (a no-op without fcntl)."""
+    version_dir.parent.mkdir(parents=True, exist_ok=True)
+    with open(version_dir.with_name(f".{version_dir.name}.lock"), 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        yield
+
+def _read_install_manifest(version_dir: Path) -> Optional[Dict]:
+    """Returns the install manifest of `version_dir`, or None if it has none (incomplete or pre-manifest install)."""
+    try:
+        manifest = json.loads((version_dir / INSTALL_MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+def _is_jdk_installed(version_dir: Path, vendor: str, version: str, download_url: Optional[str] = None) -> bool:
+    """
+    True if `version_dir` holds a complete install of `vendor`'s JDK `version` (and, when the archive URL is
+    known without a network lookup, of that exact archive). Only a manifest proves an install finished:
+    a tree with bin/java but no manifest may be an interrupted extraction, so it is installed again.
+    """
+    manifest = _read_install_manifest(version_dir)
+    if manifest is None or manifest.get("vendor") != vendor or manifest.get("version") != version:
+        return False
+    return download_url is None or manifest.get("url") == download_url
+
+def _load_available_versions(vendor: str) -> Optional[List[str]]:
+    """Returns the cached release listing for `vendor` if it is younger than _AVAILABLE_VERSIONS_TTL."""
+    try:
+        entry = json.loads(JENV_AVAILABLE_VERSIONS_CACHE_FILE.read_text()).get(vendor)
+    except (OSError, ValueError, AttributeError):
+        return None
+    if not isinstance(entry, dict) or time.time() - entry.get("fetched_at", 0) > _AVAILABLE_VERSIONS_TTL:
+        return None
+    return entry.get("versions") or None
+
+def _save_available_versions(vendor: str, versions: List[str]):
+    """Stores a freshly fetched release listing for `vendor`, leaving other vendors' entries intact."""
+    try:
+        cache = json.loads(JENV_AVAILABLE_VERSIONS_CACHE_FILE.read_text())
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cache[vendor] = {"fetched_at": time.time(), "versions": versions}
+    try:
+        JENV_AVAILABLE_VERSIONS_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = JENV_AVAILABLE_VERSIONS_CACHE_FILE.with_name(f"{JENV_AVAILABLE_VERSIONS_CACHE_FILE.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(cache, separators=(",", ":")))
+        os.replace(tmp_file, JENV_AVAILABLE_VERSIONS_CACHE_FILE)
+    except OSError as e:
+        logger.debug(f"Could not write {JENV_AVAILABLE_VERSIONS_CACHE_FILE}: {e}")
+
 class DownloadError(Exception):
     """Raised when download or installation fails."""
     pass
 
+class _DownloadProgress:
+    """
+    Thread-safe byte counter that reports download progress: redrawn in place at each whole
+    percent on a terminal, or as one line per 10% when stdout is redirected (e.g. CI logs)
+    or several downloads share the terminal (in_place=False). Lines name the file being downloaded.
+    """
+
+    def __init__(self, total_size: int, label: str, in_place: bool = True):
+        self.total_size = total_size
+        self.label = label
+        self.downloaded = 0
+        self.last_progress = -1
+        self.interactive = in_place and sys.stdout.isatty()
+        self.step = 1 if self.interactive else 10
+        self._lock = threading.Lock()
+
+    def add(self, count: int):
+        with self._lock:
+            self.downloaded += count
+            if self.total_size > 0:
+                progress = min(self.downloaded * 100 // self.total_size, 100) // self.step * self.step
+                if progress != self.last_progress: # Only report when the next step is reached
+                    self.last_progress = progress
+                    if self.interactive:
+                        print(f"\r{self.label}: {progress}%", end="", flush=True)
+                    else:
+                        print(f"{self.label}: {progress}%", flush=True)
+
+class _ProgressReader:
+    """
+    File-like wrapper around a raw response stream that reports to a _DownloadProgress as it is read,
+    and feeds what it reads to `digest` if one is given.
+    """
+
+    def __init__(self, raw, progress: _DownloadProgress, digest=None):
+        self.raw = raw
+        self.progress = progress
+        self.digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self.progress.add(len(data))
+        if self.digest is not None:
+            self.digest.update(data)
+        return data
+
+def _preallocate(f, size: int):
+    """Reserves `size` bytes for the open file `f` up front so the filesystem can lay it out contiguously."""
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError: # e.g. filesystems without fallocate support
+            pass
+    f.truncate(size)
+
+def _file_sha256(path: Path) -> str:
+    """
+    Hex SHA-256 of a file, using hashlib.file_digest's zero-copy reads where available (3.11+).
+    Only for Range downloads, whose parts arrive out of order; single-stream downloads hash as they write.
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(block)
+        return digest.hexdigest()
+
+def _extract_tar_stripped(archive_path: Path, extract_to: Path, compression: str):
+    """
+    Extracts a compressed tar archive ('gz', 'xz' or 'bz2') into `extract_to`, dropping the archive's
+    top-level directory (e.g. jdk-17.0.5+8/bin/java -> <extract_to>/bin/java). The archive is read
+    once as a stream; gzip is decompressed with isal when it is installed.
+    """
+    extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    if compression == "gz" and igzip is not None:
+        with igzip.open(archive_path, 'rb') as gz_file, tarfile.open(fileobj=gz_file, mode='r|') as tar:
+            _extract_members_stripped(tar, extract_to, extract_kwargs)
+    else:
+        with tarfile.open(archive_path, f'r|{compression}') as tar:
+            _extract_members_stripped(tar, extract_to, extract_kwargs)
+
+def _extract_targz(archive_path: Path, extract_to: Path):
+    _extract_tar_stripped(archive_path, extract_to, "gz")
+
+def _extract_tarxz(archive_path: Path, extract_to: Path):
+    _extract_tar_stripped(archive_path, extract_to, "xz")
+
+def _extract_tarbz2(archive_path: Path, extract_to: Path):
+    _extract_tar_stripped(archive_path, extract_to, "bz2")
+
+def _extract_zip(archive_path: Path, extract_to: Path):
+    """
+    Extracts a zip entry by entry straight into `extract_to`, dropping the archive's top-level
+    directory as the tar extractors do. Unix permission bits stored in the archive are kept.
+    """
+    extract_to.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(archive_path, 'r') as zip_file:
+        for info in zip_file.infolist():
+            stripped_name = _strip_root(info.filename.replace('\\', '/'))
+            if not stripped_name:
+                continue # The top-level directory itself
+            if Path(stripped_name).anchor or '..' in stripped_name.split('/'): # e.g. 'jdk//etc/x' or 'jdk/../x'
+                raise DownloadError(f"Refusing to extract {info.filename}: path leaves the target directory")
+            target = extract_to / stripped_name
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with zip_file.open(info) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+            mode = info.external_attr >> 16
+            if mode & 0o111:
+                os.chmod(target, mode & 0o777)
+
+def _strip_root(name: str) -> str:
+    """Drops the first component of an archive path ('jdk-17/bin/java' -> 'bin/java'); '' for the root itself."""
+    name = name.lstrip('/')
+    while name.startswith('./'):
+        name = name[2:]
+    return name.partition('/')[2]
+
+def _extract_members_stripped(tar: tarfile.TarFile, extract_to: Path, extract_kwargs: Dict):
+    """
+    Extracts each member of a streamed tar into `extract_to` without its first path component.
+    One pass over the headers: nothing is listed up front with getmembers().
+    """
+    for member in tar:
+        stripped_name = _strip_root(member.name)
+        if not stripped_name:
+            continue # The top-level directory itself
+        member.name = stripped_name
+        if member.islnk(): # Hard link targets are archive paths, so they carry the same prefix
+            member.linkname = _strip_root(member.linkname)
+        tar.extract(member, extract_to, **extract_kwargs)
+
+# Archive extractors keyed by lower-cased trailing suffixes; see _extractor_for
+_EXTRACTORS = {
+    ('.tar', '.gz'): _extract_targz,
+    ('.tgz',): _extract_targz,
+    ('.tar', '.xz'): _extract_tarxz,
+    ('.tar', '.bz2'): _extract_tarbz2,
+    ('.zip',): _extract_zip,
+}
+
+def _extractor_for(archive_path: Path):
+    """Returns the extractor for an archive's extension (two suffixes, then one), or None if unsupported."""
+    suffixes = tuple(suffix.lower() for suffix in archive_path.suffixes[-2:])
+    return _EXTRACTORS.get(suffixes) or _EXTRACTORS.get(suffixes[-1:])
+
+
 class JdkDownloader:
     """Handles JDK downloads from various vendors."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'jenv/0.1.0 (Java Environment Manager)'
-        })
+        self.session = _SESSION
+        self._temurin_packages: Dict[Tuple[str, str, str], List[Dict]] = {}
+        self._concurrent_installs = False # Set by download_many: progress is then reported line by line
     
     def get_system_info(self) -> Tuple[str, str]:
         """Get current system OS and architecture."""
-        system = platform.system().lower()
-        machine = platform.machine().lower()
-        
-        # Normalize OS names
-        if system == "darwin":
-            system = "macos"
-        elif system == "windows":
-            system = "windows"
-        else:
-            system = "linux"
-        
-        # Normalize architecture names
-        if machine in ["x86_64", "amd64"]:
-            arch = "x64"
-        elif machine in ["aarch64", "arm64"]:
-            arch = "aarch64"
-        elif machine in ["i386", "i686"]:
-            arch = "x32"
-        else:
-            arch = machine
-            
-        return system, arch
+        return _system_info()
     
     def list_available_versions(self, vendor: str = "temurin") -> List[str]:
         """List available JDK versions for a vendor."""
@@ -74,14 +371,19 @@ class JdkDownloader:
             return []
     
     def _list_temurin_versions(self) -> List[str]:
-        """List available Temurin versions from Adoptium API."""
+        """List available Temurin versions from Adoptium API, reusing a listing fetched within the last day."""
+        cached_versions = _load_available_versions("temurin")
+        if cached_versions:
+            return cached_versions
         url = "https://api.adoptium.net/v3/info/available_releases"
         try:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _json_loads(response.content)
             versions = data.get("available_lts_releases", []) + data.get("available_releases", [])
-            return sorted(set(str(v) for v in versions), key=int, reverse=True)
+            versions = sorted(set(str(v) for v in versions), key=int, reverse=True)
+            _save_available_versions("temurin", versions)
+            return versions
         except Exception as e:
             logger.error(f"Failed to fetch Temurin versions: {e}")
             return ["8", "11", "17", "21"]  # Fallback to common LTS versions
@@ -96,10 +398,57 @@ class JdkDownloader:
         
         # Create version directory
         version_dir = VERSIONS_DIR / f"{vendor}-{version}"
-        if version_dir.exists() and not force:
+        known_url = self._known_download_url(version, vendor, system, arch)
+        if not force and _is_jdk_installed(version_dir, vendor, version, known_url):
             logger.info(f"JDK {vendor}-{version} already installed")
             return version_dir
         
+        # Serializes concurrent installs of the same JDK, so one never deletes the tree another is extracting
+        with _install_lock(version_dir):
+            if not force and _is_jdk_installed(version_dir, vendor, version, known_url):
+                logger.info(f"JDK {vendor}-{version} was installed by another jenv process")
+                return version_dir
+            return self._install_jdk(version, vendor, system, arch, version_dir)
+    
+    async def download_jdk_async(self, version: str, vendor: str = "temurin", force: bool = False) -> Path:
+        """Async form of download_jdk; the blocking install runs in the event loop's default thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.download_jdk, version, vendor, force))
+    
+    def download_many(self, specs: List[Tuple[str, str]], force: bool = False) -> List[Union[Path, Exception]]:
+        """
+        Download and install several (version, vendor) JDKs concurrently over the shared session,
+        at most _MAX_CONCURRENT_INSTALLS at a time. Returns, in the order of `specs`, each install path
+        or the exception that install raised.
+        """
+        async def install(limit: asyncio.Semaphore, version: str, vendor: str) -> Path:
+            async with limit:
+                return await self.download_jdk_async(version, vendor, force)
+        
+        async def install_all():
+            limit = asyncio.Semaphore(_MAX_CONCURRENT_INSTALLS) # Created on the running loop, as Python 3.8/3.9 require
+            return await asyncio.gather(*(install(limit, version, vendor) for version, vendor in specs), return_exceptions=True)
+        
+        self._concurrent_installs = True
+        try:
+            return asyncio.run(install_all())
+        finally:
+            self._concurrent_installs = False
+    
+    def _known_download_url(self, version: str, vendor: str, system: str, arch: str) -> Optional[str]:
+        """
+        The archive URL for a JDK when it is fixed locally (OpenJDK), or None when finding it
+        takes a network lookup (Temurin resolves the latest GA release through the Adoptium API).
+        """
+        if vendor.lower() != "openjdk":
+            return None
+        try:
+            return self._get_openjdk_download_url(version, system, arch)[0]
+        except DownloadError:
+            return None
+    
+    def _install_jdk(self, version: str, vendor: str, system: str, arch: str, version_dir: Path) -> Path:
+        """Download and extract a JDK into `version_dir`, replacing whatever is there."""
         logger.info(f"Downloading {vendor} JDK {version} for {system}-{arch}")
         
         try:
@@ -110,19 +459,23 @@ class JdkDownloader:
             else:
                 raise DownloadError(f"Vendor {vendor} not supported")
             
-            # Download the JDK
-            archive_path = self._download_file(download_url, filename)
+            # Download the JDK, checked against the vendor's published SHA-256 when there is one
+            expected_sha256 = self._get_expected_sha256(vendor.lower(), download_url, filename, version, system, arch)
+            archive_path, archive_sha256 = self._download_verified(download_url, filename, expected_sha256)
             
-            # Extract to version directory
+            # Extract to version directory, which the extractors create themselves
             if version_dir.exists():
                 shutil.rmtree(version_dir)
-            version_dir.mkdir(parents=True, exist_ok=True)
             
             self._extract_archive(archive_path, version_dir)
             
             # Clean up download
             archive_path.unlink()
             
+            # Records where this install came from; written last, so it marks a complete install
+            manifest = {"vendor": vendor, "version": version, "url": download_url, "sha256": archive_sha256, "system": system, "arch": arch, "installed_at": time.time()}
+            (version_dir / INSTALL_MANIFEST_NAME).write_text(json.dumps(manifest, indent=1))
+            
             logger.info(f"Successfully installed {vendor} JDK {version} to {version_dir}")
             return version_dir
             
@@ -131,9 +484,61 @@ class JdkDownloader:
                 shutil.rmtree(version_dir, ignore_errors=True)
             raise DownloadError(f"Failed to download {vendor} JDK {version}: {e}")
     
+    def _get_expected_sha256(self, vendor: str, download_url: str, filename: str, version: str, system: str, arch: str) -> Optional[str]:
+        """
+        Get the SHA-256 the vendor publishes for a JDK archive, or None if it cannot be fetched.
+        Temurin lists it in the Adoptium assets API; jdk.java.net serves it next to the archive.
+        """
+        try:
+            if vendor == "temurin":
+                packages = self._get_temurin_packages(version, system, arch)
+                checksum = next((package.get("checksum") for package in packages if package.get("name") == filename), None)
+            else:
+                response = self.session.get(f"{download_url}.sha256", timeout=10)
+                response.raise_for_status()
+                checksum = response.text.split()[0] if response.text.strip() else None
+        except Exception as e:
+            logger.warning(f"Could not fetch SHA-256 for {vendor} JDK {version}; the download will not be verified: {e}")
+            return None
+        if checksum is None or not re.fullmatch(r'[0-9a-fA-F]{64}', checksum):
+            logger.warning(f"No usable SHA-256 published for {vendor} JDK {version}; the download will not be verified")
+            return None
+        return checksum.lower()
+    
+    def _download_verified(self, url: str, filename: str, expected_sha256: Optional[str], attempts: int = 2) -> Tuple[Path, str]:
+        """Download a file and check its SHA-256, downloading again on a mismatch. Returns (path, sha256)."""
+        for attempt in range(1, attempts + 1):
+            archive_path, actual_sha256 = self._download_file(url, filename)
+            if expected_sha256 is None or actual_sha256 == expected_sha256:
+                return archive_path, actual_sha256
+            archive_path.unlink()
+            logger.warning(f"SHA-256 mismatch for {filename} (attempt {attempt}/{attempts}): expected {expected_sha256}, got {actual_sha256}")
+        raise DownloadError(f"Downloaded {filename} does not match its published SHA-256")
+    
+    def _get_temurin_packages(self, version: str, system: str, arch: str) -> List[Dict]:
+        """Get the JDK packages (name, link, checksum, ...) Adoptium lists for the latest GA release, once per instance."""
+        key = (version, system, arch)
+        if key not in self._temurin_packages:
+            api_url = f"https://api.adoptium.net/v3/assets/latest/{version}/hotspot"
+            params = {"architecture": arch, "image_type": "jdk", "os": _ADOPTIUM_OS.get(system, system), "vendor": "eclipse"}
+            response = self.session.get(api_url, params=params, timeout=10)
+            response.raise_for_status()
+            self._temurin_packages[key] = [asset["binary"]["package"] for asset in _json_loads(response.content)]
+        return self._temurin_packages[key]
+    
     def _get_temurin_download_url(self, version: str, system: str, arch: str) -> Tuple[str, str]:
-        """Get Temurin download URL from Adoptium API."""
-        api_url = f"https://api.adoptium.net/v3/binary/latest/{version}/ga/{system}/{arch}/jdk/hotspot/normal/eclipse"
+        """Get Temurin download URL from Adoptium API, preferring the smallest archive format offered."""
+        try:
+            packages = self._get_temurin_packages(version, system, arch)
+        except Exception as e:
+            logger.debug(f"Adoptium assets lookup failed, falling back to the binary redirect: {e}")
+            packages = []
+        for extension in _TEMURIN_EXTENSION_PREFERENCE:
+            for package in packages:
+                if package.get("name", "").endswith(extension) and package.get("link"):
+                    return package["link"], package["name"]
+        
+        api_url = f"https://api.adoptium.net/v3/binary/latest/{version}/ga/{_ADOPTIUM_OS.get(system, system)}/{arch}/jdk/hotspot/normal/eclipse"
         
         try:
             # Get redirect URL which contains the actual download URL
@@ -143,9 +548,8 @@ class JdkDownloader:
                 # Extract filename from Content-Disposition header or URL
                 filename = None
                 if 'content-disposition' in response.headers:
-                    import re
                     cd = response.headers['content-disposition']
-                    filename_match = re.search(r'filename[*]?=([^;]+)', cd)
+                    filename_match = _CD_FILENAME_RE.search(cd)
                     if filename_match:
                         filename = filename_match.group(1).strip('"\'')
                 
@@ -190,62 +594,142 @@ class JdkDownloader:
         
         return download_url, filename
     
-    def _download_file(self, url: str, filename: str) -> Path:
-        """Download a file from URL."""
-        download_path = Path(tempfile.gettempdir()) / filename
+    def _download_file(self, url: str, filename: str) -> Tuple[Path, str]:
+        """
+        Download a file from URL, splitting it into parallel Range requests when the server allows it.
+        Returns (path, sha256).
+        """
+        download_path = _download_dir() / filename
         
         try:
             logger.info(f"Downloading {filename}...")
-            response = self.session.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            
-            with open(download_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total_size > 0:
-                            progress = (downloaded / total_size) * 100
-                            print(f"\rProgress: {progress:.1f}%", end="", flush=True)
+            try:
+                head = self.session.head(url, allow_redirects=True, timeout=10)
+            except requests.RequestException as e:
+                # HEAD only probes for Range support; some servers and proxies refuse it but serve GET fine
+                logger.debug(f"HEAD request for {filename} failed, downloading over a single connection: {e}")
+                head = None
+            total_size = int(head.headers.get('content-length', 0)) if head is not None else 0
+            if (head is not None and head.ok and head.headers.get('accept-ranges', '').lower() == 'bytes'
+                    and total_size >= _MIN_RANGE_DOWNLOAD_SIZE):
+                downloaded, sha256 = self._download_ranges(head.url, download_path, total_size)
+            else:
+                downloaded, sha256 = self._download_stream(url, download_path)
             
-            print()  # New line after progress
+            if sys.stdout.isatty() and not self._concurrent_installs:
+                print()  # New line after the in-place progress
             logger.info(f"Downloaded {filename} ({downloaded} bytes)")
-            return download_path
+            return download_path, sha256
             
         except Exception as e:
             if download_path.exists():
                 download_path.unlink()
             raise DownloadError(f"Failed to download {filename}: {e}")
     
+    def _download_stream(self, url: str, download_path: Path) -> Tuple[int, str]:
+        """Download `url` over a single connection. Returns the number of bytes written and their SHA-256."""
+        if pycurl is not None:
+            return self._download_stream_curl(url, download_path)
+        response = self.session.get(url, stream=True, timeout=30)
+        response.raise_for_status()
+        
+        response.raw.decode_content = True # Undo any Content-Encoding, as iter_content would
+        total_size = int(response.headers.get('content-length', 0))
+        progress = _DownloadProgress(total_size, download_path.name, not self._concurrent_installs)
+        digest = hashlib.sha256()
+        
+        # copyfileobj keeps the read/write loop out of the per-chunk generator machinery of iter_content
+        with open(download_path, 'wb') as f:
+            if total_size > 0 and 'content-encoding' not in response.headers: # Otherwise the size on disk is unknown
+                _preallocate(f, total_size)
+            shutil.copyfileobj(_ProgressReader(response.raw, progress, digest), f, DOWNLOAD_CHUNK_SIZE)
+            f.truncate() # Drop any unused preallocated tail if the body came up short
+        return progress.downloaded, digest.hexdigest()
+    
+    def _download_stream_curl(self, url: str, download_path: Path) -> Tuple[int, str]:
+        """
+        Download `url` with libcurl writing into the file, hashing each block as it is written.
+        Returns the number of bytes written and their SHA-256.
+        """
+        progress = _DownloadProgress(0, download_path.name, not self._concurrent_installs)
+        digest = hashlib.sha256()
+        
+        def report(download_total, downloaded, upload_total, uploaded):
+            if download_total and not progress.total_size:
+                progress.total_size = download_total
+            if downloaded > progress.downloaded:
+                progress.add(downloaded - progress.downloaded)
+        
+        curl = pycurl.Curl()
+        try:
+            with open(download_path, 'wb') as f:
+                def write(data: bytes):
+                    f.write(data)
+                    digest.update(data)
+                
+                curl.setopt(pycurl.URL, url)
+                curl.setopt(pycurl.FOLLOWLOCATION, True)
+                curl.setopt(pycurl.FAILONERROR, True) # HTTP errors raise, like raise_for_status()
+                curl.setopt(pycurl.CONNECTTIMEOUT, 30)
+                # Abort a stalled transfer, as the read timeout does on the requests path
+                curl.setopt(pycurl.LOW_SPEED_LIMIT, _CURL_LOW_SPEED_LIMIT)
+                curl.setopt(pycurl.LOW_SPEED_TIME, _CURL_LOW_SPEED_TIME)
+                http2 = getattr(pycurl, 'CURL_HTTP_VERSION_2TLS', None) # Missing from older pycurl builds
+                if http2 is not None:
+                    try:
+                        curl.setopt(pycurl.HTTP_VERSION, http2)
+                    except pycurl.error: # libcurl built without HTTP/2 support
+                        pass
+                curl.setopt(pycurl.USERAGENT, self.session.headers['User-Agent'])
+                curl.setopt(pycurl.WRITEFUNCTION, write)
+                curl.setopt(pycurl.NOPROGRESS, False)
+                curl.setopt(pycurl.XFERINFOFUNCTION, report)
+                curl.perform()
+        finally:
+            curl.close()
+        return progress.downloaded, digest.hexdigest()
+    
+    def _download_ranges(self, url: str, download_path: Path, total_size: int) -> Tuple[int, str]:
+        """
+        Download `url` as _RANGE_WORKERS concurrent byte ranges into a preallocated file.
+        Returns the number of bytes written and their SHA-256.
+        """
+        with open(download_path, 'wb') as f:
+            _preallocate(f, total_size)
+        
+        progress = _DownloadProgress(total_size, download_path.name, not self._concurrent_installs)
+        part_size = -(-total_size // _RANGE_WORKERS) # Ceiling division
+        ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [executor.submit(self._download_range, url, download_path, start, end, progress) for start, end in ranges]
+            for future in futures:
+                future.result() # Re-raises the first failure
+        
+        if progress.downloaded != total_size:
+            raise DownloadError(f"Expected {total_size} bytes but received {progress.downloaded}")
+        # The ranges arrive out of order, so unlike the single-stream downloads this can't hash as it
+        # writes: the finished file is read back once instead
+        return progress.downloaded, _file_sha256(download_path)
+    
+    def _download_range(self, url: str, download_path: Path, start: int, end: int, progress: _DownloadProgress):
+        """Download bytes start..end (inclusive) of `url` into the same offsets of `download_path`."""
+        response = self.session.get(url, headers={'Range': f'bytes={start}-{end}'}, stream=True, timeout=30)
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise DownloadError(f"Server ignored the Range request for bytes {start}-{end}")
+        
+        with open(download_path, 'r+b') as f:
+            f.seek(start)
+            shutil.copyfileobj(_ProgressReader(response.raw, progress), f, DOWNLOAD_CHUNK_SIZE)
+    
     def _extract_archive(self, archive_path: Path, extract_to: Path):
-        """Extract tar.gz or zip archive."""
+        """Extract a tar.gz, tar.xz, tar.bz2 or zip archive."""
         try:
-            if archive_path.suffix == '.gz' and archive_path.suffixes[-2:] == ['.tar', '.gz']:
-                # tar.gz file
-                with tarfile.open(archive_path, 'r:gz') as tar:
-                    # Get the root directory name to handle nested structure
-                    members = tar.getmembers()
-                    if members:
-                        root_dir = members[0].name.split('/')[0]
-                        tar.extractall(extract_to.parent)
-                        # Move contents from nested directory to target directory
-                        nested_dir = extract_to.parent / root_dir
-                        if nested_dir.exists() and nested_dir != extract_to:
-                            shutil.move(str(nested_dir), str(extract_to))
-            elif archive_path.suffix == '.zip':
-                # zip file
-                with zipfile.ZipFile(archive_path, 'r') as zip_file:
-                    zip_file.extractall(extract_to.parent)
-                    # Handle nested directory structure
-                    extracted_items = list(extract_to.parent.iterdir())
-                    nested_dirs = [item for item in extracted_items if item.is_dir() and item.name != extract_to.name]
-                    if nested_dirs:
-                        shutil.move(str(nested_dirs[0]), str(extract_to))
-            else:
+            extractor = _extractor_for(archive_path)
+            if extractor is None:
                 raise DownloadError(f"Unsupported archive format: {archive_path}")
+            # Every extractor lands the archive's contents directly in extract_to, without its nested root directory
+            extractor(archive_path, extract_to)
                 
             logger.info(f"Extracted {archive_path.name} to {extract_to}")
             
@@ -257,10 +741,7 @@ class MavenDownloader:
     """Handles Maven downloads."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'jenv/0.1.0 (Java Environment Manager)'
-        })
+        self.session = _SESSION
     
     def list_available_versions(self) -> List[str]:
         """List available Maven versions."""
@@ -284,10 +765,9 @@ class MavenDownloader:
             # Download Maven
             archive_path = self._download_file(download_url, filename)
             
-            # Extract to version directory
+            # Extract to version directory, which the extractor creates itself
             if maven_dir.exists():
                 shutil.rmtree(maven_dir)
-            maven_dir.mkdir(parents=True, exist_ok=True)
             
             self._extract_maven(archive_path, maven_dir)
             
@@ -304,17 +784,20 @@ class MavenDownloader:
     
     def _download_file(self, url: str, filename: str) -> Path:
         """Download a file from URL."""
-        download_path = Path(tempfile.gettempdir()) / filename
+        download_path = _download_dir() / filename
         
         try:
             logger.info(f"Downloading {filename}...")
             response = self.session.get(url, stream=True, timeout=30)
             response.raise_for_status()
             
+            response.raw.decode_content = True # Undo any Content-Encoding, as iter_content would
+            total_size = int(response.headers.get('content-length', 0))
             with open(download_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+                if total_size > 0 and 'content-encoding' not in response.headers: # Otherwise the size on disk is unknown
+                    _preallocate(f, total_size)
+                shutil.copyfileobj(response.raw, f, DOWNLOAD_CHUNK_SIZE)
+                f.truncate() # Drop any unused preallocated tail if the body came up short
             
             logger.info(f"Downloaded {filename}")
             return download_path
@@ -327,16 +810,9 @@ class MavenDownloader:
     def _extract_maven(self, archive_path: Path, extract_to: Path):
         """Extract Maven tar.gz archive."""
         try:
-            with tarfile.open(archive_path, 'r:gz') as tar:
-                # Extract to parent directory first
-                tar.extractall(extract_to.parent)
-                
-                # Find the extracted directory and move it
-                for item in extract_to.parent.iterdir():
-                    if item.is_dir() and item.name.startswith('apache-maven-') and item != extract_to:
-                        shutil.move(str(item), str(extract_to))
-                        break
-                        
+            # Strips the apache-maven-<version>/ root directory while extracting
+            _extract_targz(archive_path, extract_to)
+            
             logger.info(f"Extracted Maven to {extract_to}")
             
         except Exception as e:
@@ -1,20 +1,25 @@
 
 import typer
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple
 from pathlib import Path
 import os
 import platform
 import logging
 import sys
+import functools
+import json
+import shutil
+import subprocess
+import threading
+import zlib
 
 from rich.console import Console
-from rich.table import Table
 
 from jenv import __version__ as jenv_app_version
-from jenv.discovery import discover_system_jdks, JdkInfo, get_java_version_from_path, get_jdk_name_and_vendor
-from jenv.settings import JENV_VERSION_ENV_VAR, JENV_VERSION_FILE, JENV_GLOBAL_VERSION_FILE, JENV_DIR, JENV_CUSTOM_PATHS_FILE
+from jenv.discovery import discover_system_jdks, JdkInfo, get_java_version_and_implementor, get_jdk_name_and_vendor
+from jenv.settings import ensure_dirs, JENV_VERSION_ENV_VAR, JENV_VERSION_FILE, JENV_GLOBAL_VERSION_FILE, JENV_DIR, JENV_CUSTOM_PATHS_FILE
 from jenv.util import read_version_file, write_version_file, get_active_jdk_path_from_env
-from jenv.downloader import JdkDownloader, MavenDownloader, DownloadError
+from jenv.shim import index_jdks, lookup_jdk, find_local_version_file, is_executable_file, find_executable, resolve_active_jdk_home
 
 
 
@@ -29,62 +34,188 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_IS_WINDOWS = platform.system() == "Windows" # Fixed for the process; platform.system() goes through uname()
+
+# Discovery is the costliest step of every command and several helpers need its result, so it runs
+# at most once per CLI invocation. main_callback clears the cache when an invocation starts.
+_discovery_cache = functools.lru_cache(maxsize=1)(discover_system_jdks) # Still reachable for cache_clear() when tests patch the name below
+_discovery_lock = threading.Lock() # A caller arriving mid-prefetch waits for that result instead of rescanning
+
+
+def discover_system_jdks() -> List[JdkInfo]:
+    with _discovery_lock:
+        return _discovery_cache()
+
+
+# Commands that look at discovered JDKs; main_callback starts discovery for them in the background
+# so it overlaps with Typer parsing the subcommand and the command's own setup.
+_DISCOVERY_COMMANDS = frozenset({"version", "versions", "list", "global", "local", "shell", "which", "rehash", "internal"})
+
+
+def _prefetch_discovery() -> None:
+    try:
+        discover_system_jdks()
+    except Exception as e: # The command's own call retries and reports it
+        logger.debug(f"Background JDK discovery failed: {e}")
+
+# The environment variables commands consult, read once per invocation (refreshed in main_callback).
+# JENV_LOG_LEVEL is left out: logging is configured at import, before any snapshot exists.
+_SNAPSHOT_ENV_VARS = (JENV_VERSION_ENV_VAR, "SHELL", "PSModulePath", "COMSPEC")
+
+
+def _take_env_snapshot() -> Dict[str, Optional[str]]:
+    return {name: os.environ.get(name) for name in _SNAPSHOT_ENV_VARS}
+
+
+_ENV_SNAPSHOT = _take_env_snapshot()
+
+
+@functools.lru_cache(maxsize=1)
+def _discovered_jdk_index() -> Tuple[Dict[str, JdkInfo], Dict[str, JdkInfo]]:
+    """Discovered JDKs keyed by name and by path string, built once per invocation alongside discovery."""
+    return index_jdks(discover_system_jdks())
+
+
+def _looks_like_path(version_name: str) -> bool:
+    """True if a version argument could be a path, so plain names like 'temurin-17' skip Path.resolve()."""
+    return (os.sep in version_name or (os.altsep is not None and os.altsep in version_name)
+            or version_name.startswith(("~", ".")))
+
+
+def _find_discovered_jdk(name_or_path: str) -> Optional[JdkInfo]:
+    """Looks up a discovered JDK by its jenv name or its path string, as stored in version files."""
+    return lookup_jdk(_discovered_jdk_index(), name_or_path)
 
-def get_currently_active_jdk() -> Optional[JdkInfo]:
-    jenv_version_env = os.environ.get(JENV_VERSION_ENV_VAR)
-    if jenv_version_env:
-        current_java_home = get_active_jdk_path_from_env()
-        if current_java_home:
-            version = get_java_version_from_path(current_java_home)
-            if version:
-                discovered_jdks = discover_system_jdks()
-                for jdk in discovered_jdks:
-                    if jdk.path == current_java_home:
-                        if jdk.name == jenv_version_env or str(jdk.path) == jenv_version_env:
-                            return JdkInfo(version=jdk.version, name=f"{jdk.name} (shell: JENV_VERSION)", path=jdk.path, vendor=jdk.vendor, is_jenv_managed=jdk.is_jenv_managed)
-                name, vendor = get_jdk_name_and_vendor(current_java_home, version)
-                return JdkInfo(version=version, name=f"{name} (shell: JENV_VERSION)", path=current_java_home, vendor=vendor)
-
-    current_dir = Path.cwd()
-    jenv_version_path = None
-    while current_dir != current_dir.parent:
-        if (current_dir / JENV_VERSION_FILE).exists():
-            jenv_version_path = current_dir / JENV_VERSION_FILE
-            break
-        current_dir = current_dir.parent
-    if (current_dir / JENV_VERSION_FILE).exists():
-        jenv_version_path = current_dir / JENV_VERSION_FILE
-
-    if jenv_version_path:
-        local_version_name = read_version_file(jenv_version_path)
-        if local_version_name:
-            discovered_jdks = discover_system_jdks()
-            for jdk in discovered_jdks:
-                if jdk.name == local_version_name or str(jdk.path) == local_version_name:
-                    return JdkInfo(version=jdk.version, name=f"{jdk.name} (local: {jenv_version_path})", path=jdk.path, vendor=jdk.vendor, is_jenv_managed=jdk.is_jenv_managed)
-
-    if JENV_GLOBAL_VERSION_FILE.exists():
-        global_version_name = read_version_file(JENV_GLOBAL_VERSION_FILE)
-        if global_version_name:
-            discovered_jdks = discover_system_jdks()
-            for jdk in discovered_jdks:
-                if jdk.name == global_version_name or str(jdk.path) == global_version_name:
-                    return JdkInfo(version=jdk.version, name=f"{jdk.name} (global: {JENV_GLOBAL_VERSION_FILE})", path=jdk.path, vendor=jdk.vendor, is_jenv_managed=jdk.is_jenv_managed)
 
+def _ensure_dir(path: Path) -> None:
+    # A stat is enough in the usual case where the directory exists; mkdir would fail with EEXIST
+    if not path.is_dir():
+        path.mkdir(parents=True, exist_ok=True)
+
+
+def _match_jdk(version_name: str) -> Optional[JdkInfo]:
+    """
+    Finds the discovered JDK a user-supplied version argument refers to: by exact name, then by path,
+    then by unique partial match on version or name (e.g. "17" matches "temurin-17.0.5").
+    Exits with an error listing the candidates if a partial match is ambiguous.
+    """
+    by_name, by_path = _discovered_jdk_index()
+
+    # Try to match by name first, then by path if the argument looks like one
+    target_jdk = by_name.get(version_name)
+    if not target_jdk and _looks_like_path(version_name):
+        try:
+            target_jdk = by_path.get(os.fspath(Path(version_name).resolve()))
+        except Exception: # Not a valid path or other error
+            pass
+    if target_jdk:
+        return target_jdk
+
+    # Try partial version matching
+    potential_matches = [jdk for jdk in discover_system_jdks() if version_name in jdk.version or version_name in jdk.name]
+    if len(potential_matches) > 1:
+        err_console.print(f"Ambiguous version '{version_name}'. Multiple JDKs found:")
+        for match in potential_matches:
+            err_console.print(f"  - {match.name} ({match.version}) at {match.path}")
+        err_console.print("Please be more specific.")
+        raise typer.Exit(code=1)
+    return potential_matches[0] if potential_matches else None
+
+
+def _relabel(jdk: JdkInfo, source: str) -> JdkInfo:
+    """Copy of a discovered JDK whose name records where the active version came from."""
+    return jdk._replace(name=f"{jdk.name} ({source})")
+
+
+def _jdk_at_java_home(source: str, expected_name: Optional[str] = None) -> Optional[JdkInfo]:
+    """
+    The JDK JAVA_HOME points to, labelled with source. Its discovered entry is reused when there is one
+    (and, if expected_name is given, it matches by name or path); otherwise name and vendor are resolved.
+    """
     current_java_home = get_active_jdk_path_from_env()
-    if current_java_home:
-        version = get_java_version_from_path(current_java_home)
-        if version:
-            name, vendor = get_jdk_name_and_vendor(current_java_home, version)
-            discovered_jdks = discover_system_jdks()
-            for jdk in discovered_jdks:
-                if jdk.path == current_java_home:
-                    return JdkInfo(version=jdk.version, name=f"{jdk.name} (JAVA_HOME)", path=jdk.path, vendor=jdk.vendor, is_jenv_managed=jdk.is_jenv_managed)
-            return JdkInfo(version=version, name=f"{name} (JAVA_HOME)", path=current_java_home, vendor=vendor)
+    if not current_java_home:
+        return None
+    version, implementor = get_java_version_and_implementor(current_java_home)
+    if not version:
+        return None
+    jdk = _discovered_jdk_index()[1].get(os.fspath(current_java_home))
+    if jdk and (expected_name is None or expected_name in (jdk.name, os.fspath(jdk.path))):
+        return _relabel(jdk, source)
+    name, vendor = get_jdk_name_and_vendor(current_java_home, version, implementor)
+    return JdkInfo(version=version, name=f"{name} ({source})", path=current_java_home, vendor=vendor)
+
 
+def _resolve_from_env() -> Optional[JdkInfo]:
+    jenv_version_env = _ENV_SNAPSHOT[JENV_VERSION_ENV_VAR]
+    return _jdk_at_java_home("shell: JENV_VERSION", jenv_version_env) if jenv_version_env else None
+
+
+def _resolve_from_local() -> Optional[JdkInfo]:
+    jenv_version_path = find_local_version_file(Path.cwd())
+    local_version_name = read_version_file(jenv_version_path) if jenv_version_path else None
+    jdk = _find_discovered_jdk(local_version_name) if local_version_name else None
+    return _relabel(jdk, f"local: {jenv_version_path}") if jdk else None
+
+
+def _resolve_from_global() -> Optional[JdkInfo]:
+    global_version_name = read_version_file(JENV_GLOBAL_VERSION_FILE) # None if the file doesn't exist
+    jdk = _find_discovered_jdk(global_version_name) if global_version_name else None
+    return _relabel(jdk, f"global: {JENV_GLOBAL_VERSION_FILE}") if jdk else None
+
+
+def _resolve_from_java_home() -> Optional[JdkInfo]:
+    return _jdk_at_java_home("JAVA_HOME")
+
+
+# Where the active JDK can come from, highest precedence first
+_ACTIVE_JDK_RESOLVERS = (_resolve_from_env, _resolve_from_local, _resolve_from_global, _resolve_from_java_home)
+
+
+@functools.lru_cache(maxsize=1) # Once per invocation; cleared by main_callback and _forget_active_jdk
+def get_currently_active_jdk() -> Optional[JdkInfo]:
+    for resolver in _ACTIVE_JDK_RESOLVERS:
+        active_jdk = resolver()
+        if active_jdk:
+            return active_jdk
     return None
 
 
+@functools.lru_cache(maxsize=1)
+def _get_active_jdk_path() -> Optional[Path]:
+    """
+    Path of the active JDK, using the same precedence as get_currently_active_jdk
+    (JENV_VERSION -> local file -> global file -> JAVA_HOME) but without building a JdkInfo,
+    so no vendor/name resolution is done. Shared with the jenv-exec shim.
+    """
+    return resolve_active_jdk_home(_ENV_SNAPSHOT[JENV_VERSION_ENV_VAR], _find_discovered_jdk)
+
+
+def _forget_active_jdk() -> None:
+    """Drops the memoized active JDK, after a command changes which version is selected."""
+    get_currently_active_jdk.cache_clear()
+    _get_active_jdk_path.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _system_java_version() -> Optional[str]:
+    """
+    First line of `java -version` for the java on PATH, or None if there is none.
+    Checks PATH with shutil.which first so the common "no java at all" case spawns nothing.
+    """
+    java_on_path = shutil.which("java")
+    if not java_on_path:
+        return None
+    # Don't allocate a console window for the child on Windows
+    creationflags = subprocess.CREATE_NO_WINDOW if _IS_WINDOWS else 0
+    try:
+        result = subprocess.run([java_on_path, "-version"], capture_output=True, text=True, timeout=2, creationflags=creationflags)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    # java -version prints to stderr
+    output = result.stderr.strip()
+    return output.splitlines()[0] if output else "N/A"
+
+
 @app.command(name="version", help="Show the currently active Java version and how it was set.")
 def current_version():
     """
@@ -97,13 +228,10 @@ def current_version():
         console.print(f"  Path: {active_jdk.path}")
     else:
         # Try to get system `java -version` directly if no JAVA_HOME is set or jenv managed.
-        try:
-            result = subprocess.run(["java", "-version"], capture_output=True, text=True, timeout=2)
-            # java -version prints to stderr
-            output = result.stderr.strip()
-            first_line = output.splitlines()[0] if output.splitlines() else "N/A"
+        first_line = _system_java_version()
+        if first_line:
             console.print(f"System Java (not managed by jenv, from PATH): [bold cyan]{first_line}[/bold cyan]")
-        except (FileNotFoundError, subprocess.TimeoutExpired):
+        else:
             err_console.print("No active Java version found (JAVA_HOME not set, jenv not configured, or 'java' not in PATH).")
 
 
@@ -115,8 +243,10 @@ def list_versions(
     """
     Lists all Java versions discovered by jenv.
     """
+    from rich.table import Table # Only this command renders a table
+
     jdks = discover_system_jdks()
-    active_jdk_info = get_currently_active_jdk() # Get info about the truly active one
+    active_path = _get_active_jdk_path() # Only the path is needed to mark the active row
 
     if not jdks:
         console.print("No Java versions discovered. Try 'jenv scan' or configure search paths.")
@@ -131,23 +261,16 @@ def list_versions(
         table.add_column("Path", style="green")
         table.add_column("Managed", style="blue")
 
+    # Pick the row shape once instead of branching on `verbose` for every JDK
+    if verbose:
+        def build_row(jdk: JdkInfo, marker: str):
+            return (marker, jdk.version, jdk.name, jdk.vendor or "N/A", os.fspath(jdk.path), "Yes" if jdk.is_jenv_managed else "No")
+    else:
+        def build_row(jdk: JdkInfo, marker: str):
+            return (marker, jdk.version, jdk.name)
+
     for jdk in jdks:
-        is_active_marker = "*" if active_jdk_info and jdk.path == active_jdk_info.path else ""
-        if verbose:
-            table.add_row(
-                is_active_marker,
-                jdk.version,
-                jdk.name,
-                jdk.vendor if jdk.vendor else "N/A",
-                str(jdk.path),
-                "Yes" if jdk.is_jenv_managed else "No"
-            )
-        else:
-            table.add_row(
-                is_active_marker,
-                jdk.version,
-                jdk.name
-            )
+        table.add_row(*build_row(jdk, "*" if jdk.path == active_path else ""))
     console.print(table)
 
 @app.command(name="global", help="Set or show the global Java version.")
@@ -162,12 +285,7 @@ def set_global_version(
         current_global_name = read_version_file(JENV_GLOBAL_VERSION_FILE)
         if current_global_name:
             # Resolve and display more info
-            discovered_jdks = discover_system_jdks()
-            found_jdk = None
-            for jdk in discovered_jdks:
-                if jdk.name == current_global_name or str(jdk.path) == current_global_name:
-                    found_jdk = jdk
-                    break
+            found_jdk = _find_discovered_jdk(current_global_name)
             if found_jdk:
                 console.print(f"Current global jenv version: [bold green]{found_jdk.name}[/bold green] (Version: {found_jdk.version}, Path: {found_jdk.path})")
             else:
@@ -176,43 +294,11 @@ def set_global_version(
             console.print("No global jenv version is set. Use 'jenv global <version_name_or_path>' to set one.")
         return
 
-    discovered_jdks = discover_system_jdks()
-    target_jdk: Optional[JdkInfo] = None
-
-    # Try to match by name first, then by path prefix/exact match if name is a path
-    for jdk in discovered_jdks:
-        if jdk.name == version_name:
-            target_jdk = jdk
-            break
-    if not target_jdk:
-        # Try path matching if version_name looks like a path
-        try:
-            path_from_arg = Path(version_name).resolve()
-            for jdk in discovered_jdks:
-                if jdk.path == path_from_arg:
-                    target_jdk = jdk
-                    break
-        except Exception: # Not a valid path or other error
-            pass
-
-    # Try partial version matching (e.g., "17" should match "temurin-17.0.5")
-    if not target_jdk:
-        potential_matches = []
-        for jdk in discovered_jdks:
-            if version_name in jdk.version or version_name in jdk.name:
-                potential_matches.append(jdk)
-        if len(potential_matches) == 1:
-            target_jdk = potential_matches[0]
-        elif len(potential_matches) > 1:
-            err_console.print(f"Ambiguous version '{version_name}'. Multiple JDKs found:")
-            for match in potential_matches:
-                err_console.print(f"  - {match.name} ({match.version}) at {match.path}")
-            err_console.print("Please be more specific.")
-            raise typer.Exit(code=1)
-
+    target_jdk = _match_jdk(version_name)
 
     if target_jdk:
         write_version_file(JENV_GLOBAL_VERSION_FILE, target_jdk.name) # Store by its jenv-known name
+        _forget_active_jdk()
         console.print(f"Global jenv version set to: [bold green]{target_jdk.name}[/bold green] (Version {target_jdk.version})")
         console.print(f"Path: {target_jdk.path}")
         console.print("Note: This sets the jenv global default. You may need to run 'jenv init -' or similar")
@@ -223,6 +309,17 @@ def set_global_version(
         raise typer.Exit(code=1)
 
 
+def _reset_invocation_state():
+    """Drops what one command invocation memoized, so the next one in the same process starts fresh."""
+    global _ENV_SNAPSHOT
+    # Under the lock, so a previous invocation's prefetch still scanning can't store its result after the clear
+    with _discovery_lock:
+        _discovery_cache.cache_clear() # Each invocation sees the JDKs as they are now
+        _discovered_jdk_index.cache_clear()
+    _forget_active_jdk() # Working directory and environment may differ between invocations in one process
+    _ENV_SNAPSHOT = _take_env_snapshot()
+
+
 def _version_callback(value: bool):
     if value:
         console.print(f"jenv version: {jenv_app_version} - Crafted with ❤️ by Cheikh Tidiane")
@@ -230,13 +327,17 @@ def _version_callback(value: bool):
 
 @app.callback()
 def main_callback(
+    ctx: typer.Context,
     version: Optional[bool] = typer.Option(None, "--version", callback=_version_callback, is_eager=True, help="Show the application version and exit.")
 ):
     """
     jenv: A Java Environment Manager.
     Manages multiple Java Development Kit (JDK) installations.
     """
-    JENV_DIR.mkdir(parents=True, exist_ok=True) # Ensure base directory exists
+    _reset_invocation_state()
+    if ctx.invoked_subcommand in _DISCOVERY_COMMANDS:
+        # Daemon, so commands that never end up needing the result don't wait for it on exit
+        threading.Thread(target=_prefetch_discovery, name="jenv-discovery", daemon=True).start()
 
 
 @app.command(name="local", help="Set or show the local Java version (for the current directory).")
@@ -248,12 +349,14 @@ def set_local_version(
     Sets or shows the local Java version by creating or reading a .jenv-version file
     in the current directory. This version overrides the global version.
     """
-    local_version_file_path = Path.cwd() / JENV_VERSION_FILE
+    cwd = Path.cwd()
+    local_version_file_path = cwd / JENV_VERSION_FILE
 
     if unset:
         if local_version_file_path.exists():
             try:
                 local_version_file_path.unlink()
+                _forget_active_jdk()
                 console.print(f"Local version configuration removed: {local_version_file_path}")
             except OSError as e:
                 err_console.print(f"Error removing {local_version_file_path}: {e}")
@@ -264,26 +367,12 @@ def set_local_version(
 
     if version_name is None:
         # Traverse upwards to find .jenv-version
-        current_dir = Path.cwd()
-        found_config_path: Optional[Path] = None
-        while current_dir != current_dir.parent: # Stop at root
-            if (current_dir / JENV_VERSION_FILE).exists():
-                found_config_path = current_dir / JENV_VERSION_FILE
-                break
-            current_dir = current_dir.parent
-        if (current_dir / JENV_VERSION_FILE).exists(): # Check root dir as well
-             found_config_path = current_dir / JENV_VERSION_FILE
-
+        found_config_path = find_local_version_file(cwd)
         if found_config_path:
             current_local_name = read_version_file(found_config_path)
             if current_local_name:
                 # Resolve and display more info
-                discovered_jdks = discover_system_jdks()
-                found_jdk = None
-                for jdk in discovered_jdks:
-                    if jdk.name == current_local_name or str(jdk.path) == current_local_name:
-                        found_jdk = jdk
-                        break
+                found_jdk = _find_discovered_jdk(current_local_name)
                 if found_jdk:
                     console.print(f"Local jenv version (from {found_config_path}): [bold green]{found_jdk.name}[/bold green] (Version: {found_jdk.version}, Path: {found_jdk.path})")
                 else:
@@ -296,42 +385,12 @@ def set_local_version(
         return
 
     # Setting a new local version
-    discovered_jdks = discover_system_jdks()
-    target_jdk: Optional[JdkInfo] = None
-
-    # Try to match by name first
-    for jdk in discovered_jdks:
-        if jdk.name == version_name:
-            target_jdk = jdk
-            break
-    if not target_jdk: # Then by path
-        try:
-            path_from_arg = Path(version_name).resolve()
-            for jdk in discovered_jdks:
-                if jdk.path == path_from_arg:
-                    target_jdk = jdk
-                    break
-        except Exception:
-            pass
-
-    # Try partial version matching
-    if not target_jdk:
-        potential_matches = []
-        for jdk in discovered_jdks:
-            if version_name in jdk.version or version_name in jdk.name:
-                potential_matches.append(jdk)
-        if len(potential_matches) == 1:
-            target_jdk = potential_matches[0]
-        elif len(potential_matches) > 1:
-            err_console.print(f"Ambiguous version '{version_name}'. Multiple JDKs found:")
-            for match in potential_matches:
-                err_console.print(f"  - {match.name} ({match.version}) at {match.path}")
-            err_console.print("Please be more specific.")
-            raise typer.Exit(code=1)
+    target_jdk = _match_jdk(version_name)
 
     if target_jdk:
         write_version_file(local_version_file_path, target_jdk.name) # Store by its jenv-known name
-        console.print(f"Local jenv version for directory [bold cyan]{Path.cwd()}[/bold cyan] set to: [bold green]{target_jdk.name}[/bold green] (Version {target_jdk.version})")
+        _forget_active_jdk()
+        console.print(f"Local jenv version for directory [bold cyan]{cwd}[/bold cyan] set to: [bold green]{target_jdk.name}[/bold green] (Version {target_jdk.version})")
         console.print(f"Created/updated: {local_version_file_path}")
         console.print("Note: For this to take effect, jenv's shell integration (e.g., 'eval \"$(jenv init -)\"') must be active.")
     else:
@@ -360,15 +419,10 @@ def set_shell_version(
         return
 
     if version_name is None:
-        shell_ver_name = os.environ.get(JENV_VERSION_ENV_VAR)
+        shell_ver_name = _ENV_SNAPSHOT[JENV_VERSION_ENV_VAR]
         if shell_ver_name:
             # Resolve and display more info
-            discovered_jdks = discover_system_jdks()
-            found_jdk = None
-            for jdk in discovered_jdks: # Match by name or path
-                if jdk.name == shell_ver_name or str(jdk.path) == shell_ver_name:
-                    found_jdk = jdk
-                    break
+            found_jdk = _find_discovered_jdk(shell_ver_name) # Match by name or path
             if found_jdk:
                 console.print(f"Current shell jenv version ({JENV_VERSION_ENV_VAR}): [bold green]{found_jdk.name}[/bold green] (Version: {found_jdk.version}, Path: {found_jdk.path})")
             else:
@@ -378,31 +432,7 @@ def set_shell_version(
             console.print("Use 'jenv shell <version_name_or_path>' to set one (requires shell integration).")
         return
 
-    discovered_jdks = discover_system_jdks()
-    target_jdk: Optional[JdkInfo] = None
-    # Match logic (similar to global/local)
-    for jdk in discovered_jdks:
-        if jdk.name == version_name:
-            target_jdk = jdk
-            break
-    if not target_jdk:
-        try:
-            path_from_arg = Path(version_name).resolve()
-            for jdk in discovered_jdks:
-                if jdk.path == path_from_arg:
-                    target_jdk = jdk
-                    break
-        except Exception: pass
-
-    if not target_jdk:
-        potential_matches = []
-        for jdk in discovered_jdks:
-            if version_name in jdk.version or version_name in jdk.name:
-                potential_matches.append(jdk)
-        if len(potential_matches) == 1: target_jdk = potential_matches[0]
-        elif len(potential_matches) > 1:
-            err_console.print(f"Ambiguous version '{version_name}'. Multiple JDKs found. Please be more specific.")
-            raise typer.Exit(code=1)
+    target_jdk = _match_jdk(version_name)
 
     if target_jdk:
         console.print(f"To activate JDK '{target_jdk.name}' (Version {target_jdk.version}) for the current shell:")
@@ -425,37 +455,85 @@ def which_command(
     Displays the full path to an executable (java, javac, etc.)
     based on the currently active jenv version.
     """
-    active_jdk = get_currently_active_jdk()
+    active_jdk_path = _get_active_jdk_path()
 
-    if not active_jdk:
+    if not active_jdk_path:
         err_console.print("No active Java version found or jenv not fully configured.")
         err_console.print("Try setting a version with 'jenv global/local/shell <version>' or ensure 'java' is in your system PATH.")
         raise typer.Exit(code=1)
 
-    # Determine executable extension for Windows
-    executable_name = command_name
-    if platform.system() == "Windows":
-        # Common Java executables might not always have .exe explicitly, but check for it
-        if not command_name.endswith(".exe"):
-            executable_name = f"{command_name}.exe"
-
-    cmd_path = active_jdk.path / "bin" / executable_name
-
-    if cmd_path.is_file() and os.access(str(cmd_path), os.X_OK):
-        console.print(str(cmd_path))
-    else:
-        # Fallback for Windows if .exe wasn't initially provided for commands like 'java'
-        if platform.system() == "Windows" and not command_name.endswith(".exe"):
-            cmd_path_no_ext = active_jdk.path / "bin" / command_name
-            if cmd_path_no_ext.is_file() and os.access(str(cmd_path_no_ext), os.X_OK):
-                 console.print(str(cmd_path_no_ext))
-                 return
-
-        err_console.print(f"Executable '{command_name}' not found in the bin directory of the active JDK: {active_jdk.name} ({active_jdk.path})")
+    # On Windows, command_name.exe is tried before command_name
+    cmd_path = find_executable(os.path.join(active_jdk_path, "bin"), command_name)
+    if not cmd_path:
+        err_console.print(f"Executable '{command_name}' not found in the bin directory of the active JDK: {active_jdk_path}")
         raise typer.Exit(code=1)
+    console.print(cmd_path)
 
 SUPPORTED_SHELLS = ["bash", "zsh", "fish", "powershell", "cmd"] # cmd is for Windows Command Prompt
 
+# Per-shell init script bodies. Only the paths vary between invocations; everything else is a constant.
+_POSIX_SHELL_FUNCTIONS = [
+    'jenv_shell_set() {',
+    '  export JENV_VERSION="$1"',
+    '}',
+    'jenv_shell_unset() {',
+    '  unset JENV_VERSION',
+    '}',
+]
+
+def _posix_init(jenv_dir: Path, shims_dir: Path, jenv_bin_dir: Path) -> List[str]:
+    return [
+        f'export JENV_DIR="{jenv_dir}"',
+        f'export PATH="{shims_dir}:{jenv_bin_dir}:$PATH"',  # Fixed PATH format
+        *_POSIX_SHELL_FUNCTIONS,
+    ]
+
+_FISH_SHELL_FUNCTIONS = [
+    '# To be implemented: function for jenv shell, JAVA_HOME',
+    '# function jenv_shell_set; set -gx JENV_VERSION $argv[1]; end',
+    '# function jenv_shell_unset; functions -e jenv_shell_set; set -e JENV_VERSION; end',
+]
+
+def _fish_init(jenv_dir: Path, shims_dir: Path, jenv_bin_dir: Path) -> List[str]:
+    return [
+        f'set -gx JENV_DIR "{jenv_dir}"',
+        f'fish_add_path -mP "{shims_dir}"',
+        f'fish_add_path -mP "{jenv_bin_dir}"',
+        *_FISH_SHELL_FUNCTIONS,
+    ]
+
+_POWERSHELL_SHELL_FUNCTIONS = [
+    '# PowerShell integration needs more work, especially for `jenv shell`',
+    '# function Set-JenvShellVersion { param($Version) $Env:JENV_VERSION = $Version }',
+    '# function Clear-JenvShellVersion { Remove-Item Env:\\JENV_VERSION }',
+]
+
+def _powershell_init(jenv_dir: Path, shims_dir: Path, jenv_bin_dir: Path) -> List[str]:
+    return [
+        f'$Env:JENV_DIR = "{jenv_dir}"',
+        f'$Env:PATH = "{shims_dir};{jenv_bin_dir};" + $Env:PATH',
+        *_POWERSHELL_SHELL_FUNCTIONS,
+    ]
+
+def _cmd_init(jenv_dir: Path, shims_dir: Path, jenv_bin_dir: Path) -> List[str]:
+    # CMD is tricky for robust PATH modification and functions.
+    # Usually done by a .bat file that `call`s another to set env vars.
+    return [
+        '@echo off',
+        f'set "JENV_DIR={jenv_dir}"',
+        f'set "PATH={shims_dir};{jenv_bin_dir};%PATH%"',
+        '@REM For jenv shell, you might need a helper jenv.bat in PATH that sets JENV_VERSION',
+        '@REM and then calls the actual java. This is complex for CMD.',
+    ]
+
+_INIT_SCRIPTS = {
+    "bash": _posix_init,
+    "zsh": _posix_init,
+    "fish": _fish_init,
+    "powershell": _powershell_init,
+    "cmd": _cmd_init,
+}
+
 @app.command(name="init", help="Set up jenv for your shell. Run 'eval \"$(jenv init <shell_name>)\"' for POSIX shells.")
 def init_shell(
     shell_name: Optional[str] = typer.Argument(None, help=f"The shell to initialize for. Supported: {', '.join(SUPPORTED_SHELLS)}. Auto-detects if not provided.")
@@ -471,78 +549,100 @@ def init_shell(
     """
     detected_shell = ""
     if not shell_name:
-        shell_env = os.environ.get("SHELL")
+        shell_env = _ENV_SNAPSHOT["SHELL"]
         if shell_env:
             detected_shell = Path(shell_env).name
-        elif platform.system() == "Windows":
+        elif _IS_WINDOWS:
             # Powershell often has $env:PSModulePath, CMD has COMSPEC
-            if os.environ.get("PSModulePath"):
+            if _ENV_SNAPSHOT["PSModulePath"]:
                 detected_shell = "powershell"
-            elif os.environ.get("COMSPEC"):
+            elif _ENV_SNAPSHOT["COMSPEC"]:
                 detected_shell = "cmd"
 
         if detected_shell not in SUPPORTED_SHELLS:
-            err_console.print(f"Could not auto-detect a supported shell. Please specify one: {', '.join(SUPPORTED_SHELLS)}")
+            print(f"Could not auto-detect a supported shell. Please specify one: {', '.join(SUPPORTED_SHELLS)}", file=sys.stderr)
             raise typer.Exit(1)
-        err_console.print(f"# Auto-detected shell: {detected_shell}") # Print to stderr
+        # Plain stderr write: nothing here needs Rich, and this runs on every shell startup
+        print(f"# Auto-detected shell: {detected_shell}", file=sys.stderr)
         shell_name = detected_shell
 
     if shell_name not in SUPPORTED_SHELLS:
-        err_console.print(f"Unsupported shell: {shell_name}. Supported shells are: {', '.join(SUPPORTED_SHELLS)}")
+        print(f"Unsupported shell: {shell_name}. Supported shells are: {', '.join(SUPPORTED_SHELLS)}", file=sys.stderr)
         raise typer.Exit(1)
 
     shims_dir = JENV_DIR / "shims"
     jenv_bin_dir = JENV_DIR / "bin" # Assuming jenv might place its own script here eventually
 
     output_lines = [f"# jenv initialization script for {shell_name}"]
-
-    
-    if shell_name in ["bash", "zsh"]:
-        output_lines.extend([
-            f'export JENV_DIR="{JENV_DIR}"',
-            f'export PATH="{shims_dir}:{jenv_bin_dir}:$PATH"',  # Fixed PATH format
-            'jenv_shell_set() {',
-            '  export JENV_VERSION="$1"',
-            '}',
-            'jenv_shell_unset() {',
-            '  unset JENV_VERSION',
-            '}',
-        ])
-    elif shell_name == "fish":
-        output_lines.extend([
-            f'set -gx JENV_DIR "{JENV_DIR}"',
-            f'fish_add_path -mP "{shims_dir}"',
-            f'fish_add_path -mP "{jenv_bin_dir}"',
-            '# To be implemented: function for jenv shell, JAVA_HOME',
-            '# function jenv_shell_set; set -gx JENV_VERSION $argv[1]; end',
-            '# function jenv_shell_unset; functions -e jenv_shell_set; set -e JENV_VERSION; end',
-        ])
-    elif shell_name == "powershell":
-        output_lines.extend([
-            f'$Env:JENV_DIR = "{JENV_DIR}"',
-            f'$Env:PATH = "{shims_dir};{jenv_bin_dir};" + $Env:PATH',
-            '# PowerShell integration needs more work, especially for `jenv shell`',
-            '# function Set-JenvShellVersion { param($Version) $Env:JENV_VERSION = $Version }',
-            '# function Clear-JenvShellVersion { Remove-Item Env:\\JENV_VERSION }',
-        ])
-    elif shell_name == "cmd":
-        # CMD is tricky for robust PATH modification and functions.
-        # Usually done by a .bat file that `call`s another to set env vars.
-        output_lines.extend([
-            f'@echo off',
-            f'set "JENV_DIR={JENV_DIR}"',
-            f'set "PATH={shims_dir};{jenv_bin_dir};%PATH%"',
-            f'@REM For jenv shell, you might need a helper jenv.bat in PATH that sets JENV_VERSION',
-            f'@REM and then calls the actual java. This is complex for CMD.'
-        ])
+    output_lines.extend(_INIT_SCRIPTS[shell_name](JENV_DIR, shims_dir, jenv_bin_dir))
 
     # Ensure the shims and bin directories exist
-    shims_dir.mkdir(parents=True, exist_ok=True)
-    jenv_bin_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(shims_dir)
+    _ensure_dir(jenv_bin_dir)
+
+    # Print the script to stdout in one render pass
+    console.print("\n".join(output_lines))
+
+# This is a placeholder for where the `jenv` executable is.
+# In a real installation, this path would be resolved correctly (e.g. sys.executable if jenv is a script, or a known install path)
+# For development, this is tricky. If we run `poetry run jenv rehash`, the shims need to call `jenv` not `poetry run jenv`.
+# This implies `jenv` must be installed in a way that it's directly on the PATH.
+# Shims call the lightweight `jenv-exec` entry point (jenv.shim), which skips loading Typer and Rich;
+# 'jenv internal exec' stays available for shims generated by older versions.
+_SHIM_JENV_EXECUTABLE = "jenv-exec"
+
+# Shim contents, pre-encoded; the POSIX one has {command_name} substituted per command
+_SHIM_POSIX_TEMPLATE = f"""#!/usr/bin/env sh
+# jenv shim for {{command_name}}
+# Generated by 'jenv rehash'
+set -e
+exec "{_SHIM_JENV_EXECUTABLE}" "{{command_name}}" "$@"
+""".encode()
+
+# The .bat shim finds its command name through %~n0, so it is identical for every command
+_SHIM_CMD_CONTENT = f"""@echo off
+REM jenv shim for %~n0
+REM Generated by 'jenv rehash'
+"{_SHIM_JENV_EXECUTABLE}" "%~n0" %*
+""".replace("\n", "\r\n").encode()
+
+# Recorded in the rehash cache so that changing what shims contain forces a rewrite
+_SHIM_CONTENT_KEY = f"{zlib.crc32(_SHIM_POSIX_TEMPLATE + _SHIM_CMD_CONTENT):08x}"
+
+
+def _write_shim(shim_path: Path, content: bytes) -> None:
+    """
+    Writes a shim with a single os.open/os.write. The executable mode is set at creation,
+    which saves a separate chmod; existing shims were created executable already.
+    """
+    fd = os.open(shim_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o755)
+    try:
+        os.write(fd, content)
+    finally:
+        os.close(fd)
+
+
+def _load_shim_cache(cache_file: Path) -> Dict[str, dict]:
+    """Loads the last rehash result per JDK bin dir, returning an empty cache if missing or corrupt."""
+    try:
+        cache = json.loads(cache_file.read_text())
+    except (OSError, ValueError) as e:
+        logger.debug(f"_load_shim_cache: No usable cache at {cache_file} ({e}).")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_shim_cache(cache_file: Path, cache: Dict[str, dict]) -> None:
+    """Writes the shim cache atomically, dropping entries whose bin dir no longer exists."""
+    live_entries = {bin_dir: entry for bin_dir, entry in cache.items() if os.path.isdir(bin_dir)}
+    try:
+        _ensure_dir(cache_file.parent)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps(live_entries, indent=1, sort_keys=True))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.debug(f"_save_shim_cache: Could not write {cache_file}: {e}")
 
-    # Print the script to stdout
-    for line in output_lines:
-        console.print(line)
 
 @app.command(name="rehash", help="Re-generates jenv shims for Java executables.")
 def rehash_shims():
@@ -552,83 +652,78 @@ def rehash_shims():
     (Typically added by 'eval \"$(jenv init your_shell)\"').
     """
     shims_dir = JENV_DIR / "shims"
-    shims_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(shims_dir)
 
     # TODO: Enhance this list, possibly by scanning JDK bin dirs
 
-    active_jdk = get_currently_active_jdk()
+    active_jdk_path = _get_active_jdk_path()
     commands_to_shim = []
-
-    if active_jdk:
-        jdk_bin_dir = active_jdk.path / "bin"
-        if jdk_bin_dir.is_dir():
-            for item in jdk_bin_dir.iterdir():
-                if item.is_file() and os.access(str(item), os.X_OK):
+    # Bin dir listings already shimmed, keyed by the dir's mtime: adding or removing a tool changes it,
+    # so an unchanged bin dir whose shims all still exist needs no rewrite
+    shim_cache_file = JENV_DIR / "cache" / "shims.json"
+    shim_cache = {}
+    bin_dir_key = None
+
+    if active_jdk_path:
+        jdk_bin_dir = active_jdk_path / "bin"
+        try:
+            bin_dir_mtime_ns = os.stat(jdk_bin_dir).st_mtime_ns
+        except OSError:
+            bin_dir_mtime_ns = None
+        if bin_dir_mtime_ns is not None:
+            shim_cache = _load_shim_cache(shim_cache_file)
+            bin_dir_key = os.fspath(jdk_bin_dir)
+            cached = shim_cache.get(bin_dir_key)
+            if (cached and cached.get("mtime_ns") == bin_dir_mtime_ns and cached.get("shim_content") == _SHIM_CONTENT_KEY
+                    and isinstance(cached.get("commands"), list)):
+                existing_shims = set(os.listdir(shims_dir))
+                if all(command_name in existing_shims for command_name in cached["commands"]):
+                    console.print(f"No shims needed: {len(cached['commands'])} shims in {shims_dir} are up to date.")
+                    return
+        try:
+            # One directory read, then at most one stat per entry
+            with os.scandir(jdk_bin_dir) as entries:
+                present_names = set()
+                executable_names = set()
+                for entry in entries:
+                    present_names.add(entry.name)
+                    if not is_executable_file(entry):
+                        continue
                     # Add executables, excluding potential .bat or .cmd on non-Windows
-                    if platform.system() == "Windows":
-                       if item.name.endswith(".exe") or "." not in item.name:
-                             commands_to_shim.append(item.name.replace(".exe", "")) # 
+                    if _IS_WINDOWS:
+                        if entry.name.endswith(".exe") or "." not in entry.name:
+                            executable_names.add(entry.name.replace(".exe", ""))
                     else: # Linux/macOS
-                        if "." not in item.name or item.name.endswith(".sh"): # Avoid shimming e.g. .dylib or other non-direct executables
-                             commands_to_shim.append(item.name)
-            common_java_commands = ["java", "javac", "jar", "javadoc", "javap", "jps", "jstat", "jconsole", "jdb", "jshell"]
-            for cmd in common_java_commands:
-                if cmd not in commands_to_shim and (jdk_bin_dir / cmd).exists():
-                    commands_to_shim.append(cmd)
-            commands_to_shim = sorted(list(set(commands_to_shim))) # Unique and sorted
+                        if "." not in entry.name or entry.name.endswith(".sh"): # Avoid shimming e.g. .dylib or other non-direct executables
+                            executable_names.add(entry.name)
+        except OSError:
+            present_names = executable_names = set()
+        common_java_commands = {"java", "javac", "jar", "javadoc", "javap", "jps", "jstat", "jconsole", "jdb", "jshell"}
+        commands_to_shim = sorted(executable_names | (common_java_commands & present_names)) # Unique and sorted
 
     if not commands_to_shim: # Fallback if no active JDK or bin dir is empty/unreadable
         logger.warning("No active JDK found or its bin directory is inaccessible. Using a default list of commands for shims.")
         commands_to_shim = ["java", "javac", "jar", "javadoc", "javap", "jps", "jstat", "jconsole", "jdb", "jshell"]
 
-
-    # This is a placeholder for where the `jenv` executable is.
-    # In a real installation, this path would be resolved correctly (e.g. sys.executable if jenv is a script, or a known install path)
-    # For development, this is tricky. If we run `poetry run jenv rehash`, the shims need to call `jenv` not `poetry run jenv`.
-    # This implies `jenv` must be installed in a way that it's directly on the PATH.
-    jenv_executable_in_shim = "jenv"
-
-    shim_template_posix = f"""#!/usr/bin/env sh
-# jenv shim for {{command_name}}
-# Generated by 'jenv rehash'
-set -e
-exec "{jenv_executable_in_shim}" internal exec "{{command_name}}" "$@"
-"""
-
-    shim_template_windows_bat = f"""@echo off
-REM jenv shim for %~n0
-REM Generated by 'jenv rehash'
-"{jenv_executable_in_shim}" internal exec "%~n0" %*
-"""
-
     created_shims = 0
     updated_shims = 0
+    existing_shims = set(os.listdir(shims_dir)) # One directory read instead of a stat per shim
 
     for command_name in commands_to_shim:
         shim_path = shims_dir / command_name
-        is_update = shim_path.exists()
+        is_update = command_name in existing_shims
+        shim_content_posix = _SHIM_POSIX_TEMPLATE.replace(b"{command_name}", command_name.encode())
 
         try:
-            if platform.system() == "Windows":
+            if _IS_WINDOWS:
                 # Create a .bat shim as well for Windows for commands that might be called without .exe
-                # The primary shim (no extension) might also work if shims_dir is in PATH and PATHEXT includes empty.
-                bat_shim_path = shims_dir / f"{command_name}.bat"
-                shim_content_bat = shim_template_windows_bat # Uses %~n0 for command name
-
-                # Write the .bat shim
-                with open(bat_shim_path, "w") as f:
-                    f.write(shim_content_bat)
+                # The primary shim (no extension) is still written for POSIX-style shells such as Git Bash.
+                _write_shim(shims_dir / f"{command_name}.bat", _SHIM_CMD_CONTENT)
                 
                 if not command_name.endswith('.bat'): # Avoid double .bat.bat
-                    with open(shim_path, "w") as f: # 
-                         f.write(shim_template_posix.format(command_name=command_name))
-
-
+                    _write_shim(shim_path, shim_content_posix)
             else: # POSIX systems
-                shim_content_posix = shim_template_posix.format(command_name=command_name)
-                with open(shim_path, "w") as f:
-                    f.write(shim_content_posix)
-                os.chmod(shim_path, 0o755) # rwxr-xr-x
+                _write_shim(shim_path, shim_content_posix) # rwxr-xr-x
 
             if is_update:
                 updated_shims +=1
@@ -637,6 +732,10 @@ REM Generated by 'jenv rehash'
         except Exception as e:
             err_console.print(f"Failed to create/update shim for {command_name}: {e}")
 
+    if bin_dir_key and (created_shims + updated_shims) == len(commands_to_shim):
+        shim_cache[bin_dir_key] = {"mtime_ns": bin_dir_mtime_ns, "shim_content": _SHIM_CONTENT_KEY, "commands": commands_to_shim}
+        _save_shim_cache(shim_cache_file, shim_cache)
+
     if created_shims or updated_shims:
         console.print(f"Rehashed {created_shims+updated_shims} shims ({created_shims} new, {updated_shims} updated) in {shims_dir}.")
     else:
@@ -661,19 +760,22 @@ def scan_jdks(
     """
     custom_paths_file = JENV_CUSTOM_PATHS_FILE
     current_custom_paths: List[Path] = [] # Use a different variable name
+    custom_paths_data = b""
 
     # Ensure JENV_DIR exists
-    JENV_DIR.mkdir(parents=True, exist_ok=True)
+    ensure_dirs()
 
-    if custom_paths_file.exists():
-        try:
-            with open(custom_paths_file, "r") as f:
-                for line in f:
-                    path_str = line.strip()
-                    if path_str and not path_str.startswith("#"):
-                        current_custom_paths.append(Path(path_str))
-        except IOError as e:
-            err_console.print(f"Error reading custom paths file {custom_paths_file}: {e}")
+    try:
+        # One read for the whole file, kept as bytes: paths are OS bytes, so only the kept lines are decoded
+        # (with fsdecode, which also round-trips undecodable filenames). Blank lines and comments are skipped.
+        custom_paths_data = custom_paths_file.read_bytes()
+        current_custom_paths = [Path(os.fsdecode(path_bytes)) for line in custom_paths_data.splitlines()
+                                if (path_bytes := line.strip()) and not path_bytes.startswith(b"#")]
+    except FileNotFoundError:
+        pass
+    except IOError as e:
+        err_console.print(f"Error reading custom paths file {custom_paths_file}: {e}")
+    custom_path_strs = {str(p) for p in current_custom_paths} # For O(1) membership checks below
 
     path_management_action = False # Flag to indicate if add/remove was performed
 
@@ -684,13 +786,14 @@ def scan_jdks(
             raise typer.Exit(code=1)
 
         abs_add_path = add_path.resolve()
-        if abs_add_path not in current_custom_paths:
+        if str(abs_add_path) not in custom_path_strs:
             current_custom_paths.append(abs_add_path)
-            current_custom_paths.sort() # Keep paths sorted
+            custom_path_strs.add(str(abs_add_path))
             try:
-                with open(custom_paths_file, "w") as f:
-                    for p in current_custom_paths:
-                        f.write(str(p) + "\n")
+                # Append just the new entry; the listing below is sorted for display instead
+                separator = b"\n" if custom_paths_data and not custom_paths_data.endswith(b"\n") else b""
+                with open(custom_paths_file, "ab") as f:
+                    f.write(separator + os.fsencode(abs_add_path) + b"\n")
                 console.print(f"Added custom search path: {abs_add_path}")
             except IOError as e:
                 err_console.print(f"Error writing to custom paths file {custom_paths_file}: {e}")
@@ -701,12 +804,11 @@ def scan_jdks(
     if remove_path:
         path_management_action = True
         abs_remove_path = remove_path.resolve()
-        if abs_remove_path in current_custom_paths:
+        if str(abs_remove_path) in custom_path_strs:
             current_custom_paths.remove(abs_remove_path)
+            custom_path_strs.discard(str(abs_remove_path))
             try:
-                with open(custom_paths_file, "w") as f:
-                    for p in current_custom_paths:
-                        f.write(str(p) + "\n")
+                custom_paths_file.write_bytes(b"".join(os.fsencode(p) + b"\n" for p in current_custom_paths)) # One write for the whole list
                 console.print(f"Removed custom search path: {abs_remove_path}")
                 if not current_custom_paths and custom_paths_file.exists():
                     custom_paths_file.unlink()
@@ -720,8 +822,7 @@ def scan_jdks(
     if list_paths_flag or path_management_action:
         console.print("\nConfigured custom search paths:")
         if current_custom_paths:
-            for p in current_custom_paths:
-                console.print(f"  - {p}")
+            console.print("\n".join(f"  - {p}" for p in sorted(current_custom_paths))) # One render pass for the list
         else:
             console.print("  No custom search paths configured.")
         # If any path management was done (add/remove) OR if only list_paths was specified, then exit.
@@ -768,80 +869,84 @@ def internal_exec_command(
         err_console.print("jenv: Please set a version using 'jenv global/local/shell <version>'.")
         raise typer.Exit(code=127) # Command not found exit code
 
-    # Determine executable extension for Windows
-    executable_name_to_find = command_name
-    if platform.system() == "Windows" and not command_name.lower().endswith(".exe"):
-        executable_name_to_find = f"{command_name}.exe"
-
-    cmd_path = active_jdk.path / "bin" / executable_name_to_find
-
-    if not (cmd_path.is_file() and os.access(str(cmd_path), os.X_OK)):
-        # Fallback for Windows if .exe wasn't initially provided
-        if platform.system() == "Windows" and executable_name_to_find.lower().endswith(".exe"):
-            cmd_path_no_ext = active_jdk.path / "bin" / command_name
-            if cmd_path_no_ext.is_file() and os.access(str(cmd_path_no_ext), os.X_OK):
-                cmd_path = cmd_path_no_ext
-            else:
-                err_console.print(f"jenv: Executable '{command_name}' not found in active JDK '{active_jdk.name}' ({active_jdk.path / 'bin'}).")
-                raise typer.Exit(code=127)
-        else:
-            err_console.print(f"jenv: Executable '{command_name}' not found in active JDK '{active_jdk.name}' ({active_jdk.path / 'bin'}).")
-            raise typer.Exit(code=127)
-
-    # Set JAVA_HOME for the child process
-    env = os.environ.copy()
-    env["JAVA_HOME"] = str(active_jdk.path)
-
-    # Add the JDK's bin to PATH as well, in case the executed command needs to find other tools from its own JDK
-    # Prepend it to ensure it's found first.
-    jdk_bin_path = str(active_jdk.path / "bin")
-    env["PATH"] = f"{jdk_bin_path}{os.pathsep}{env.get('PATH', '')}"
+    # Plain strings from here on: this runs for every shimmed java/javac call, and each Path join rebuilds the path
+    java_home = str(active_jdk.path)
+    jdk_bin_path = os.path.join(java_home, "bin")
+    cmd_path = find_executable(jdk_bin_path, command_name) # On Windows, command_name.exe is tried first
+    if not cmd_path:
+        err_console.print(f"jenv: Executable '{command_name}' not found in active JDK '{active_jdk.name}' ({jdk_bin_path}).")
+        raise typer.Exit(code=127)
 
+    # Prepare arguments for exec: first arg is the command itself
+    args_for_exec = [cmd_path] + (command_args if command_args else [])
 
-    # Prepare arguments for execvpe: first arg is the command itself
-    args_for_exec = [str(cmd_path)] + (command_args if command_args else [])
+    logger.debug(f"jenv internal exec: Executing '{cmd_path}' with args {args_for_exec} and JAVA_HOME='{java_home}'")
 
-    logger.debug(f"jenv internal exec: Executing '{cmd_path}' with args {args_for_exec} and JAVA_HOME='{active_jdk.path}'")
+    # JAVA_HOME points at the active JDK, and its bin dir is prepended to PATH so the executed command finds
+    # other tools from its own JDK first. Set in place rather than on a copy: this process is replaced (or,
+    # on Windows, only waits for the child) and the child inherits the environment as it is.
+    os.environ["JAVA_HOME"] = java_home
+    os.environ["PATH"] = f"{jdk_bin_path}{os.pathsep}{os.environ.get('PATH', '')}"
 
     try:
-        # Replace jenv process with the target command
-        if platform.system() == "Windows":
-            completed_process = subprocess.run(args_for_exec, env=env, check=False) # check=False to handle exit code manually
-            raise typer.Exit(completed_process.returncode)
+        if _IS_WINDOWS:
+            # Windows has no exec: spawn and wait directly rather than through Popen. The C runtime joins
+            # argv with plain spaces, so each argument is quoted the way subprocess would quote it.
+            returncode = os.spawnv(os.P_WAIT, cmd_path, [subprocess.list2cmdline([arg]) for arg in args_for_exec])
         else:
-            os.execvpe(str(cmd_path), args_for_exec, env)
+            # Replace jenv process with the target command; cmd_path is already absolute, so no PATH search
+            os.execv(cmd_path, args_for_exec)
     except FileNotFoundError:
         err_console.print(f"jenv: Command not found during exec: {cmd_path}")
         raise typer.Exit(code=127)
     except Exception as e:
         err_console.print(f"jenv: Failed to execute command '{command_name}': {e}")
         raise typer.Exit(code=126) # Command invokeable but cannot execute
+    # Only reached on Windows, since execv does not return. Outside the try: typer.Exit is itself an
+    # Exception and would be reported as a failure above
+    raise typer.Exit(returncode)
 
 
 @app.command(name="install", help="Download and install a JDK version.")
 def install_jdk(
-    version: str = typer.Argument(..., help="Version to install (e.g., 17, 21, 11)"),
+    versions: List[str] = typer.Argument(..., help="Versions to install (e.g., 17, or several: 11 17 21)"),
     vendor: str = typer.Option("temurin", "--vendor", "-v", help="JDK vendor (temurin, openjdk)"),
     force: bool = typer.Option(False, "--force", "-f", help="Force reinstall if already installed"),
 ):
-    """Download and install a JDK version from a supported vendor."""
+    """Download and install one or more JDK versions from a supported vendor; several install concurrently."""
+    # Imported here so commands that never download don't pay for loading the HTTP stack
+    from jenv.downloader import JdkDownloader, DownloadError
+
+    ensure_dirs()
+    versions = list(dict.fromkeys(versions)) # Installing the same version twice would only wait on its lock
     try:
         downloader = JdkDownloader()
         
-        with console.status(f"Installing {vendor} JDK {version}..."):
-            install_path = downloader.download_jdk(version, vendor, force)
-        
-        console.print(f"✅ Successfully installed {vendor} JDK {version}")
-        console.print(f"📁 Installation path: {install_path}")
-        console.print(f"💡 Use 'jenv global {vendor}-{version}' to set as default")
+        with console.status(f"Installing {vendor} JDK {', '.join(versions)}..."):
+            if len(versions) == 1:
+                try:
+                    results = [downloader.download_jdk(versions[0], vendor, force)]
+                except DownloadError as e:
+                    results = [e]
+            else:
+                results = downloader.download_many([(version, vendor) for version in versions], force)
         
-    except DownloadError as e:
-        err_console.print(f"❌ Failed to install {vendor} JDK {version}: {e}")
-        raise typer.Exit(code=1)
     except Exception as e:
         err_console.print(f"❌ Unexpected error: {e}")
         raise typer.Exit(code=1)
 
+    failed = False
+    for version, result in zip(versions, results):
+        if isinstance(result, Exception):
+            err_console.print(f"❌ Failed to install {vendor} JDK {version}: {result}")
+            failed = True
+            continue
+        console.print(f"✅ Successfully installed {vendor} JDK {version}")
+        console.print(f"📁 Installation path: {result}")
+        console.print(f"💡 Use 'jenv global {vendor}-{version}' to set as default")
+    if failed:
+        raise typer.Exit(code=1)
+
 
 @app.command(name="install-maven", help="Download and install a Maven version.")
 def install_maven(
@@ -849,6 +954,9 @@ def install_maven(
     force: bool = typer.Option(False, "--force", "-f", help="Force reinstall if already installed"),
 ):
     """Download and install a Maven version."""
+    from jenv.downloader import MavenDownloader, DownloadError
+
+    ensure_dirs()
     try:
         downloader = MavenDownloader()
         
@@ -867,6 +975,14 @@ def install_maven(
         raise typer.Exit(code=1)
 
 
+def _format_version_listing(versions: List[str], limit: int) -> str:
+    """The first `limit` versions as a bulleted block, plus a count of the rest, for a single console.print."""
+    lines = [f"  • {version}" for version in versions[:limit]]
+    if len(versions) > limit:
+        lines.append(f"  ... and {len(versions) - limit} more")
+    return "\n".join(lines)
+
+
 @app.command(name="list-remote", help="List available JDK versions for download.")
 def list_remote_versions(
     vendor: str = typer.Option("temurin", "--vendor", "-v", help="JDK vendor (temurin, openjdk)"),
@@ -874,16 +990,15 @@ def list_remote_versions(
     maven: bool = typer.Option(False, "--maven", help="Show Maven versions"),
 ):
     """List available versions for download from supported vendors."""
+    from jenv.downloader import JdkDownloader, MavenDownloader
+
     try:
         if maven:
             console.print("📦 Available Maven Versions:")
             downloader = MavenDownloader()
             versions = downloader.list_available_versions()
             if versions:
-                for version in versions[:10]:  # Show first 10
-                    console.print(f"  • {version}")
-                if len(versions) > 10:
-                    console.print(f"  ... and {len(versions) - 10} more")
+                console.print(_format_version_listing(versions, 10))  # Show first 10
             else:
                 console.print("  No versions found")
         
@@ -892,10 +1007,7 @@ def list_remote_versions(
             downloader = JdkDownloader()
             versions = downloader.list_available_versions(vendor)
             if versions:
-                for version in versions[:15]:  # Show first 15
-                    console.print(f"  • {version}")
-                if len(versions) > 15:
-                    console.print(f"  ... and {len(versions) - 15} more")
+                console.print(_format_version_listing(versions, 15))  # Show first 15
             else:
                 console.print("  No versions found")
                 
@@ -1,14 +1,22 @@
 from pathlib import Path
 import os
 
-# JENV_DIR is typically ~/.jenv
-JENV_DIR = Path(os.environ.get("JENV_DIR", Path.home() / ".jenv"))
+# JENV_DIR is typically ~/.jenv; the home directory is only looked up when JENV_DIR isn't set
+_JENV_DIR_ENV = os.environ.get("JENV_DIR")
+JENV_DIR = Path(_JENV_DIR_ENV) if _JENV_DIR_ENV is not None else Path.home() / ".jenv"
 VERSIONS_DIR = JENV_DIR / "versions" # For JDKs potentially installed by jenv
 CONFIG_FILE = JENV_DIR / "config.toml"
+CACHE_DIR = JENV_DIR / "cache" # Disposable data that jenv can always rebuild
 
-# Ensure base directory exists
-JENV_DIR.mkdir(parents=True, exist_ok=True)
-VERSIONS_DIR.mkdir(parents=True, exist_ok=True)
+
+def ensure_dirs() -> None:
+    """
+    Creates JENV_DIR and VERSIONS_DIR if they are missing. Called by the commands that install into them
+    rather than at import, so read-only paths such as shim exec don't pay for it on every run.
+    """
+    for directory in (JENV_DIR, VERSIONS_DIR):
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
 
 # Environment variable that can be set by 'jenv shell'
 JENV_VERSION_ENV_VAR = "JENV_VERSION"
@@ -18,3 +26,9 @@ JENV_VERSION_FILE = ".jenv-version"
 JENV_GLOBAL_VERSION_FILE = JENV_DIR / "version"
 # File for custom search paths for JDKs
 JENV_CUSTOM_PATHS_FILE = JENV_DIR / "paths"
+# Cache of JDK version probe results, keyed by JDK home
+JENV_VERSION_CACHE_FILE = CACHE_DIR / "versions.json"
+# Cache of vendor release listings fetched from the network, keyed by vendor
+JENV_AVAILABLE_VERSIONS_CACHE_FILE = CACHE_DIR / "available_versions.json"
+# Archives being downloaded, kept on the same filesystem as VERSIONS_DIR
+JENV_DOWNLOADS_DIR = CACHE_DIR / "downloads"
@@ -0,0 +1,163 @@
+"""
+Entry point the generated shims call: `jenv-exec <command> [args...]`.
+
+Runs on every shimmed java/javac/... invocation, so it resolves the active JDK and execs the command
+without importing Typer, Rich or the downloader. It follows the same precedence as `jenv version`
+(JENV_VERSION -> local .jenv-version -> global version file -> JAVA_HOME); discovery is only imported
+when a version file names a JDK or JAVA_HOME has to be checked.
+
+The resolution helpers live here rather than in jenv.main so that both share one implementation
+while this module stays cheap to import; jenv.main imports them.
+"""
+import functools
+import os
+import platform
+import stat
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from jenv.settings import JENV_VERSION_ENV_VAR, JENV_VERSION_FILE, JENV_GLOBAL_VERSION_FILE
+from jenv.util import read_version_file, get_active_jdk_path_from_env
+
+if TYPE_CHECKING: # jenv.discovery is only imported once a JDK has to be looked up
+    from jenv.discovery import JdkInfo
+
+_IS_WINDOWS = platform.system() == "Windows"
+
+# Discovered JDKs keyed by name and by path string, as built by index_jdks
+JdkIndex = Tuple[Dict[str, "JdkInfo"], Dict[str, "JdkInfo"]]
+
+
+def index_jdks(jdks: Iterable["JdkInfo"]) -> JdkIndex:
+    """Keys discovered JDKs by name and by path string; the first of several with the same key wins."""
+    by_name: Dict[str, "JdkInfo"] = {}
+    by_path: Dict[str, "JdkInfo"] = {}
+    for jdk in jdks:
+        by_name.setdefault(jdk.name, jdk)
+        by_path.setdefault(os.fspath(jdk.path), jdk)
+    return by_name, by_path
+
+
+def lookup_jdk(index: JdkIndex, name_or_path: str) -> Optional["JdkInfo"]:
+    """Looks up a JDK by its jenv name or its path string, as stored in version files."""
+    by_name, by_path = index
+    return by_name.get(name_or_path) or by_path.get(name_or_path)
+
+
+def find_local_version_file(start: Path) -> Optional[Path]:
+    """Returns the nearest .jenv-version file in `start` or its ancestors, up to and including the root."""
+    for directory in (start, *start.parents):
+        version_file = directory / JENV_VERSION_FILE
+        if version_file.is_file():
+            return version_file
+    return None
+
+
+def is_executable_file(path: Union[str, os.PathLike]) -> bool:
+    """
+    Whether path is a regular file with an execute bit set, from a single stat
+    (a DirEntry reuses its cached stat). Windows has no execute bit, so any regular file counts there.
+    """
+    try:
+        st = path.stat() if isinstance(path, os.DirEntry) else os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and (_IS_WINDOWS or bool(st.st_mode & 0o111))
+
+
+def find_executable(bin_dir: str, command_name: str) -> Optional[str]:
+    """Path of command_name in bin_dir (trying .exe first on Windows), or None if it isn't an executable there."""
+    candidates = [command_name]
+    if _IS_WINDOWS and not command_name.lower().endswith(".exe"):
+        candidates.insert(0, f"{command_name}.exe")
+    for candidate in candidates:
+        cmd_path = os.path.join(bin_dir, candidate)
+        if is_executable_file(cmd_path):
+            return cmd_path
+    return None
+
+
+def valid_java_home() -> Optional[Path]:
+    """JAVA_HOME, if it has a java executable and a readable version (release file, else `java -version`)."""
+    java_home = get_active_jdk_path_from_env()
+    if not java_home:
+        return None
+    from jenv.discovery import get_java_version_and_implementor
+
+    return java_home if get_java_version_and_implementor(java_home)[0] else None
+
+
+def resolve_active_jdk_home(jenv_version: Optional[str], find_jdk: Callable[[str], Optional["JdkInfo"]]) -> Optional[Path]:
+    """
+    Home of the active JDK: JAVA_HOME when JENV_VERSION (`jenv shell`) is set, then the JDK named by the
+    nearest local version file, then by the global one, then JAVA_HOME. find_jdk looks up a version file's
+    name or path among the discovered JDKs.
+    """
+    if jenv_version:
+        java_home = valid_java_home()
+        if java_home:
+            return java_home
+
+    for version_file in (find_local_version_file(Path.cwd()), JENV_GLOBAL_VERSION_FILE):
+        version_name = read_version_file(version_file) if version_file else None
+        jdk = find_jdk(version_name) if version_name else None
+        if jdk:
+            return jdk.path
+
+    return valid_java_home()
+
+
+@functools.lru_cache(maxsize=1)
+def _discovered_jdk_index() -> JdkIndex:
+    from jenv.discovery import discover_system_jdks
+
+    return index_jdks(discover_system_jdks())
+
+
+def active_jdk_home() -> Optional[str]:
+    """Home directory of the active JDK as a string, or None if nothing is configured."""
+    java_home = resolve_active_jdk_home(
+        os.environ.get(JENV_VERSION_ENV_VAR), lambda name_or_path: lookup_jdk(_discovered_jdk_index(), name_or_path)
+    )
+    return os.fspath(java_home) if java_home else None
+
+
+def run(command_name: str, command_args: List[str]) -> int:
+    """Runs command_name from the active JDK. Only returns on error, or on Windows where there is no exec."""
+    java_home = active_jdk_home()
+    if not java_home:
+        sys.stderr.write(f"jenv: No active Java version determined for command '{command_name}'.\n")
+        sys.stderr.write("jenv: Please set a version using 'jenv global/local/shell <version>'.\n")
+        return 127
+
+    jdk_bin_path = os.path.join(java_home, "bin")
+    cmd_path = find_executable(jdk_bin_path, command_name)
+    if not cmd_path:
+        sys.stderr.write(f"jenv: Executable '{command_name}' not found in the active JDK ({jdk_bin_path}).\n")
+        return 127
+
+    # Set in place rather than on a copy: the child inherits the environment, and this process is replaced by it
+    os.environ["JAVA_HOME"] = java_home
+    os.environ["PATH"] = f"{jdk_bin_path}{os.pathsep}{os.environ.get('PATH', '')}"
+    args_for_exec = [cmd_path, *command_args]
+    try:
+        if _IS_WINDOWS:
+            return os.spawnv(os.P_WAIT, cmd_path, [subprocess.list2cmdline([arg]) for arg in args_for_exec])
+        os.execv(cmd_path, args_for_exec)
+    except OSError as e:
+        sys.stderr.write(f"jenv: Failed to execute command '{command_name}': {e}\n")
+        return 126
+    return 0 # Not reached: execv replaces the process
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        sys.stderr.write("usage: jenv-exec <command> [args...]\n")
+        sys.exit(2)
+    sys.exit(run(sys.argv[1], sys.argv[2:]))
+
+
+if __name__ == "__main__":
+    main()
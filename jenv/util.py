@@ -6,6 +6,8 @@ import platform
 
 logger = logging.getLogger(__name__)
 
+_JAVA_EXE_NAME = "java.exe" if platform.system() == "Windows" else "java"
+
 def write_version_file(file_path: Path, version_name: str) -> None:
     """Writes the version name to the specified file."""
     try:
@@ -16,25 +18,23 @@ def write_version_file(file_path: Path, version_name: str) -> None:
         # Potentially raise a custom exception
 
 def read_version_file(file_path: Path) -> Optional[str]:
-    """Reads the version name from the specified file."""
-    if file_path.is_file():
-        try:
-            return file_path.read_text().strip()
-        except IOError as e:
-            logger.error(f"Error reading version from {file_path}: {e}")
-            return None
-    return None
+    """Reads the version name from the specified file, or returns None if it doesn't exist."""
+    try:
+        return file_path.read_text().strip() # No is_file() check first: a missing file is just FileNotFoundError
+    except FileNotFoundError:
+        return None
+    except IOError as e:
+        logger.error(f"Error reading version from {file_path}: {e}")
+        return None
 
 def get_active_jdk_path_from_env() -> Optional[Path]:
     """
     Gets the current JAVA_HOME from environment variables if it seems valid.
     """
     java_home_str = os.environ.get("JAVA_HOME")
-    if java_home_str:
-        java_home_path = Path(java_home_str)
-        java_exe = java_home_path / "bin" / ("java.exe" if platform.system() == "Windows" else "java")
-        if java_exe.exists():
-            return java_home_path.resolve() # Resolve symlinks
+    # Probed with plain string joins and a single stat; a Path is only built for a valid JAVA_HOME
+    if java_home_str and os.path.exists(os.path.join(java_home_str, "bin", _JAVA_EXE_NAME)):
+        return Path(os.path.realpath(java_home_str)) # Resolve symlinks
     return None
 
 # Add other utility functions as needed, e.g., for symlink management, user prompts.
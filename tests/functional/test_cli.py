@@ -1,90 +1,45 @@
 import pytest
 from typer.testing import CliRunner
 from pathlib import Path
+import functools
 import os
 import shutil
+import sys
 import traceback # For printing exception info
 import platform # For OS-specific mock JDK executables
+from typing import Iterable, NamedTuple
+
+import typer
 
 # Assuming your Typer app is in jenv.main
-from jenv.main import app
-# Import settings module to access its members for assertions if needed,
-# but patching will primarily target jenv.settings itself or specific modules.
+from jenv.main import app, current_version, list_versions, set_global_version, set_local_version
+# Import the modules themselves to patch their attributes and access settings in assertions
+import jenv.discovery
+import jenv.main
+import jenv.shim
 import jenv.settings
 # Import JdkInfo for creating mock SDKs
 from jenv.discovery import JdkInfo
 
 
-runner = CliRunner()
+runner = CliRunner(mix_stderr=False) # Keep stderr separate, so result.stderr is available
 
-@pytest.fixture(scope="function") # Run for each test function
-def mock_jenv_dir(tmp_path: Path, monkeypatch):
-    """
-    Creates a temporary JENV_DIR for testing and cleans it up.
-    Also patches jenv.settings constants and their imported counterparts in other modules.
-    """
-    # Ensure modules are loaded to allow monkeypatching their attributes
-    # These are typically already loaded due to `from jenv.main import app` at file top.
-    import jenv.settings
-    import jenv.main
-    import jenv.discovery
+_IS_WINDOWS = platform.system() == "Windows"
+# Discovery looks for the .exe names on Windows
+_JAVA_EXE = "java.exe" if _IS_WINDOWS else "java"
+_JAVAC_EXE = "javac.exe" if _IS_WINDOWS else "javac"
+_EXE_NAMES = {"java": _JAVA_EXE, "javac": _JAVAC_EXE}
+_ALL_STUBS = ("java", "javac")
 
-    test_jenv_dir = tmp_path / ".jenv"
-    test_jenv_dir.mkdir(parents=True, exist_ok=True)
-
-    # Define all patched path objects based on the temporary test_jenv_dir
-    patched_versions_dir = test_jenv_dir / "versions"
-    patched_config_file = test_jenv_dir / "config.toml"
-    patched_global_file = test_jenv_dir / "version"
-    patched_custom_paths_file = test_jenv_dir / "paths"
-
-    # 1. Patch constants at their definition site (jenv.settings)
-    monkeypatch.setattr(jenv.settings, "JENV_DIR", test_jenv_dir)
-    monkeypatch.setattr(jenv.settings, "VERSIONS_DIR", patched_versions_dir)
-    monkeypatch.setattr(jenv.settings, "CONFIG_FILE", patched_config_file)
-    monkeypatch.setattr(jenv.settings, "JENV_GLOBAL_VERSION_FILE", patched_global_file)
-    monkeypatch.setattr(jenv.settings, "JENV_CUSTOM_PATHS_FILE", patched_custom_paths_file)
-
-    # 2. Patch constants where they are imported at the module level in other files
-    # Example: `from jenv.settings import JENV_DIR` in `jenv.main`
-
-    # Patch attributes in jenv.main that were imported from jenv.settings at module level
-    if hasattr(jenv.main, "JENV_DIR"): # Check if the import was `from .settings import JENV_DIR`
-        monkeypatch.setattr(jenv.main, "JENV_DIR", test_jenv_dir)
-    if hasattr(jenv.main, "JENV_GLOBAL_VERSION_FILE"):
-        monkeypatch.setattr(jenv.main, "JENV_GLOBAL_VERSION_FILE", patched_global_file)
-    if hasattr(jenv.main, "JENV_CUSTOM_PATHS_FILE"):
-        monkeypatch.setattr(jenv.main, "JENV_CUSTOM_PATHS_FILE", patched_custom_paths_file)
-    # Note: JENV_VERSION_FILE is a string constant, usually no need to patch its value.
-
-    # jenv.discovery imports VERSIONS_DIR and JENV_CUSTOM_PATHS_FILE *inside a function*
-    # (`from jenv.settings import VERSIONS_DIR`).
-    # Therefore, the patches to jenv.settings.VERSIONS_DIR (and others) made above
-    # will be effective when that import occurs during the execution of discover_system_jdks().
-    # No direct monkeypatching of attributes on the `jenv.discovery` module object is needed for these.
-
-    original_cwd = Path.cwd()
-    test_project_dir = tmp_path / "test_project"
-    test_project_dir.mkdir(exist_ok=True)
-    os.chdir(test_project_dir)
-
-    yield test_jenv_dir
-
-    os.chdir(original_cwd)
-
-@pytest.fixture
-def mock_jdk_home_factory(tmp_path: Path):
-    """Factory to create mock JDK home directory structures."""
-    created_jdks_root = tmp_path / "mock_jdks"
-    created_jdks_root.mkdir(exist_ok=True)
+# What discovery reports for mock_jdk_11 / mock_jdk_17, minus the per-test path
+# Names are the ones get_jdk_name_and_vendor would generate; vendors kept consistent with them
+_SDK11_STUB = JdkInfo(version="11.0.12", name="openjdk-11.0.12", path=None, vendor="OpenJDK")
+_SDK17_STUB = JdkInfo(version="17.0.1", name="temurin-17.0.1", path=None, vendor="Temurin")
 
-    def _create_jdk(version_str: str, name_prefix: str, vendor: str = "MockVendor"):
-        sane_name_prefix = name_prefix.lower().replace(" ", "-")
-        jdk_root = created_jdks_root / f"{sane_name_prefix}-{version_str}"
-        jdk_bin = jdk_root / "bin"
-        jdk_bin.mkdir(parents=True, exist_ok=True)
 
-        java_exe_content = f"""#!/bin/sh
+@functools.lru_cache(maxsize=None)
+def _java_stub(version_str: str, vendor: str) -> bytes:
+    return f"""#!/bin/sh
 # This is a mock java executable
 # Outputting properties similar to 'java -XshowSettings:properties -version' to stderr
 echo "Property settings:" >&2
@@ -94,40 +49,180 @@ echo "OpenJDK Runtime Environment ({vendor} build {version_str}+0)" >&2
 echo "OpenJDK 64-Bit Server VM ({vendor} build {version_str}+0, mixed mode)" >&2
 # Also the version string that 'java -version' typically shows
 echo "openjdk version \\"{version_str}\\" 2023-10-17" >&2
-"""
-        # Determine executable name based on the platform the tests are running on
-        java_exe_name = "java.exe" if platform.system() == "Windows" else "java"
-        java_exe_path = jdk_bin / java_exe_name
-        java_exe_path.write_text(java_exe_content)
-        os.chmod(java_exe_path, 0o755)
+""".encode()
+
+
+@functools.lru_cache(maxsize=None)
+def _javac_stub(version_str: str) -> bytes:
+    return f"#!/bin/sh\necho \"javac {version_str}\" >&2".encode()
+
+
+def _write_exec(path: Path, content: bytes):
+    """Writes an executable script, created with its mode in one open instead of write_text + chmod."""
+    fd = os.open(os.fspath(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    try:
+        os.write(fd, content)
+    finally:
+        os.close(fd)
+
+
+class CallResult(NamedTuple):
+    exit_code: int
+    stdout: str
+    stderr: str
+
+
+@pytest.fixture
+def call(capsys):
+    """
+    Calls a command function directly, skipping Click's parsing and CliRunner's I/O redirection.
+    Arguments must be passed explicitly, since the parameter defaults are Typer option objects.
+    Keep runner.invoke for tests that exercise the CLI parsing itself.
+    """
+    def _call(command, *args, **kwargs) -> CallResult:
+        jenv.main._reset_invocation_state() # What the app callback does before every command
+        exit_code = 0
+        try:
+            command(*args, **kwargs)
+        except typer.Exit as e:
+            exit_code = e.exit_code
+        captured = capsys.readouterr()
+        return CallResult(exit_code, captured.out, captured.err)
+
+    return _call
+
+@pytest.fixture
+def mock_discovery(monkeypatch):
+    """Sets the JDKs that discovery reports for the rest of the test, to jenv.main and to the jenv-exec shim."""
+    def _set(jdks):
+        jdks = list(jdks)
+        monkeypatch.setattr(jenv.main, "discover_system_jdks", lambda: jdks)
+        monkeypatch.setattr(jenv.discovery, "discover_system_jdks", lambda: jdks) # Imported lazily by jenv.shim
+    return _set
+
+@pytest.fixture(scope="session")
+def _jenv_skeleton(tmp_path_factory) -> Path:
+    """An empty JENV_DIR and project directory, built once per session and copied into each test."""
+    skeleton = tmp_path_factory.mktemp("jenv_skeleton")
+    (skeleton / ".jenv" / "versions").mkdir(parents=True)
+    (skeleton / "test_project").mkdir()
+    return skeleton
+
+@pytest.fixture(scope="module")
+def _mock_jenv_dir_base(tmp_path_factory, _jenv_skeleton):
+    """
+    Creates a temporary JENV_DIR shared by the tests of this module.
+    Also patches jenv.settings constants and their imported counterparts in other modules.
+    """
+    # One copy of the skeleton instead of creating each directory separately
+    base_dir = tmp_path_factory.mktemp("jenv_base")
+    shutil.copytree(_jenv_skeleton, base_dir, dirs_exist_ok=True)
+    test_jenv_dir = base_dir / ".jenv"
+    test_project_dir = base_dir / "test_project"
+
+    # Define all patched path objects based on the temporary test_jenv_dir
+    patched = {
+        "JENV_DIR": test_jenv_dir,
+        "VERSIONS_DIR": test_jenv_dir / "versions",
+        "CONFIG_FILE": test_jenv_dir / "config.toml",
+        "JENV_GLOBAL_VERSION_FILE": test_jenv_dir / "version",
+        "JENV_CUSTOM_PATHS_FILE": test_jenv_dir / "paths",
+        "JENV_VERSION_CACHE_FILE": test_jenv_dir / "cache" / "versions.json",
+    }
+
+    # The function-scoped monkeypatch fixture can't be used at module scope
+    with pytest.MonkeyPatch.context() as module_monkeypatch:
+        # 1. Patch constants at their definition site (jenv.settings)
+        # 2. Patch constants where they are imported at the module level in other files
+        # (e.g. `from jenv.settings import JENV_DIR` in `jenv.main`)
+        # Note: JENV_VERSION_FILE is a string constant, usually no need to patch its value.
+        for module in (jenv.settings, jenv.main, jenv.shim, jenv.discovery):
+            for name, value in patched.items():
+                if hasattr(module, name):
+                    module_monkeypatch.setattr(module, name, value)
+
+        yield test_jenv_dir, test_project_dir
+
+@pytest.fixture(scope="function") # Run for each test function
+def mock_jenv_dir(_mock_jenv_dir_base, monkeypatch):
+    """
+    The module's temporary JENV_DIR, reset to its initial state for this test.
+    Only what the commands write is removed, instead of rebuilding the whole tree.
+    Yields (JENV_DIR, project directory); the test runs with the project directory as its cwd.
+    """
+    test_jenv_dir, test_project_dir = _mock_jenv_dir_base
+    for name in ("version", "paths", "config.toml"):
+        (test_jenv_dir / name).unlink(missing_ok=True)
+    for name in ("shims", "bin", "cache"):
+        shutil.rmtree(test_jenv_dir / name, ignore_errors=True)
+    (test_project_dir / jenv.settings.JENV_VERSION_FILE).unlink(missing_ok=True)
+
+    monkeypatch.chdir(test_project_dir) # Restored by monkeypatch, even if the test fails
+
+    yield test_jenv_dir, test_project_dir
 
-        # If on Windows, also create a 'java' (no extension) for consistent test calls if needed,
-        # though discovery itself will look for 'java.exe'.
-        if platform.system() == "Windows":
-            (jdk_bin / "java").write_text(java_exe_content) # Create the non .exe version as well
-            os.chmod(jdk_bin / "java", 0o755)
+@pytest.fixture(scope="session")
+def _jdk_template_factory(tmp_path_factory):
+    """Builds each mock JDK home once per session; tests get copies of these templates."""
+    templates_root = tmp_path_factory.mktemp("jdk_templates")
+    templates = {}
 
+    def _create_template(version_str: str, name_prefix: str, vendor: str = "MockVendor", stubs: Iterable[str] = _ALL_STUBS) -> Path:
+        stubs = tuple(stubs)
+        key = (version_str, name_prefix, vendor, stubs)
+        if key in templates:
+            return templates[key]
 
-        javac_exe_name = "javac.exe" if platform.system() == "Windows" else "javac"
-        javac_exe_path = jdk_bin / javac_exe_name
-        javac_exe_path.write_text(f"#!/bin/sh\necho \"javac {version_str}\" >&2")
-        os.chmod(javac_exe_path, 0o755)
+        sane_name_prefix = name_prefix.lower().replace(" ", "-")
+        jdk_root = templates_root / f"{sane_name_prefix}-{version_str}-{len(templates)}"
+        jdk_bin = jdk_root / "bin"
+        jdk_bin.mkdir(parents=True) # Template directories are unique per key
+
+        for stub in stubs:
+            content = _java_stub(version_str, vendor) if stub == "java" else _javac_stub(version_str)
+            _write_exec(jdk_bin / _EXE_NAMES[stub], content)
+            # If on Windows, also create the name without extension for consistent test calls if needed,
+            # though discovery itself will look for 'java.exe'.
+            if _IS_WINDOWS:
+                _write_exec(jdk_bin / stub, content)
+
+        templates[key] = jdk_root
+        return jdk_root
 
-        if platform.system() == "Windows":
-            (jdk_bin / "javac").write_text(f"#!/bin/sh\necho \"javac {version_str}\" >&2")
-            os.chmod(jdk_bin / "javac", 0o755)
+    yield _create_template
 
+@pytest.fixture
+def mock_jdk_home_factory(tmp_path: Path, _jdk_template_factory):
+    """Factory to create mock JDK home directory structures, copied from the session templates."""
+    created_jdks_root = tmp_path / "mock_jdks" # Created by copytree along with the first JDK
+    # The scripts are never modified by the tests, so on Linux hardlinks are as good as copies
+    copy_function = os.link if platform.system() == "Linux" else shutil.copy2
+
+    def _create_jdk(version_str: str, name_prefix: str, vendor: str = "MockVendor", stubs: Iterable[str] = _ALL_STUBS):
+        sane_name_prefix = name_prefix.lower().replace(" ", "-")
+        jdk_root = created_jdks_root / f"{sane_name_prefix}-{version_str}"
+        template = _jdk_template_factory(version_str, name_prefix, vendor, stubs)
+        shutil.copytree(template, jdk_root, symlinks=False, copy_function=copy_function)
         return jdk_root
 
     yield _create_jdk
 
+# Both take the executables to create through indirect parametrization, defaulting to all of them
 @pytest.fixture
-def mock_jdk_11(mock_jdk_home_factory) -> Path:
-    return mock_jdk_home_factory("11.0.12", "openjdk", "OpenJDKTest")
+def mock_jdk_11(mock_jdk_home_factory, request) -> Path:
+    return mock_jdk_home_factory("11.0.12", "openjdk", "OpenJDKTest", getattr(request, "param", _ALL_STUBS))
 
 @pytest.fixture
-def mock_jdk_17(mock_jdk_home_factory) -> Path:
-    return mock_jdk_home_factory("17.0.1", "temurin", "TemurinTest")
+def mock_jdk_17(mock_jdk_home_factory, request) -> Path:
+    return mock_jdk_home_factory("17.0.1", "temurin", "TemurinTest", getattr(request, "param", _ALL_STUBS))
+
+@pytest.fixture
+def jdk11_global(mock_jenv_dir, mock_jdk_11, mock_discovery, call):
+    """mock_jdk_11 as the only discovered JDK, set as the global version."""
+    mock_sdk = _SDK11_STUB._replace(path=mock_jdk_11)
+    mock_discovery([mock_sdk])
+    assert call(set_global_version, mock_sdk.name).exit_code == 0
+    return mock_jdk_11, mock_sdk.name
 
 
 def test_jenv_version_command(mock_jenv_dir):
@@ -144,11 +239,11 @@ def test_jenv_no_command_shows_help(mock_jenv_dir):
     assert result.exit_code == 0, f"Help command failed. Exc: {result.exception}\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}"
     assert "Usage: jenv [OPTIONS] COMMAND [ARGS]..." in result.stdout
 
-def test_jenv_versions_no_jdks_found(mock_jenv_dir, monkeypatch):
+def test_jenv_versions_no_jdks_found(mock_jenv_dir, mock_discovery, monkeypatch, call):
     monkeypatch.delenv("JAVA_HOME", raising=False)
-    monkeypatch.setattr("jenv.main.discover_system_jdks", lambda: [])
+    mock_discovery([])
 
-    result = runner.invoke(app, ["versions"])
+    result = call(list_versions, verbose=False)
     assert result.exit_code == 0
     assert "No Java versions discovered." in result.stdout
 
@@ -166,21 +261,16 @@ def test_jenv_versions_one_jdk_from_java_home(mock_jenv_dir, mock_jdk_11, monkey
     assert "11.0.12" in result.stdout
     assert "openjdk-11.0.12" in result.stdout # Adjusted to heuristically derived name
 
-def test_jenv_global_set_and_show(mock_jenv_dir, mock_jdk_11, monkeypatch):
-    # Name that get_jdk_name_and_vendor would generate for mock_jdk_11
-    discovered_jdk_name = "openjdk-11.0.12"
-
-    # When discover_system_jdks is mocked, ensure the mock JdkInfo uses this consistent name and vendor
-    mock_sdk = JdkInfo(version="11.0.12", name=discovered_jdk_name, path=mock_jdk_11, vendor="OpenJDK")
-    monkeypatch.setattr("jenv.main.discover_system_jdks", lambda: [mock_sdk])
+@pytest.mark.parametrize("mock_jdk_11", [("java",)], indirect=True) # Never runs javac
+def test_jenv_global_set_and_show(mock_jenv_dir, mock_jdk_11, mock_discovery, monkeypatch, call):
+    mock_sdk = _SDK11_STUB._replace(path=mock_jdk_11)
+    discovered_jdk_name = mock_sdk.name
+    mock_discovery([mock_sdk])
 
     monkeypatch.delenv("JAVA_HOME", raising=False)
 
-    result_set = runner.invoke(app, ["global", discovered_jdk_name])
-    if result_set.exception:
-        print(f"\nException in test_jenv_global_set_and_show (set) for command: jenv global {discovered_jdk_name}")
-        traceback.print_exception(result_set.exc_info[0], result_set.exc_info[1], result_set.exc_info[2])
-    assert result_set.exit_code == 0, f"Global set failed. Exc: {result_set.exception}\nSTDOUT:\n{result_set.stdout}\nSTDERR:\n{result_set.stderr}"
+    result_set = call(set_global_version, discovered_jdk_name)
+    assert result_set.exit_code == 0, f"Global set failed.\nSTDOUT:\n{result_set.stdout}\nSTDERR:\n{result_set.stderr}"
     assert f"Global jenv version set to: {discovered_jdk_name}" in result_set.stdout
 
     # Access patched global file path via jenv.settings
@@ -188,64 +278,107 @@ def test_jenv_global_set_and_show(mock_jenv_dir, mock_jdk_11, monkeypatch):
     assert global_version_file.exists()
     assert global_version_file.read_text().strip() == discovered_jdk_name
 
-    result_show = runner.invoke(app, ["global"])
+    result_show = call(set_global_version, None)
     assert result_show.exit_code == 0
     assert f"Current global jenv version: {discovered_jdk_name}" in result_show.stdout
 
-    result_current = runner.invoke(app, ["version"])
+    result_current = call(current_version)
     assert result_current.exit_code == 0
     assert "11.0.12" in result_current.stdout
     assert f"(global: {str(global_version_file)})" in result_current.stdout
 
-def test_jenv_local_set_and_show(mock_jenv_dir, mock_jdk_17, monkeypatch):
-    local_version_file = Path.cwd() / jenv.settings.JENV_VERSION_FILE
+@pytest.mark.parametrize("mock_jdk_17", [("java",)], indirect=True) # Never runs javac
+def test_jenv_local_set_and_show(mock_jenv_dir, mock_jdk_17, mock_discovery, monkeypatch, call):
+    _, test_project_dir = mock_jenv_dir
+    local_version_file = test_project_dir / jenv.settings.JENV_VERSION_FILE
 
-    discovered_jdk_name = "temurin-17.0.1" # Heuristic name for mock_jdk_17
-    mock_sdk = JdkInfo(version="17.0.1", name=discovered_jdk_name, path=mock_jdk_17, vendor="Temurin") # Consistent vendor
-    monkeypatch.setattr("jenv.main.discover_system_jdks", lambda: [mock_sdk])
+    mock_sdk = _SDK17_STUB._replace(path=mock_jdk_17)
+    discovered_jdk_name = mock_sdk.name
+    mock_discovery([mock_sdk])
     monkeypatch.delenv("JAVA_HOME", raising=False)
 
-    result_set = runner.invoke(app, ["local", discovered_jdk_name])
-    if result_set.exception:
-        print(f"\nException in test_jenv_local_set_and_show (set) for command: jenv local {discovered_jdk_name}")
-        traceback.print_exception(result_set.exc_info[0], result_set.exc_info[1], result_set.exc_info[2])
-    assert result_set.exit_code == 0, f"Local set failed. Exc: {result_set.exception}\nSTDOUT:\n{result_set.stdout}\nSTDERR:\n{result_set.stderr}"
-    assert f"Local jenv version for directory {Path.cwd()}" in result_set.stdout
+    result_set = call(set_local_version, discovered_jdk_name, unset=False)
+    assert result_set.exit_code == 0, f"Local set failed.\nSTDOUT:\n{result_set.stdout}\nSTDERR:\n{result_set.stderr}"
+    assert f"Local jenv version for directory {test_project_dir}" in result_set.stdout
     assert local_version_file.exists()
     assert local_version_file.read_text().strip() == discovered_jdk_name
 
-    result_show = runner.invoke(app, ["local"])
+    result_show = call(set_local_version, None, unset=False)
     assert result_show.exit_code == 0
     assert f"Local jenv version (from {local_version_file})" in result_show.stdout
     assert discovered_jdk_name in result_show.stdout
 
-    result_current = runner.invoke(app, ["version"])
+    result_current = call(current_version)
     assert result_current.exit_code == 0
     assert "17.0.1" in result_current.stdout
     assert f"(local: {str(local_version_file)})" in result_current.stdout
 
-    result_unset = runner.invoke(app, ["local", "--unset"])
+    result_unset = call(set_local_version, None, unset=True)
     assert result_unset.exit_code == 0
     assert not local_version_file.exists()
 
-def test_jenv_internal_exec(mock_jenv_dir, mock_jdk_11, monkeypatch):
-    discovered_jdk_name = "openjdk-11.0.12" # Heuristic name
-    mock_sdk = JdkInfo(version="11.0.12", name=discovered_jdk_name, path=mock_jdk_11, vendor="OpenJDK") # Consistent
-    monkeypatch.setattr("jenv.main.discover_system_jdks", lambda: [mock_sdk])
+@pytest.fixture
+def fake_exec(monkeypatch):
+    """
+    Records os.execv/os.spawnv calls instead of replacing (or spawning from) the test process.
+    Like the real one, the fake execv does not return: it exits with SystemExit(0), as the executed command would.
+    JAVA_HOME and PATH are registered with monkeypatch first, since exec sets them in place.
+    """
+    monkeypatch.setenv("PATH", os.environ.get("PATH", ""))
+    monkeypatch.delenv("JAVA_HOME", raising=False)
+    calls = []
 
-    runner.invoke(app, ["global", discovered_jdk_name])
+    def _record(cmd_path, args):
+        calls.append((cmd_path, list(args), os.environ["JAVA_HOME"], os.environ["PATH"]))
 
-    result = runner.invoke(app, ["internal", "exec", "java", "--version"])
-    assert result.exit_code == 0, result.stderr + result.stdout
-    assert "openjdk version \"11.0.12\"" in result.stderr
+    def _execv(cmd_path, args):
+        _record(cmd_path, args)
+        raise SystemExit(0)
 
+    monkeypatch.setattr(jenv.main.os, "execv", _execv)
+    monkeypatch.setattr(jenv.main.os, "spawnv", lambda mode, cmd_path, args: _record(cmd_path, args) or 0)
+    return calls
+
+def test_jenv_internal_exec(jdk11_global, fake_exec):
+    mock_jdk_11, _ = jdk11_global
+    jdk_bin = str(mock_jdk_11 / "bin")
+
+    result = runner.invoke(app, ["internal", "exec", "java", "--version"])
+    assert result.exit_code == 0, result.stderr
     result_javac = runner.invoke(app, ["internal", "exec", "javac", "-version"])
-    assert result_javac.exit_code == 0, result_javac.stderr + result_javac.stdout
-    assert "javac 11.0.12" in result_javac.stderr
+    assert result_javac.exit_code == 0, result_javac.stderr
+
+    java_path = os.path.join(jdk_bin, _JAVA_EXE)
+    javac_path = os.path.join(jdk_bin, _JAVAC_EXE)
+    # On Windows spawnv gets the arguments quoted for the C runtime; these need no quoting
+    assert [(cmd_path, args) for cmd_path, args, _, _ in fake_exec] == [
+        (java_path, [java_path, "--version"]),
+        (javac_path, [javac_path, "-version"]),
+    ]
+    for _, _, java_home, path in fake_exec:
+        assert java_home == str(mock_jdk_11)
+        assert path.startswith(jdk_bin + os.pathsep)
 
     result_fail = runner.invoke(app, ["internal", "exec", "nonexistentcmd"])
-    assert result_fail.exit_code != 0
-    assert "Executable 'nonexistentcmd' not found" in result_fail.stdout
+    assert result_fail.exit_code == 127
+    assert "Executable 'nonexistentcmd' not found" in result_fail.stderr
+    assert len(fake_exec) == 2
+
+def test_jenv_install_several_versions(mock_jenv_dir, monkeypatch):
+    from jenv.downloader import JdkDownloader, DownloadError
+    batches = []
+
+    def fake_download_many(self, specs, force=False):
+        batches.append((specs, force))
+        return [Path("/jdks/openjdk-11"), DownloadError("OpenJDK version 99 not available")]
+
+    monkeypatch.setattr(JdkDownloader, "download_many", fake_download_many)
+
+    result = runner.invoke(app, ["install", "11", "99", "11", "--vendor", "openjdk"])
+    assert result.exit_code == 1 # One of them failed
+    assert batches == [([("11", "openjdk"), ("99", "openjdk")], False)] # Duplicates installed once
+    assert "Successfully installed openjdk JDK 11" in result.stdout
+    assert "Failed to install openjdk JDK 99: OpenJDK version 99 not available" in result.stderr
 
 def test_jenv_scan_path_management(mock_jenv_dir, tmp_path):
     custom_paths_file_actual = jenv.settings.JENV_CUSTOM_PATHS_FILE
@@ -285,12 +418,8 @@ def test_jenv_scan_path_management(mock_jenv_dir, tmp_path):
     assert "Scanning for Java Development Kits..." in result_scan_default.stdout
     assert "No Java versions discovered." in result_scan_default.stdout
 
-def test_jenv_which(mock_jenv_dir, mock_jdk_11, monkeypatch):
-    discovered_jdk_name = "openjdk-11.0.12" # Heuristic name
-    mock_sdk = JdkInfo(version="11.0.12", name=discovered_jdk_name, path=mock_jdk_11, vendor="OpenJDK") # Consistent
-    monkeypatch.setattr("jenv.main.discover_system_jdks", lambda: [mock_sdk])
-
-    runner.invoke(app, ["global", discovered_jdk_name])
+def test_jenv_which(jdk11_global):
+    mock_jdk_11, _ = jdk11_global
 
     result_java = runner.invoke(app, ["which", "java"])
     assert result_java.exit_code == 0
@@ -302,7 +431,7 @@ def test_jenv_which(mock_jenv_dir, mock_jdk_11, monkeypatch):
 
     result_nonexistent = runner.invoke(app, ["which", "nonexistent"])
     assert result_nonexistent.exit_code == 1
-    assert "Executable 'nonexistent' not found" in result_nonexistent.stdout
+    assert "Executable 'nonexistent' not found" in result_nonexistent.stderr
 
 def test_jenv_init_bash(mock_jenv_dir):
     temp_jenv_dir_str = str(jenv.settings.JENV_DIR)
@@ -315,18 +444,13 @@ def test_jenv_init_bash(mock_jenv_dir):
     assert (jenv.settings.JENV_DIR / "shims").is_dir()
     assert (jenv.settings.JENV_DIR / "bin").is_dir()
 
-def test_jenv_rehash(mock_jenv_dir, mock_jdk_11, monkeypatch):
-    discovered_jdk_name = "openjdk-11.0.12" # Heuristic name
-    mock_sdk = JdkInfo(version="11.0.12", name=discovered_jdk_name, path=mock_jdk_11, vendor="OpenJDK") # Consistent
-    monkeypatch.setattr("jenv.main.discover_system_jdks", lambda: [mock_sdk])
-    runner.invoke(app, ["global", discovered_jdk_name])
-
+def test_jenv_rehash(jdk11_global):
     result = runner.invoke(app, ["rehash"])
     assert result.exit_code == 0, result.stdout
     assert "Rehashed" in result.stdout
 
     shims_dir = jenv.settings.JENV_DIR / "shims"
-    if os.name != "nt":
+    if not _IS_WINDOWS:
         java_shim = shims_dir / "java"
         javac_shim = shims_dir / "javac"
         assert java_shim.is_file(), f"Shim {java_shim} not found"
@@ -335,57 +459,124 @@ def test_jenv_rehash(mock_jenv_dir, mock_jdk_11, monkeypatch):
 
         shim_content = java_shim.read_text()
         assert "#!/usr/bin/env sh" in shim_content
-        assert 'exec "jenv" internal exec "java" "$@"' in shim_content
+        assert 'exec "jenv-exec" "java" "$@"' in shim_content
     else:
         assert (shims_dir / "java.bat").is_file()
         assert (shims_dir / "javac.bat").is_file()
         shim_content = (shims_dir / "java.bat").read_text()
-        assert '"jenv" internal exec "java" %*' in shim_content
+        assert '"jenv-exec" "%~n0" %*' in shim_content
 
-def test_version_precedence(mock_jenv_dir, mock_jdk_home_factory, monkeypatch):
-    jdk8_path = mock_jdk_home_factory("8.0.302", "zulu", "ZuluTest")
-    jdk11_path = mock_jdk_home_factory("11.0.13", "openjdk", "OpenJDKTest")
-    jdk17_path = mock_jdk_home_factory("17.0.2", "temurin", "TemurinTest") # Path .../temurin-17.0.2
-
-    # Names as would be generated by discovery.py's get_jdk_name_and_vendor
-    # For path "zulu-8.0.302", vendor "ZuluTest" -> name "zulutest-8.0.302", resolved vendor "Zulu"
-    # For path "openjdk-11.0.13", vendor "OpenJDKTest" -> name "openjdk-11.0.13", resolved vendor "OpenJDK"
-    # For path "temurin-17.0.2", vendor "TemurinTest" -> name "temurin-17.0.2", resolved vendor "Temurin"
-
-    sdk8_name = "zulu-8.0.302" # Heuristic name
-    sdk11_name = "openjdk-11.0.13"
-    sdk17_name = "temurin-17.0.2"
+def test_jenv_rehash_skips_unchanged_bin_dir(jdk11_global):
+    assert "Rehashed" in runner.invoke(app, ["rehash"]).stdout
+    result = runner.invoke(app, ["rehash"])
+    assert result.exit_code == 0, result.stdout
+    assert "No shims needed" in result.stdout
 
-    sdk8_info = JdkInfo("8.0.302", sdk8_name, jdk8_path, "Zulu") # Use heuristic vendor
-    sdk11_info = JdkInfo("11.0.13", sdk11_name, jdk11_path, "OpenJDK")
-    sdk17_info = JdkInfo("17.0.2", sdk17_name, jdk17_path, "Temurin")
+    # A missing shim forces a rewrite even though the JDK's bin dir is unchanged
+    (jenv.settings.JENV_DIR / "shims" / "java").unlink()
+    assert "Rehashed" in runner.invoke(app, ["rehash"]).stdout
 
-    all_jdks = [sdk8_info, sdk11_info, sdk17_info]
-    monkeypatch.setattr("jenv.main.discover_system_jdks", lambda: all_jdks)
+@pytest.fixture(scope="module")
+def three_jdks(_jdk_template_factory):
+    """JDK 8, 11 and 17 as discovery would report them; the precedence tests only read these homes."""
+    # Names as would be generated by discovery.py's get_jdk_name_and_vendor
+    return (
+        JdkInfo("8.0.302", "zulu-8.0.302", _jdk_template_factory("8.0.302", "zulu", "ZuluTest", ("java",)), "Zulu"),
+        JdkInfo("11.0.13", "openjdk-11.0.13", _jdk_template_factory("11.0.13", "openjdk", "OpenJDKTest", ("java",)), "OpenJDK"),
+        JdkInfo("17.0.2", "temurin-17.0.2", _jdk_template_factory("17.0.2", "temurin", "TemurinTest", ("java",)), "Temurin"),
+    )
+
+# Each scope is layered over the lower-precedence ones (global: JDK 8, local: JDK 11, shell: JDK 17)
+@pytest.mark.parametrize("scope, expected_source", [
+    ("global", "(global:"),
+    ("local", "(local:"),
+    ("shell", "(shell: JENV_VERSION)"),
+])
+def test_version_precedence(mock_jenv_dir, three_jdks, mock_discovery, monkeypatch, call, scope, expected_source):
+    sdk8_info, sdk11_info, sdk17_info = three_jdks
+    mock_discovery(three_jdks)
     monkeypatch.delenv("JAVA_HOME", raising=False)
+    monkeypatch.delenv("JENV_VERSION", raising=False)
 
-    runner.invoke(app, ["global", sdk8_name])
-    res_global = runner.invoke(app, ["version"])
-    assert res_global.exit_code == 0, res_global.stdout
-    assert sdk8_name in res_global.stdout
-    assert "(global:" in res_global.stdout
-
-    runner.invoke(app, ["local", sdk11_name])
-    res_local = runner.invoke(app, ["version"])
-    assert res_local.exit_code == 0, res_local.stdout
-    assert sdk11_name in res_local.stdout
-    assert "(local:" in res_local.stdout
-    assert sdk8_name not in res_local.stdout
-
-    monkeypatch.setenv("JENV_VERSION", sdk17_name)
-    res_shell = runner.invoke(app, ["version"])
-    assert res_shell.exit_code == 0, res_shell.stdout
-    assert sdk17_name in res_shell.stdout
-    assert "(shell: JENV_VERSION)" in res_shell.stdout
-    assert sdk11_name not in res_shell.stdout
+    layers = [sdk8_info]
+    call(set_global_version, sdk8_info.name)
+    if scope in ("local", "shell"):
+        layers.append(sdk11_info)
+        call(set_local_version, sdk11_info.name, unset=False)
+    if scope == "shell":
+        layers.append(sdk17_info)
+        # `jenv shell` exports both: JENV_VERSION marks the shell override, JAVA_HOME points at its JDK
+        monkeypatch.setenv("JENV_VERSION", sdk17_info.name)
+        monkeypatch.setenv("JAVA_HOME", str(sdk17_info.path))
+
+    *overridden, expected = layers
+    result = call(current_version)
+    assert result.exit_code == 0, result.stdout
+    assert expected.name in result.stdout
+    assert expected_source in result.stdout
+    for jdk in overridden:
+        assert jdk.name not in result.stdout
 
+@pytest.fixture
+def shim_exec(monkeypatch, capsys):
+    """Runs `jenv-exec <args>` in-process (use with fake_exec); returns its exit code and stderr."""
+    def _run(*args):
+        jenv.shim._discovered_jdk_index.cache_clear() # Built once per process when run for real
+        monkeypatch.setattr(sys, "argv", ["jenv-exec", *args])
+        with pytest.raises(SystemExit) as exc_info:
+            jenv.shim.main()
+        return exc_info.value.code, capsys.readouterr().err
+    return _run
+
+def test_jenv_exec_shim(jdk11_global, fake_exec, shim_exec):
+    mock_jdk_11, _ = jdk11_global
+    jdk_bin = str(mock_jdk_11 / "bin")
+    java_path = os.path.join(jdk_bin, _JAVA_EXE)
+
+    assert shim_exec("java", "-version") == (0, "")
+    [(cmd_path, args, java_home, path)] = fake_exec
+    assert (cmd_path, args, java_home) == (java_path, [java_path, "-version"], str(mock_jdk_11))
+    assert path.startswith(jdk_bin + os.pathsep)
+
+    exit_code, stderr = shim_exec("nonexistentcmd")
+    assert exit_code == 127
+    assert "Executable 'nonexistentcmd' not found" in stderr
+    assert len(fake_exec) == 1
+
+def test_jenv_exec_shim_without_version(mock_jenv_dir, mock_discovery, fake_exec, shim_exec):
+    mock_discovery([])
+    exit_code, stderr = shim_exec("java")
+    assert exit_code == 127
+    assert "No active Java version determined" in stderr
+    assert fake_exec == []
+
+# Same layering as test_version_precedence. JAVA_HOME only counts under JENV_VERSION (or with no version
+# file at all) when it is a working JDK; a broken one falls through to the version files.
+@pytest.mark.parametrize("scope, java_home, expected", [
+    ("global", None, 0),
+    ("local", None, 1),
+    ("local", "jdk17", 1), # Version files take precedence over JAVA_HOME
+    ("shell", "jdk17", 2),
+    ("shell", "broken", 1),
+    ("none", "jdk17", 2),
+])
+def test_jenv_exec_shim_precedence(mock_jenv_dir, three_jdks, mock_discovery, fake_exec, shim_exec, monkeypatch, call, tmp_path,
+                                   scope, java_home, expected):
+    mock_discovery(three_jdks)
     monkeypatch.delenv("JENV_VERSION", raising=False)
-    local_v_file = Path.cwd() / jenv.settings.JENV_VERSION_FILE
-    if local_v_file.exists(): local_v_file.unlink()
-    global_v_file = jenv.settings.JENV_GLOBAL_VERSION_FILE
-    if global_v_file.exists(): global_v_file.unlink()
+    if scope != "none":
+        call(set_global_version, three_jdks[0].name)
+    if scope in ("local", "shell"):
+        call(set_local_version, three_jdks[1].name, unset=False)
+    if scope == "shell":
+        monkeypatch.setenv("JENV_VERSION", three_jdks[2].name)
+    if java_home == "jdk17":
+        monkeypatch.setenv("JAVA_HOME", str(three_jdks[2].path))
+    elif java_home == "broken":
+        (tmp_path / "broken" / "bin").mkdir(parents=True) # bin/java is there, but it can't run
+        (tmp_path / "broken" / "bin" / _JAVA_EXE).touch()
+        monkeypatch.setenv("JAVA_HOME", str(tmp_path / "broken"))
+
+    assert shim_exec("java")[0] == 0
+    [(_, _, active_java_home, _)] = fake_exec
+    assert active_java_home == str(three_jdks[expected].path)
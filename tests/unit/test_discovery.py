@@ -2,93 +2,138 @@ import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
 import subprocess
+import asyncio
+import os
+import platform
 
-from jenv.discovery import get_java_version_from_path, get_jdk_name_and_vendor, discover_system_jdks, JdkInfo
+from jenv.discovery import get_java_version_from_path, get_java_version_and_implementor, get_jdk_name_and_vendor, discover_system_jdks, JdkInfo
 from jenv.settings import JENV_CUSTOM_PATHS_FILE # For mocking its existence
 import jenv.discovery # For patching module-level Path instances like VERSIONS_DIR
 
 # Tests for get_java_version_from_path
-@patch("jenv.discovery.subprocess.run")
-@patch("jenv.discovery.platform.system")
-def test_get_java_version_from_path_success_runtime_version(mock_platform_system, mock_subprocess_run):
-    mock_platform_system.return_value = "Linux" # or "Darwin"
-    mock_java_home = Path("/opt/jdk-17")
-
-    # Mock the java executable path
-    mock_java_exe = mock_java_home / "bin" / "java"
-    with patch.object(Path, "exists") as mock_path_exists:
-        mock_path_exists.return_value = True # Simulate java exe exists
-
-        # Simulate output from java -XshowSettings:properties -version
-        mock_stderr = """
-        java.runtime.version = 17.0.5+8-LTS
-        java.vendor = Eclipse Adoptium
-        # other properties...
-        """
-        mock_subprocess_run.return_value = subprocess.CompletedProcess(
-            args=[str(mock_java_exe), "-XshowSettings:properties", "-version"],
-            returncode=0,
-            stdout="",
-            stderr=mock_stderr
-        )
-
-        version = get_java_version_from_path(mock_java_home)
-        assert version == "17.0.5" # Expecting cleaned version
-        mock_subprocess_run.assert_called_once_with(
-            [str(mock_java_exe), "-XshowSettings:properties", "-version"],
-            capture_output=True, text=True, timeout=5
-        )
+_JAVA_EXE_NAME = "java.exe" if platform.system() == "Windows" else "java"
 
-@patch("jenv.discovery.subprocess.run")
-@patch("jenv.discovery.platform.system")
-def test_get_java_version_from_path_success_java_version_fallback(mock_platform_system, mock_subprocess_run):
-    mock_platform_system.return_value = "Linux"
-    mock_java_home = Path("/opt/jdk-11")
-    mock_java_exe = mock_java_home / "bin" / "java"
-    with patch.object(Path, "exists") as mock_path_exists:
-        mock_path_exists.return_value = True
-        mock_stderr = """
-        java.version = 11.0.12
-        # No java.runtime.version
-        """
-        mock_subprocess_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr=mock_stderr)
-        version = get_java_version_from_path(mock_java_home)
-        assert version == "11.0.12"
+# `java -version` outputs (written to stderr) used by the fakes below
+_STDERR_TEMURIN_17 = b"""openjdk version "17.0.5" 2022-10-18 LTS
+OpenJDK Runtime Environment Temurin-17.0.5+8 (build 17.0.5+8-LTS)
+OpenJDK 64-Bit Server VM Temurin-17.0.5+8 (build 17.0.5+8-LTS, mixed mode, sharing)
+"""
+_STDERR_LEGACY_8 = b'java version "1.8.0_292"\nJava(TM) SE Runtime Environment (build 1.8.0_292-b10)\n'
+_STDERR_NO_VERSION = b"Some other output without version info"
+
+class _FakeJava:
+    """A JDK home on disk whose `java -version` output (or error) is faked."""
+    def __init__(self, home: Path):
+        self.home = home
+        self.stderr = b""
+        self.error = None
+        self.calls = []
+
+@pytest.fixture
+def fake_java(monkeypatch, tmp_path):
+    # A real (empty) executable instead of patching Path.exists for every path in the process
+    java_home = tmp_path / "jdk"
+    (java_home / "bin").mkdir(parents=True)
+    (java_home / "bin" / _JAVA_EXE_NAME).touch()
+    fake = _FakeJava(java_home)
+
+    def fake_run(args, **kwargs):
+        fake.calls.append((args, kwargs))
+        if fake.error:
+            raise fake.error
+        return subprocess.CompletedProcess(args=args, returncode=0, stdout=None, stderr=fake.stderr)
+
+    monkeypatch.setattr("jenv.discovery.subprocess.run", fake_run)
+    return fake
+
+@pytest.mark.parametrize("stderr, expected", [
+    (_STDERR_TEMURIN_17, "17.0.5"),
+    (_STDERR_LEGACY_8, "1.8.0_292"), # Legacy format, cleaned
+    (_STDERR_NO_VERSION, None),
+])
+def test_get_java_version_from_path(fake_java, stderr, expected):
+    fake_java.stderr = stderr
+    assert get_java_version_from_path(fake_java.home) == expected
+    assert fake_java.calls == [(
+        [str(fake_java.home / "bin" / _JAVA_EXE_NAME), "-version"],
+        {"stdout": subprocess.DEVNULL, "stderr": subprocess.PIPE, "timeout": 5},
+    )]
+
+def test_get_java_version_from_path_no_java_exe(fake_java):
+    (fake_java.home / "bin" / _JAVA_EXE_NAME).unlink()
+    assert get_java_version_from_path(fake_java.home) is None
+    assert fake_java.calls == []
+
+def test_get_java_version_from_path_subprocess_error(fake_java, caplog):
+    fake_java.error = subprocess.TimeoutExpired(cmd="java", timeout=1)
+    assert get_java_version_from_path(fake_java.home) is None
+    assert "Could not determine version" in caplog.text
 
-@patch("jenv.discovery.platform.system")
-def test_get_java_version_from_path_no_java_exe(mock_platform_system):
-    mock_platform_system.return_value = "Linux"
-    mock_java_home = Path("/opt/jdk-bad")
-    with patch.object(Path, "exists") as mock_path_exists:
-        mock_path_exists.return_value = False # Simulate java exe does NOT exist
-        version = get_java_version_from_path(mock_java_home)
-        assert version is None
 
 @patch("jenv.discovery.subprocess.run")
-@patch("jenv.discovery.platform.system")
-def test_get_java_version_from_path_subprocess_error(mock_platform_system, mock_subprocess_run, caplog):
-    mock_platform_system.return_value = "Windows"
-    mock_java_home = Path("C:/Java/jdk-8")
-    mock_java_exe = mock_java_home / "bin" / "java.exe" # Windows
-    with patch.object(Path, "exists") as mock_path_exists:
-        mock_path_exists.return_value = True
-        mock_subprocess_run.side_effect = subprocess.TimeoutExpired(cmd="java", timeout=1)
-        version = get_java_version_from_path(mock_java_home)
-        assert version is None
-        assert "Could not determine version" in caplog.text
+def test_get_java_version_from_path_prefers_release_file(mock_subprocess_run, tmp_path):
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin" / "java").touch()
+    (tmp_path / "bin" / "java.exe").touch()
+    (tmp_path / "release").write_text('IMPLEMENTOR="Eclipse Adoptium"\nJAVA_VERSION="17.0.5"\nOS_NAME="Linux"\n')
+
+    assert get_java_version_and_implementor(tmp_path) == ("17.0.5", "Eclipse Adoptium")
+    assert get_java_version_from_path(tmp_path) == "17.0.5"
+    mock_subprocess_run.assert_not_called()
 
 @patch("jenv.discovery.subprocess.run")
-@patch("jenv.discovery.platform.system")
-def test_get_java_version_from_path_no_version_in_output(mock_platform_system, mock_subprocess_run):
-    mock_platform_system.return_value = "Linux"
-    mock_java_home = Path("/opt/jdk-weird")
-    mock_java_exe = mock_java_home / "bin" / "java"
-    with patch.object(Path, "exists") as mock_path_exists:
-        mock_path_exists.return_value = True
-        mock_stderr = "Some other output without version info"
-        mock_subprocess_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr=mock_stderr)
-        version = get_java_version_from_path(mock_java_home)
-        assert version is None
+def test_get_java_version_from_path_release_file_without_version(mock_subprocess_run, tmp_path):
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin" / "java").touch()
+    (tmp_path / "bin" / "java.exe").touch()
+    (tmp_path / "release").write_text('IMPLEMENTOR="Eclipse Adoptium"\n')
+    mock_subprocess_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout=None, stderr=_STDERR_LEGACY_8)
+
+    assert get_java_version_from_path(tmp_path) == "1.8.0_292" # Falls back to spawning java
+    mock_subprocess_run.assert_called_once()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Uses shell scripts as mock java executables")
+def test_probe_all_async_reads_versions_concurrently(tmp_path):
+    homes = []
+    for name, output in [("jdk-legacy", 'java version "1.8.0_292"'), ("jdk-none", "not a jvm")]:
+        java_exe = tmp_path / name / "bin" / "java"
+        java_exe.parent.mkdir(parents=True)
+        java_exe.write_text(f"#!/bin/sh\necho '{output}' >&2\n")
+        java_exe.chmod(0o755)
+        homes.append(tmp_path / name)
+    homes.append(tmp_path / "jdk-missing")
+
+    assert asyncio.run(jenv.discovery._probe_all_async(homes, "java")) == ["1.8.0_292", None, None]
+
+
+def test_version_cache_round_trip_drops_missing_jdks(tmp_path, monkeypatch):
+    monkeypatch.setattr(jenv.discovery, "JENV_VERSION_CACHE_FILE", tmp_path / "cache" / "versions.json")
+    jdk_home = tmp_path / "jdk-17"
+    jdk_home.mkdir()
+    (jdk_home / "release").write_text('JAVA_VERSION="17.0.5"\n')
+    key = jenv.discovery._probe_cache_key(jdk_home, _JAVA_EXE_NAME)
+    assert key is not None
+
+    jenv.discovery._save_version_cache({
+        str(jdk_home): {"key": key, "version": "17.0.5", "implementor": None},
+        str(tmp_path / "removed-jdk"): {"key": "1-2-3", "version": "11.0.1", "implementor": None},
+    })
+
+    assert jenv.discovery._load_version_cache() == {str(jdk_home): {"key": key, "version": "17.0.5", "implementor": None}}
+    (jdk_home / "release").write_text('JAVA_VERSION="17.0.10"\n') # Upgrade in place changes the key
+    assert jenv.discovery._probe_cache_key(jdk_home, _JAVA_EXE_NAME) != key
+
+
+def test_jdk_info_sort_key_orders_versions_numerically():
+    jdks = [
+        JdkInfo("9.0.1", "openjdk-9.0.1", Path("/opt/jdk9")),
+        JdkInfo("17.0.5", "temurin-17.0.5", Path("/opt/jdk17")),
+        JdkInfo("1.8.0_292", "openjdk-1.8.0-292", Path("/opt/jdk8")),
+        JdkInfo("17.0.10", "temurin-17.0.10", Path("/opt/jdk17-new")),
+    ]
+    ordered = sorted(jdks, key=lambda jdk: jdk.sort_key, reverse=True)
+    assert [jdk.version for jdk in ordered] == ["17.0.10", "17.0.5", "9.0.1", "1.8.0_292"]
 
 
 # Tests for get_jdk_name_and_vendor
@@ -111,6 +156,26 @@ def test_get_jdk_name_and_vendor_parametrized(path_str, version, expected_name,
     assert name == expected_name
     assert vendor == expected_vendor
 
+def test_get_jdk_name_and_vendor_release_implementor():
+    jdk_path = Path("/usr/lib/jvm/jdk-17") # Heuristic alone would say Oracle
+    assert get_jdk_name_and_vendor(jdk_path, "17.0.5", "Eclipse Adoptium") == ("temurin-17.0.5", "Temurin")
+    # Unrecognised implementors fall back to the path heuristics
+    assert get_jdk_name_and_vendor(jdk_path, "17.0.5", "Private Build") == ("oracle-17.0.5", "Oracle")
+
+def test_get_jdk_name_and_vendor_macos_bundle():
+    jdk_path = Path("/Library/Java/JavaVirtualMachines/zulu-17.jdk/Contents/Home")
+    assert get_jdk_name_and_vendor(jdk_path, "17.0.5") == ("zulu-17.0.5", "Zulu")
+
+def test_jdk_home_from_macos_bundle(tmp_path):
+    bundle_home = tmp_path / "temurin-17.jdk" / "Contents" / "Home"
+    (bundle_home / "bin").mkdir(parents=True)
+    (bundle_home / "bin" / "java").touch()
+    (tmp_path / "not-a-jdk" / "bin" / "java").mkdir(parents=True) # A directory named 'java' doesn't count
+
+    assert jenv.discovery._jdk_home_from(str(bundle_home), "java") == str(bundle_home)
+    assert jenv.discovery._jdk_home_from(str(tmp_path / "temurin-17.jdk"), "java") == str(bundle_home)
+    assert jenv.discovery._jdk_home_from(str(tmp_path / "not-a-jdk"), "java") is None
+
 def test_get_jdk_name_and_vendor_no_version():
     jdk_path = Path("/opt/temurin-jdk") # dir_name_lower is "temurin-jdk"
     name, vendor = get_jdk_name_and_vendor(jdk_path, None) # "temurin" in path_str -> vendor "Temurin"
@@ -130,12 +195,6 @@ def test_get_jdk_name_and_vendor_unknown_no_version():
 # More tests for discover_system_jdks will be very involved due to multiple mocks.
 # We'll start with a simple case.
 
-@patch("jenv.discovery.platform.system")
-@patch("jenv.discovery.os.environ", {})
-@patch("jenv.discovery.Path")  # Mock the Path class used in jenv.discovery
-@patch("jenv.discovery.VERSIONS_DIR") # Mock the specific VERSIONS_DIR Path instance from settings
-# The import jenv.discovery is already at the top of the file. This duplicate is removed.
-
 @patch("jenv.discovery.platform.system")
 @patch("jenv.discovery.os.environ", new_callable=lambda: {})
 @patch("jenv.discovery.Path") # Mock the Path class for general Path(...) calls
@@ -152,9 +211,9 @@ def test_discover_system_jdks_empty(
     mock_path_instance.is_dir.return_value = False
     mock_path_instance.resolve.return_value = mock_path_instance
 
-    # Patch the 'exists' method of the module-level Path objects using string paths
-    mocker.patch("jenv.discovery.VERSIONS_DIR.exists", return_value=False)
-    mocker.patch("jenv.discovery.JENV_CUSTOM_PATHS_FILE.exists", return_value=False)
+    # Path instances' methods are read-only, so replace the module-level Path objects themselves
+    mocker.patch("jenv.discovery.VERSIONS_DIR").exists.return_value = False
+    mocker.patch("jenv.discovery.JENV_CUSTOM_PATHS_FILE").exists.return_value = False
     # Mock open for when JENV_CUSTOM_PATHS_FILE.exists() might be true and it tries to read the file
     mocker.patch("builtins.open", new_callable=mock_open)
 
@@ -162,20 +221,40 @@ def test_discover_system_jdks_empty(
     assert len(jdks) == 0
 
 
-# For more complex tests like test_discover_system_jdks_linux_one_jdk,
-# this manual mocking of Path becomes very verbose.
-# A fixture that provides a configurable mock Path factory or using pyfakefs would be better.
-# For now, I will remove the 'test_discover_system_jdks_linux_one_jdk' as it's too complex
-# to fix quickly with this style of mocking. It's better suited for functional testing
-# or with pyfakefs.
+def _write_jdk(home: Path, version: str, implementor: str):
+    """A JDK home discovery recognizes without running java: bin/java plus a release file."""
+    (home / "bin").mkdir(parents=True)
+    (home / "bin" / _JAVA_EXE_NAME).touch()
+    (home / "release").write_text(f'JAVA_VERSION="{version}"\nIMPLEMENTOR="{implementor}"\n')
+
+def test_discover_system_jdks_tree(monkeypatch, tmp_path):
+    versions_dir = tmp_path / "versions"
+    jvms_dir = tmp_path / "jvms"
+    _write_jdk(versions_dir / "temurin-17", "17.0.5", "Eclipse Adoptium")
+    bundle_home = jvms_dir / "zulu-11.jdk" / "Contents" / "Home" # macOS bundle layout
+    _write_jdk(bundle_home, "11.0.20", "Azul Systems, Inc.")
+    (jvms_dir / "not-a-jdk").mkdir()
+    (jvms_dir / "temurin-17-link").symlink_to(versions_dir / "temurin-17")
+    custom_paths_file = tmp_path / "paths"
+    custom_paths_file.write_text(f"{jvms_dir}\n")
+
+    monkeypatch.setattr(jenv.discovery, "VERSIONS_DIR", versions_dir)
+    monkeypatch.setattr(jenv.discovery, "JENV_CUSTOM_PATHS_FILE", custom_paths_file)
+    monkeypatch.setattr(jenv.discovery, "JENV_VERSION_CACHE_FILE", tmp_path / "cache" / "versions.json")
+    # The bundle is also reached as JAVA_HOME, by its Contents/Home
+    monkeypatch.setenv("JAVA_HOME", str(bundle_home))
+    monkeypatch.delenv("JDK_HOME", raising=False)
+    read_homes = []
+    read_release_file = jenv.discovery._read_release_file
+    monkeypatch.setattr(jenv.discovery, "_read_release_file", lambda home: read_homes.append(home) or read_release_file(home))
 
-# Placeholder for the removed test
-@pytest.mark.skip(reason="Skipping complex Path mocking test, prefer functional or pyfakefs")
-def test_discover_system_jdks_linux_one_jdk():
-    pass
+    # System directories such as /usr/lib/jvm are scanned too; only the JDKs of this tree are checked
+    jdks = [jdk for jdk in discover_system_jdks() if tmp_path.resolve() in jdk.path.parents]
 
-# Note: The discover_system_jdks tests are complex to set up comprehensively with mocks.
-# Consider using a fixture for a mock file system if many such tests are needed.
-# Pyfakefs could be an option but adds another dependency.
-# Manual mocking as above is feasible for a few key scenarios.
-# Functional tests with actual (temporary) directory structures might be easier for full coverage of discovery.
+    temurin_home = (versions_dir / "temurin-17").resolve()
+    assert [(jdk.version, jdk.path, jdk.is_jenv_managed) for jdk in jdks] == [
+        ("17.0.5", temurin_home, True),
+        ("11.0.20", bundle_home.resolve(), False),
+    ]
+    # Each home was queued once, however many ways the walk reached it
+    assert sorted(home for home in read_homes if tmp_path.resolve() in home.parents) == sorted([temurin_home, bundle_home.resolve()])
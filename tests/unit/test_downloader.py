@@ -0,0 +1,402 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+import threading
+import time
+import zipfile
+import pytest
+import requests
+from pathlib import Path
+
+import jenv.downloader
+from jenv.downloader import JdkDownloader, DownloadError, INSTALL_MANIFEST_NAME, _is_jdk_installed, _DownloadProgress
+from jenv.downloader import _extract_targz, _extract_tarxz, _extract_tarbz2, _extract_zip, _extractor_for
+
+_OPENJDK_17_URL = "https://download.java.net/java/GA/jdk17.0.2/dfd4a8d0985749f896bed50d7138ee7f/8/GPL/openjdk-17_linux-x64_bin.tar.gz"
+
+_ARCHIVE_URL = "https://example.com/jdk.tar.gz"
+# 60 bytes, so _RANGE_WORKERS (6) ranges of 10 bytes each
+_ARCHIVE_BYTES = bytes(range(60))
+_ARCHIVE_SHA256 = hashlib.sha256(_ARCHIVE_BYTES).hexdigest()
+_CORRUPT_BYTES = bytes(60)
+
+class _FakeResponse:
+    def __init__(self, status_code=200, headers=None, body=b"", url=_ARCHIVE_URL):
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.raw = io.BytesIO(body)
+        self.text = body.decode(errors="replace")
+        self.url = url
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+class _FakeSession:
+    """
+    Serves `files` by URL and `body` for every other URL: HEAD advertises Range support, GET honours
+    a Range header with `range_status`. A `short_by` > 0 makes each range response that many bytes short.
+    Each HEAD (one per download attempt) first moves on to the next of `next_bodies`, if any are left.
+    """
+    def __init__(self, body=_ARCHIVE_BYTES):
+        self.body = body
+        self.next_bodies = []
+        self.files = {}
+        self.head_error = None
+        self.range_status = 206
+        self.short_by = 0
+        self.headers = {"User-Agent": "jenv-test"}
+        self.requests = [] # (method, url, Range header or None)
+
+    def head(self, url, **kwargs):
+        self.requests.append(("HEAD", url, None))
+        if self.head_error:
+            raise self.head_error
+        if self.next_bodies:
+            self.body = self.next_bodies.pop(0)
+        return _FakeResponse(headers={"content-length": str(len(self.body)), "accept-ranges": "bytes"}, url=url)
+
+    def get(self, url, headers=None, **kwargs):
+        byte_range = (headers or {}).get("Range")
+        self.requests.append(("GET", url, byte_range))
+        if url in self.files:
+            content = self.files[url]
+            return _FakeResponse(status_code=404) if content is None else _FakeResponse(body=content, url=url)
+        if byte_range is None:
+            return _FakeResponse(headers={"content-length": str(len(self.body))}, body=self.body, url=url)
+        start, end = map(int, byte_range[len("bytes="):].split("-"))
+        part = self.body[start:end + 1]
+        return _FakeResponse(status_code=self.range_status, body=part[:len(part) - self.short_by], url=url)
+
+@pytest.fixture
+def fake_session(monkeypatch, tmp_path):
+    """A JdkDownloader whose session is a _FakeSession, downloading into tmp_path without pycurl."""
+    monkeypatch.setattr(jenv.downloader, "_download_dir", lambda: tmp_path)
+    monkeypatch.setattr(jenv.downloader, "_MIN_RANGE_DOWNLOAD_SIZE", 1)
+    monkeypatch.setattr(jenv.downloader, "pycurl", None)
+    instance = JdkDownloader()
+    instance.session = _FakeSession()
+    return instance
+
+def _write_java(home: Path):
+    (home / "bin").mkdir(parents=True)
+    (home / "bin" / "java").touch()
+
+def _write_manifest(version_dir: Path, **fields):
+    (version_dir / INSTALL_MANIFEST_NAME).write_text(json.dumps(fields))
+
+@pytest.fixture
+def downloader(monkeypatch, tmp_path):
+    """A JdkDownloader installing into tmp_path on linux-x64, whose _install_jdk only records its calls."""
+    monkeypatch.setattr(jenv.downloader, "VERSIONS_DIR", tmp_path)
+    monkeypatch.setattr(jenv.downloader, "_system_info", lambda: ("linux", "x64"))
+    instance = JdkDownloader()
+    instance.installs = []
+
+    def fake_install(version, vendor, system, arch, version_dir):
+        instance.installs.append((version, vendor, version_dir))
+        return version_dir
+
+    monkeypatch.setattr(instance, "_install_jdk", fake_install)
+    return instance
+
+# Tests for _is_jdk_installed
+@pytest.mark.parametrize("manifest, download_url, expected", [
+    (None, None, False), # bin/java alone may be an interrupted extraction
+    ({"vendor": "openjdk", "version": "17", "url": _OPENJDK_17_URL}, None, True),
+    ({"vendor": "openjdk", "version": "17", "url": _OPENJDK_17_URL}, _OPENJDK_17_URL, True),
+    ({"vendor": "openjdk", "version": "17", "url": "https://example.com/old.tar.gz"}, _OPENJDK_17_URL, False),
+    ({"vendor": "openjdk", "version": "21", "url": _OPENJDK_17_URL}, None, False),
+    ({"vendor": "temurin", "version": "17", "url": _OPENJDK_17_URL}, None, False),
+    ({"url": _OPENJDK_17_URL}, None, False), # Written before manifests recorded what they install
+])
+def test_is_jdk_installed(tmp_path, manifest, download_url, expected):
+    _write_java(tmp_path)
+    if manifest is not None:
+        _write_manifest(tmp_path, **manifest)
+    assert _is_jdk_installed(tmp_path, "openjdk", "17", download_url) is expected
+
+def test_is_jdk_installed_unreadable_manifest(tmp_path):
+    _write_java(tmp_path)
+    (tmp_path / INSTALL_MANIFEST_NAME).write_text('{"vendor": "openjdk", "vers') # Cut off mid-write
+    assert not _is_jdk_installed(tmp_path, "openjdk", "17")
+
+# Tests for download_jdk
+def test_download_jdk_reinstalls_interrupted_install(downloader, tmp_path):
+    version_dir = tmp_path / "openjdk-17"
+    _write_java(version_dir) # Extraction got this far, but the manifest was never written
+
+    assert downloader.download_jdk("17", "openjdk") == version_dir
+    assert downloader.installs == [("17", "openjdk", version_dir)]
+
+def test_download_jdk_skips_complete_install(downloader, tmp_path):
+    version_dir = tmp_path / "openjdk-17"
+    _write_java(version_dir)
+    _write_manifest(version_dir, vendor="openjdk", version="17", url=_OPENJDK_17_URL)
+
+    assert downloader.download_jdk("17", "openjdk") == version_dir
+    assert downloader.installs == []
+
+    # force reinstalls regardless
+    downloader.download_jdk("17", "openjdk", force=True)
+    assert downloader.installs == [("17", "openjdk", version_dir)]
+
+# Tests for download_many
+def test_download_many(monkeypatch):
+    instance = JdkDownloader()
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def fake_download_jdk(version, vendor, force):
+        with lock:
+            running.append(version)
+            peak.append(len(running))
+        time.sleep(0.05) # Long enough for the other installs to start alongside
+        with lock:
+            running.remove(version)
+        if version == "99":
+            raise DownloadError("No Temurin JDK 99 available")
+        return Path(f"/jdks/{vendor}-{version}")
+
+    monkeypatch.setattr(instance, "download_jdk", fake_download_jdk)
+    specs = [("8", "temurin"), ("99", "temurin"), ("11", "temurin"), ("17", "openjdk"), ("21", "temurin")]
+
+    results = instance.download_many(specs)
+
+    # In the order of specs, with the failure in its place rather than raised
+    assert [str(result) for result in results] == [
+        str(Path("/jdks/temurin-8")), "No Temurin JDK 99 available", str(Path("/jdks/temurin-11")),
+        str(Path("/jdks/openjdk-17")), str(Path("/jdks/temurin-21")),
+    ]
+    assert isinstance(results[1], DownloadError)
+    assert 1 < max(peak) <= jenv.downloader._MAX_CONCURRENT_INSTALLS
+    assert not instance._concurrent_installs
+
+def test_download_progress_lines_name_the_file(capsys):
+    progress = _DownloadProgress(100, "jdk.tar.gz", in_place=False) # As download_many reports each install
+    progress.add(0)
+    progress.add(50)
+    progress.add(5) # Below the next 10% step
+    assert capsys.readouterr().out == "jdk.tar.gz: 0%\njdk.tar.gz: 50%\n"
+
+# Tests for _download_file
+def test_download_file_splits_into_ranges(fake_session, tmp_path):
+    path, sha256 = fake_session._download_file(_ARCHIVE_URL, "jdk.tar.gz")
+
+    assert path == tmp_path / "jdk.tar.gz"
+    assert (path.read_bytes(), sha256) == (_ARCHIVE_BYTES, _ARCHIVE_SHA256)
+    ranges = sorted(byte_range for method, _, byte_range in fake_session.session.requests if method == "GET")
+    assert ranges == [f"bytes={start}-{start + 9}" for start in range(0, 60, 10)]
+
+def test_download_file_requires_partial_content(fake_session, tmp_path):
+    fake_session.session.range_status = 200 # As a server that ignores the Range header answers
+
+    with pytest.raises(DownloadError, match="Server ignored the Range request"):
+        fake_session._download_file(_ARCHIVE_URL, "jdk.tar.gz")
+    assert not (tmp_path / "jdk.tar.gz").exists()
+
+def test_download_file_short_read(fake_session, tmp_path):
+    fake_session.session.short_by = 1
+
+    with pytest.raises(DownloadError, match="Expected 60 bytes but received 54"):
+        fake_session._download_file(_ARCHIVE_URL, "jdk.tar.gz")
+    assert not (tmp_path / "jdk.tar.gz").exists()
+
+def test_download_file_head_failure_falls_back_to_stream(fake_session):
+    fake_session.session.head_error = requests.ConnectionError("HEAD refused")
+
+    path, sha256 = fake_session._download_file(_ARCHIVE_URL, "jdk.tar.gz")
+
+    assert (path.read_bytes(), sha256) == (_ARCHIVE_BYTES, _ARCHIVE_SHA256)
+    assert fake_session.session.requests == [("HEAD", _ARCHIVE_URL, None), ("GET", _ARCHIVE_URL, None)]
+
+# Tests for _download_verified
+def _downloads(fake_session):
+    return [request for request in fake_session.session.requests if request[0] == "HEAD"]
+
+def test_download_verified_matching(fake_session):
+    path, sha256 = fake_session._download_verified(_ARCHIVE_URL, "jdk.tar.gz", _ARCHIVE_SHA256)
+
+    assert (path.read_bytes(), sha256) == (_ARCHIVE_BYTES, _ARCHIVE_SHA256)
+    assert len(_downloads(fake_session)) == 1
+
+def test_download_verified_retries_after_mismatch(fake_session):
+    fake_session.session.next_bodies = [_CORRUPT_BYTES, _ARCHIVE_BYTES]
+
+    path, sha256 = fake_session._download_verified(_ARCHIVE_URL, "jdk.tar.gz", _ARCHIVE_SHA256)
+
+    assert (path.read_bytes(), sha256) == (_ARCHIVE_BYTES, _ARCHIVE_SHA256)
+    assert len(_downloads(fake_session)) == 2
+
+def test_download_verified_mismatch_every_attempt(fake_session, tmp_path):
+    fake_session.session.body = _CORRUPT_BYTES
+
+    with pytest.raises(DownloadError, match="does not match its published SHA-256"):
+        fake_session._download_verified(_ARCHIVE_URL, "jdk.tar.gz", _ARCHIVE_SHA256)
+    assert len(_downloads(fake_session)) == 2
+    assert not (tmp_path / "jdk.tar.gz").exists()
+
+def test_download_verified_without_checksum(fake_session):
+    fake_session.session.body = _CORRUPT_BYTES # Nothing to check it against, so it is accepted
+
+    path, sha256 = fake_session._download_verified(_ARCHIVE_URL, "jdk.tar.gz", None)
+
+    assert (path.read_bytes(), sha256) == (_CORRUPT_BYTES, hashlib.sha256(_CORRUPT_BYTES).hexdigest())
+    assert len(_downloads(fake_session)) == 1
+
+# Tests for _get_expected_sha256
+@pytest.mark.parametrize("checksum_file, expected", [
+    (f"{_ARCHIVE_SHA256.upper()}  jdk.tar.gz\n".encode(), _ARCHIVE_SHA256),
+    (b"", None), # Published but empty
+    (b"not-a-sha256", None),
+    (None, None), # 404
+])
+def test_get_expected_sha256_openjdk(fake_session, checksum_file, expected):
+    fake_session.session.files[f"{_ARCHIVE_URL}.sha256"] = checksum_file
+    assert fake_session._get_expected_sha256("openjdk", _ARCHIVE_URL, "jdk.tar.gz", "17", "linux", "x64") == expected
+
+@pytest.mark.parametrize("package, expected", [
+    ({"name": "jdk.tar.gz", "link": _ARCHIVE_URL, "checksum": _ARCHIVE_SHA256}, _ARCHIVE_SHA256),
+    ({"name": "jdk.tar.gz", "link": _ARCHIVE_URL}, None), # No checksum listed
+    ({"name": "other.zip", "link": _ARCHIVE_URL, "checksum": _ARCHIVE_SHA256}, None), # Not this archive's
+])
+def test_get_expected_sha256_temurin(fake_session, package, expected):
+    fake_session._temurin_packages[("17", "linux", "x64")] = [package]
+    assert fake_session._get_expected_sha256("temurin", _ARCHIVE_URL, "jdk.tar.gz", "17", "linux", "x64") == expected
+
+# Tests for the extractors
+_JAVA_BYTES = b"#!/bin/sh\n"
+
+def _tar_member(tar, name, type=tarfile.REGTYPE, data=b"", mode=0o644, linkname=""):
+    info = tarfile.TarInfo(name)
+    info.type, info.mode, info.linkname, info.size = type, mode, linkname, len(data)
+    tar.addfile(info, io.BytesIO(data) if data else None)
+
+@pytest.fixture
+def jdk_tar(tmp_path):
+    """A tar.gz laid out like a JDK: a root directory with an executable, a symlink and a hard link."""
+    archive_path = tmp_path / "jdk.tar.gz"
+    with tarfile.open(archive_path, "w:gz") as tar:
+        _tar_member(tar, "jdk-17", tarfile.DIRTYPE, mode=0o755)
+        _tar_member(tar, "jdk-17/bin", tarfile.DIRTYPE, mode=0o755)
+        _tar_member(tar, "jdk-17/bin/java", data=_JAVA_BYTES, mode=0o755)
+        _tar_member(tar, "jdk-17/bin/java-link", tarfile.SYMTYPE, linkname="java") # Relative, so left as is
+        # tar records a hard link with its target's mode, which extraction applies to the shared inode
+        _tar_member(tar, "jdk-17/lib/java-copy", tarfile.LNKTYPE, mode=0o755, linkname="jdk-17/bin/java")
+    return archive_path
+
+def test_extract_targz_strips_root(jdk_tar, tmp_path):
+    extract_to = tmp_path / "openjdk-17"
+    _extract_targz(jdk_tar, extract_to)
+
+    java = extract_to / "bin" / "java"
+    assert sorted(os.listdir(extract_to)) == ["bin", "lib"]
+    assert java.read_bytes() == _JAVA_BYTES
+    assert java.stat().st_mode & 0o777 == 0o755
+    assert os.readlink(extract_to / "bin" / "java-link") == "java"
+    assert os.path.samefile(extract_to / "lib" / "java-copy", java) # The hard link target was renamed too
+
+def _write_zip(archive_path, members):
+    """Writes (name, data, unix mode) members; a mode of None leaves external_attr unset."""
+    with zipfile.ZipFile(archive_path, "w") as zip_file:
+        for name, data, mode in members:
+            info = zipfile.ZipInfo(name)
+            if mode is not None:
+                info.external_attr = mode << 16
+            zip_file.writestr(info, data)
+    return archive_path
+
+def test_extract_zip_strips_root_and_keeps_exec_bits(tmp_path):
+    archive_path = _write_zip(tmp_path / "jdk.zip", [
+        ("jdk-17/", b"", None),
+        ("jdk-17/bin/java", _JAVA_BYTES, 0o100755),
+        ("jdk-17/release", b"JAVA_VERSION=17", 0o100600), # No exec bits: left with the default mode
+    ])
+    extract_to = tmp_path / "openjdk-17"
+    _extract_zip(archive_path, extract_to)
+
+    java = extract_to / "bin" / "java"
+    assert java.read_bytes() == _JAVA_BYTES
+    assert java.stat().st_mode & 0o777 == 0o755
+    assert (extract_to / "release").read_bytes() == b"JAVA_VERSION=17"
+
+@pytest.mark.parametrize("name", ["jdk-17/../../evil", "jdk-17/bin/../../../evil", "jdk-17//evil"])
+def test_extract_zip_refuses_paths_outside_target(tmp_path, name):
+    archive_path = _write_zip(tmp_path / "jdk.zip", [(name, b"pwned", 0o100644)])
+    extract_to = tmp_path / "a" / "openjdk-17"
+
+    with pytest.raises(DownloadError, match="leaves the target directory"):
+        _extract_zip(archive_path, extract_to)
+    assert not (tmp_path / "evil").exists() and not (tmp_path / "a" / "evil").exists()
+
+@pytest.mark.parametrize("filename, extractor", [
+    ("OpenJDK17U-jdk_x64_linux_hotspot_17.0.5_8.tar.gz", _extract_targz),
+    ("jdk-17.TGZ", _extract_targz),
+    ("openjdk-17_linux-x64_bin.tar.xz", _extract_tarxz),
+    ("jdk-17.0.5.tar.bz2", _extract_tarbz2),
+    ("OpenJDK17U-jdk_x64_windows_hotspot_17.0.5_8.zip", _extract_zip),
+    ("jdk-17.0.5.gz", None), # Not a tar
+    ("jdk-17.0.5.7z", None),
+])
+def test_extractor_for(filename, extractor):
+    assert _extractor_for(Path(filename)) is extractor
+
+# Tests for _download_stream_curl
+class _RecordingCurl:
+    """Stands in for pycurl.Curl: records options and 'downloads' _ARCHIVE_BYTES through WRITEFUNCTION."""
+    def __init__(self, pycurl, refused=()):
+        self.pycurl = pycurl
+        self.refused = refused # Options setopt rejects, as a libcurl built without the feature would
+        self.options = {}
+
+    def setopt(self, option, value):
+        if option in self.refused:
+            raise self.pycurl.error(self.pycurl.E_UNSUPPORTED_PROTOCOL, "unsupported")
+        self.options[option] = value
+
+    def perform(self):
+        self.options[self.pycurl.WRITEFUNCTION](_ARCHIVE_BYTES)
+        self.options[self.pycurl.XFERINFOFUNCTION](len(_ARCHIVE_BYTES), len(_ARCHIVE_BYTES), 0, 0)
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def pycurl():
+    return pytest.importorskip("pycurl")
+
+@pytest.fixture
+def curl_download(fake_session, tmp_path, pycurl, monkeypatch):
+    """Runs _download_stream_curl against a _RecordingCurl refusing `refused`; returns the options it was given."""
+    monkeypatch.setattr(jenv.downloader, "pycurl", pycurl) # fake_session turns it off for the requests path
+
+    def download(refused=()):
+        created = []
+        monkeypatch.setattr(pycurl, "Curl", lambda: created.append(_RecordingCurl(pycurl, refused)) or created[-1])
+        assert fake_session._download_stream_curl(_ARCHIVE_URL, tmp_path / "jdk.tar.gz") == (len(_ARCHIVE_BYTES), _ARCHIVE_SHA256)
+        assert (tmp_path / "jdk.tar.gz").read_bytes() == _ARCHIVE_BYTES
+        [curl] = created
+        return curl.options
+    return download
+
+def test_download_stream_curl_options(curl_download, pycurl):
+    options = curl_download()
+
+    assert options[pycurl.URL] == _ARCHIVE_URL
+    assert options[pycurl.LOW_SPEED_LIMIT] == jenv.downloader._CURL_LOW_SPEED_LIMIT
+    assert options[pycurl.LOW_SPEED_TIME] == jenv.downloader._CURL_LOW_SPEED_TIME
+    assert options[pycurl.HTTP_VERSION] == pycurl.CURL_HTTP_VERSION_2TLS
+
+def test_download_stream_curl_without_http2_constant(curl_download, pycurl, monkeypatch):
+    monkeypatch.delattr(pycurl, "CURL_HTTP_VERSION_2TLS") # Older pycurl builds
+    assert pycurl.HTTP_VERSION not in curl_download()
+
+def test_download_stream_curl_without_http2_support(curl_download, pycurl):
+    assert pycurl.HTTP_VERSION not in curl_download(refused=(pycurl.HTTP_VERSION,))
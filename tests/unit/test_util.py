@@ -1,88 +1,150 @@
 from pathlib import Path
+import logging
+import logging.handlers
 import pytest
-from unittest.mock import mock_open, patch
 
 from jenv.util import read_version_file, write_version_file
 
-# Tests for read_version_file
-def test_read_version_file_exists_and_readable(mocker):
-    mock_file_content = "openjdk-17.0.1"
-    mocker.patch("pathlib.Path.is_file", return_value=True)
-    # Mock read_text to directly return the content string
-    mock_read_text_method = mocker.patch.object(Path, "read_text", return_value=mock_file_content)
-
-    file_path = Path("/fake/path/.jenv-version")
-    version = read_version_file(file_path)
-
-    assert version == mock_file_content
-    mock_read_text_method.assert_called_once_with() # read_text was called
-
-def test_read_version_file_not_exists(mocker):
-    mocker.patch("pathlib.Path.is_file", return_value=False)
-    # Ensure read_text is not even called if is_file is false
-    mock_read_text_method = mocker.patch.object(Path, "read_text")
-    file_path = Path("/fake/path/.jenv-version")
-    version = read_version_file(file_path)
-    assert version is None
-    mock_read_text_method.assert_not_called()
-
-def test_read_version_file_empty(mocker):
-    mocker.patch("pathlib.Path.is_file", return_value=True)
-    mock_read_text_method = mocker.patch.object(Path, "read_text", return_value="")
-    file_path = Path("/fake/path/.jenv-version")
-    version = read_version_file(file_path)
-    assert version == "" # Or None, depending on desired behavior for empty. Current is ""
-    mock_read_text_method.assert_called_once_with()
+# Under pytest-xdist (--dist loadgroup), keep this module on one worker so the module-scoped mocks are installed once
+pytestmark = pytest.mark.xdist_group(name="util_mocks")
+
+# Paths are immutable, so every test can share these; nothing touches the disk
+READ_PATH = Path("/fake/path/.jenv-version")
+WRITE_PATH = Path("/fake/target/dir/.jenv-version")
+
+_READ_ERR = "Error reading version from"
+_WRITE_ERR = "Error writing version to"
+# How write_version_file creates the parent directory, as recorded in _Stub.calls
+_MKDIR_CALL = ((), {"parents": True, "exist_ok": True})
+
+class _Stub:
+    """A minimal stand-in for MagicMock: records calls, then raises side_effect or returns return_value."""
+    __slots__ = ("calls", "return_value", "side_effect")
+
+    def __init__(self):
+        self.reset()
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.side_effect is not None:
+            raise self.side_effect
+        return self.return_value
+
+    def reset(self):
+        self.calls = []
+        self.return_value = None
+        self.side_effect = None
+
+    def assert_called_once_with(self, *args, **kwargs):
+        assert self.calls == [(args, kwargs)]
+
+# The Path methods jenv.util touches are patched once for the whole module; each test resets them.
+# A _Stub has no __get__, so like a class-level MagicMock it is called without the Path instance.
+@pytest.fixture(scope="module", autouse=True)
+def _path_mocks():
+    stubs = {name: _Stub() for name in ("read_text", "write_text", "mkdir")}
+    with pytest.MonkeyPatch.context() as module_monkeypatch:
+        for name, stub in stubs.items():
+            module_monkeypatch.setattr(Path, name, stub)
+        yield stubs
+
+@pytest.fixture
+def path_mocks(_path_mocks):
+    for stub in _path_mocks.values():
+        stub.reset()
+    return _path_mocks
+
+class _LogCapture:
+    """Records kept by a MemoryHandler on jenv.util's logger."""
+    def __init__(self, handler: logging.handlers.MemoryHandler):
+        self.handler = handler
+
+    @property
+    def messages(self):
+        return [record.getMessage() for record in self.handler.buffer]
+
+    def clear(self):
+        self.handler.buffer.clear()
+
+# One handler for the whole session instead of caplog's per-test setup
+@pytest.fixture(scope="session")
+def util_log():
+    # Never flushes: there is no target and no record reaches the flush level
+    handler = logging.handlers.MemoryHandler(capacity=16, flushLevel=logging.CRITICAL + 1)
+    logger = logging.getLogger("jenv.util")
+    logger.addHandler(handler)
+    yield _LogCapture(handler)
+    logger.removeHandler(handler)
+
+@pytest.fixture(autouse=True)
+def _clear_util_log(util_log):
+    util_log.clear()
 
-def test_read_version_file_io_error(mocker, caplog):
-    mocker.patch("pathlib.Path.is_file", return_value=True)
-    mocker.patch("pathlib.Path.read_text", side_effect=IOError("Test read error"))
-    file_path = Path("/fake/path/.jenv-version")
-
-    version = read_version_file(file_path)
+# Tests for read_version_file
+@pytest.mark.parametrize("content, expected", [
+    ("openjdk-17.0.1", "openjdk-17.0.1"),
+    # The file is read directly; a missing file surfaces as FileNotFoundError and is not an error
+    (FileNotFoundError("No such file"), None),
+    ("", ""), # Or None, depending on desired behavior for empty. Current is ""
+])
+def test_read_version_file(path_mocks, util_log, content, expected):
+    missing = isinstance(content, Exception)
+    if missing:
+        path_mocks["read_text"].side_effect = content
+    else:
+        path_mocks["read_text"].return_value = content
+
+    assert read_version_file(READ_PATH) == expected
+    if missing:
+        # None alone doesn't show the read was attempted: there is no is_file() check first
+        path_mocks["read_text"].assert_called_once_with()
+    assert util_log.messages == []
+
+def test_read_version_file_io_error(path_mocks, util_log):
+    path_mocks["read_text"].side_effect = IOError("Test read error")
+
+    version = read_version_file(READ_PATH)
 
     assert version is None
-    assert "Error reading version from" in caplog.text
-    assert "Test read error" in caplog.text
+    [message] = util_log.messages
+    assert _READ_ERR in message
+    assert "Test read error" in message
 
 # Tests for write_version_file
-def test_write_version_file_success(mocker):
-    version_name = "temurin-11"
-    file_path = Path("/fake/target/dir/.jenv-version")
-
-    mock_mkdir = mocker.patch("pathlib.Path.mkdir")
-    m_open = mock_open()
-    mocker.patch("pathlib.Path.write_text", m_open)
-
-    write_version_file(file_path, version_name)
-
-    mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
-    m_open.assert_called_once_with(version_name)
-
-@patch("pathlib.Path.mkdir") # Using @patch as an alternative to mocker.patch
-@patch("pathlib.Path.write_text")
-def test_write_version_file_strips_whitespace(mock_write_text, mock_mkdir):
-    version_name_with_space = "  openjdk-21  \n"
-    expected_written_version = "openjdk-21"
-    file_path = Path("/fake/target/dir/.jenv-version")
-
-    write_version_file(file_path, version_name_with_space)
-
-    mock_mkdir.assert_called_once_with(parents=True, exist_ok=True)
+@pytest.fixture
+def write_patches(path_mocks):
+    return path_mocks["mkdir"], path_mocks["write_text"]
+
+@pytest.mark.parametrize("version_name, expected_written_version", [
+    ("temurin-11", "temurin-11"),
+    # Whitespace is stripped
+    ("  openjdk-21  \n", "openjdk-21"),
+    ("\topenjdk-21\n", "openjdk-21"),
+    ("openjdk-21\r\n", "openjdk-21"),
+    ("  openjdk-21", "openjdk-21"),
+    ("openjdk-21  ", "openjdk-21"),
+])
+def test_write_version_file(write_patches, version_name, expected_written_version):
+    mock_mkdir, mock_write_text = write_patches
+
+    write_version_file(WRITE_PATH, version_name)
+
+    assert mock_mkdir.calls == [_MKDIR_CALL]
     mock_write_text.assert_called_once_with(expected_written_version)
 
-def test_write_version_file_io_error(mocker, caplog):
+def test_write_version_file_io_error(write_patches, util_log):
     version_name = "corretto-8"
-    file_path = Path("/fake/target/dir/.jenv-version")
 
-    mocker.patch("pathlib.Path.mkdir") # Assume mkdir works
-    mocker.patch("pathlib.Path.write_text", side_effect=IOError("Test write error"))
+    # mkdir is a plain mock, so it "works"
+    _, mock_write_text = write_patches
+    mock_write_text.side_effect = IOError("Test write error")
 
     # No exception should be raised by write_version_file itself as it logs the error
-    write_version_file(file_path, version_name)
+    write_version_file(WRITE_PATH, version_name)
 
-    assert "Error writing version to" in caplog.text
-    assert "Test write error" in caplog.text
+    [message] = util_log.messages
+    assert _WRITE_ERR in message
+    assert "Test write error" in message
 
 # To run these tests, you would use `poetry run pytest` in the terminal.
 # Ensure an __init__.py in tests/ and tests/unit/ if not already picked up.